@@ -3,6 +3,7 @@
 """
 Точка входа в приложение
 """
+import multiprocessing
 import os
 import sys
 import traceback
@@ -14,6 +15,10 @@ def main():
         print("🚀 ЗАПУСК ЦИФРОВОГО ДВОЙНИКА ТРУБОПРОВОДА")
         print("=" * 60)
         
+        # Журналирование (уровень - PIPELINE_LOG_LEVEL, по умолчанию WARNING)
+        from utils.log import setup_logging
+        setup_logging()
+        
         # Проверяем наличие необходимых папок
         required_folders = ['assets', 'assets/icons', 'assets/3D_models', 'locales']
         for folder in required_folders:
@@ -32,4 +37,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Пул процессов загрузки 3D-моделей в сборке PyInstaller
+    multiprocessing.freeze_support()
     main()
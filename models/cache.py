@@ -0,0 +1,148 @@
+"""Кэш скоростей коррозии и отслеживаемые таблицы коэффициентов"""
+import threading
+from collections import OrderedDict
+
+
+class VersionedTable(dict):
+    """
+    Таблица коэффициентов (обычный dict) со счётчиком изменений
+
+    Любая запись, удаление или update увеличивает revision, что позволяет
+    кэшам за O(1) понять, что справочник поменялся.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.revision = 0
+
+    def _touch(self):
+        self.revision += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touch()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._touch()
+        return result
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._touch()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._touch()
+        return result
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._touch()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._touch()
+
+
+class RateCache:
+    """
+    Ограниченный LRU-кэш со счётчиками попаданий/промахов
+
+    Сбрасывается автоматически, если изменилась любая из отслеживаемых
+    таблиц (VersionedTable), от которых зависят закэшированные значения.
+    Потокобезопасен: расчёт может идти в фоновом потоке.
+    """
+
+    def __init__(self, maxsize=4096, tables=()):
+        self.maxsize = maxsize
+        self._tables = list(tables)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._revision = self._tables_revision()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _tables_revision(self):
+        return tuple(table.revision for table in self._tables)
+
+    def _check_tables(self):
+        """Сбрасывает кэш, если справочники изменились"""
+        revision = self._tables_revision()
+        if revision != self._revision:
+            self._data.clear()
+            self._revision = revision
+            self.invalidations += 1
+
+    def track(self, table):
+        """Добавляет таблицу в список отслеживаемых"""
+        with self._lock:
+            self._tables.append(table)
+            self._revision = self._tables_revision()
+            self._data.clear()
+
+    def get(self, key, default=None):
+        """Возвращает значение по ключу (с учётом LRU) или default"""
+        with self._lock:
+            self._check_tables()
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Сохраняет значение, вытесняя самые давно использованные"""
+        with self._lock:
+            self._check_tables()
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Значение из кэша или результат compute() с сохранением"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Полностью очищает кэш (счётчики сохраняются)"""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Статистика работы кэша"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
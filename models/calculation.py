@@ -0,0 +1,291 @@
+"""
+Инкрементальный расчёт коррозии по участкам проекта
+
+Калькулятор хранит для каждого участка входные строки (компоненты)
+и закэшированные скорости коррозии, а пересчитывает только то,
+что действительно зависит от изменившихся входных данных:
+- изменился срок эксплуатации - скорости масштабируются заново (без модели);
+- изменились параметры среды - пересчитываются скорости всех участков;
+- добавлен участок - считается только он.
+Калькулятор не зависит от Tk и может работать в фоновом потоке:
+долгий расчёт разбит на порции, между которыми проверяется отмена
+задания (CalculationJob) и обновляется доля выполненной работы.
+"""
+import threading
+
+import numpy as np
+
+from .corrosion import get_corrosion_levels, get_corrosion_rates
+from .results import get_component_id, get_section_results
+
+# Остаточная толщина не опускается ниже этого значения, мм
+MIN_REMAINING_THICKNESS = 0.1
+
+# Размер порции строк для пакетного расчёта скоростей
+RATE_CHUNK_ROWS = 2000
+
+# Число участков, после которого обновляется прогресс при масштабировании
+EVALUATE_CHUNK_SECTIONS = 200
+
+
+def get_section_rows(section):
+    """
+    Входные данные строк таблицы для участка (без расчёта)
+
+    Сложный участок даёт по строке на компонент, простой - одну строку.
+    Строки подходят для get_factor_columns / get_corrosion_rates.
+    """
+    rows = []
+    laying = {
+        "location": section.get("location", "надземная"),
+        "protection": section.get("protection", "без защиты"),
+        "environment": section.get("environment", "Поволжье"),
+    }
+
+    if section.get("is_complex", False):
+        # СЛОЖНЫЙ УЧАСТОК - КАЖДЫЙ КОМПОНЕНТ ОТДЕЛЬНО
+        for i, comp_params in enumerate(section.get("components", [])):
+            comp_id = get_component_id(comp_params, i)
+
+            if comp_params.get("component_type") == "pipe":
+                thickness = comp_params.get("thickness", 10.0)
+                diameter = comp_params.get("diameter", 500.0)
+                length = comp_params.get("length", 0)
+                material = comp_params.get("material", "Ст20")
+            elif comp_params.get("component_type") == "equipment":
+                thickness = comp_params.get("wall_thickness", 12.0)
+                diameter = 0  # у оборудования нет диаметра
+                length = 0
+                material = comp_params.get("material", "09Г2С")
+            else:
+                # Для других типов или если component_type не указан
+                thickness = comp_params.get("thickness", comp_params.get("wall_thickness", 10.0))
+                diameter = comp_params.get("diameter", 0)
+                length = comp_params.get("length", 0)
+                material = comp_params.get("material", "Ст20")
+
+            rows.append({
+                "section": section,
+                "component": comp_params,
+                "component_id": comp_id,
+                "thickness": thickness,
+                "diameter": diameter,
+                "length": length,
+                "material": material,
+                **laying,
+                # Тип компонента и тип объекта для специальных коэффициентов
+                "component_type": comp_params.get("component_type", "pipe"),
+                "object_type": section.get("object_type", "")
+            })
+    else:
+        # ПРОСТОЙ УЧАСТОК
+        rows.append({
+            "section": section,
+            "component": None,
+            "component_id": section.get("component_id", ""),
+            "thickness": section["thickness"],
+            "diameter": section["diameter"],
+            "length": section["length"],
+            "material": section["material"],
+            **laying,
+            "component_type": section.get("component_type", "pipe"),
+            "object_type": section.get("object_type", "")
+        })
+
+    return rows
+
+
+def store_section_results(section, rows, remaining, levels):
+    """Сохраняет результаты расчёта в хранилище участка (section["results"])"""
+    results = get_section_results(section)
+    for row, row_remaining, level in zip(rows, remaining, levels):
+        results.set(row["component_id"], row_remaining, level)
+
+
+class CalculationJob:
+    """Задание на расчёт: флаг отмены и доля выполненной работы (0..1)"""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self.progress = 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class IncrementalCalculator:
+    """
+    Калькулятор остаточной толщины с отслеживанием «грязных» участков
+
+    Участки идентифицируются по объекту словаря (id); калькулятор держит
+    ссылку на участок, поэтому id не может быть переиспользован.
+    Изменённый участок заменяется в списке новым словарём, и sync_sections
+    видит его как удалённый и добавленный.
+    """
+
+    def __init__(self, fluid_type):
+        self.fluid_type = fluid_type
+        self.fluid_params = None
+        self.years = None
+
+        self._entries = {}       # id(участка) -> {"section", "rows", "thickness", "rates"}
+        self._order = []         # id участков в порядке sections_data
+        self._dirty = set()      # участки, для которых нужны новые скорости
+        self._stale = set()      # скорости обновлены, но результат ещё не выдан
+
+    # ------------------------------------------------------------------
+    # Отслеживание изменений
+    # ------------------------------------------------------------------
+
+    def set_fluid_params(self, fluid_params):
+        """Новые параметры среды; True, если они изменились"""
+        if fluid_params == self.fluid_params:
+            return False
+        self.fluid_params = dict(fluid_params)
+        self._dirty.update(self._entries)
+        return True
+
+    def sync_sections(self, sections_data):
+        """
+        Сверяет список участков с сохранённым состоянием
+
+        Returns:
+        --------
+        (added, removed): списки ключей добавленных и удалённых участков
+        """
+        order = [id(section) for section in sections_data]
+        current = set(order)
+
+        removed = [key for key in self._order if key not in current]
+        for key in removed:
+            del self._entries[key]
+            self._dirty.discard(key)
+            self._stale.discard(key)
+
+        added = []
+        for key, section in zip(order, sections_data):
+            if key not in self._entries:
+                self._entries[key] = self._make_entry(section)
+                self._dirty.add(key)
+                added.append(key)
+
+        self._order = order
+        return added, removed
+
+    def _make_entry(self, section):
+        rows = get_section_rows(section)
+        return {
+            "section": section,
+            "rows": rows,
+            "thickness": np.array([row["thickness"] for row in rows], dtype=float),
+            "rates": None
+        }
+
+    # ------------------------------------------------------------------
+    # Расчёт
+    # ------------------------------------------------------------------
+
+    def keys(self):
+        """Ключи участков в порядке sections_data"""
+        return list(self._order)
+
+    def rows(self, key):
+        """Строки участка по ключу"""
+        return self._entries[key]["rows"]
+
+    def refresh_rates(self, job=None, progress_span=(0.0, 1.0)):
+        """
+        Пересчитывает скорости «грязных» участков пакетными вызовами по порциям
+
+        Returns:
+        --------
+        список ключей участков, скорости которых обновлены,
+        или None, если задание job отменено (необработанные участки
+        остаются «грязными»)
+        """
+        keys = [key for key in self._order if key in self._dirty]
+        total = sum(len(self._entries[key]["rows"]) for key in keys)
+        start, span = progress_span[0], progress_span[1] - progress_span[0]
+
+        done = 0
+        position = 0
+        while position < len(keys):
+            if job is not None and job.cancelled:
+                return None
+
+            # Порция участков примерно на RATE_CHUNK_ROWS строк
+            chunk = []
+            chunk_rows = []
+            while position < len(keys) and (not chunk or len(chunk_rows) < RATE_CHUNK_ROWS):
+                chunk.append(keys[position])
+                chunk_rows.extend(self._entries[keys[position]]["rows"])
+                position += 1
+
+            rates = get_corrosion_rates(self.fluid_type, self.fluid_params, chunk_rows)
+
+            offset = 0
+            for key in chunk:
+                entry = self._entries[key]
+                count = len(entry["rows"])
+                entry["rates"] = rates[offset:offset + count]
+                offset += count
+                self._dirty.discard(key)
+                self._stale.add(key)
+
+            done += len(chunk_rows)
+            if job is not None and total:
+                job.progress = start + span * done / total
+
+        return keys
+
+    def evaluate(self, years, job=None):
+        """
+        Остаточные толщины и уровни для участков, результат которых мог измениться
+
+        При новом сроке эксплуатации - все участки (масштабирование скоростей),
+        иначе - только участки с пересчитанными скоростями.
+
+        Returns:
+        --------
+        list of dict: key, section, rows, remaining (list), levels (list);
+        None, если задание job отменено
+        """
+        has_dirty = bool(self._dirty)
+        if self.refresh_rates(job, (0.0, 0.5) if has_dirty else (0.0, 0.0)) is None:
+            return None
+
+        if years != self.years:
+            keys = self._order
+        else:
+            keys = [key for key in self._order if key in self._stale]
+        start = 0.5 if has_dirty else 0.0
+
+        results = []
+        for index, key in enumerate(keys):
+            if index % EVALUATE_CHUNK_SECTIONS == 0 and job is not None:
+                if job.cancelled:
+                    return None
+                job.progress = start + (1.0 - start) * index / len(keys)
+
+            entry = self._entries[key]
+            remaining = np.maximum(MIN_REMAINING_THICKNESS,
+                                   entry["thickness"] - entry["rates"] * years)
+            results.append({
+                "key": key,
+                "section": entry["section"],
+                "rows": entry["rows"],
+                "remaining": remaining.tolist(),
+                "levels": get_corrosion_levels(remaining)
+            })
+
+        # Срок фиксируется только после полного расчёта: отменённое
+        # задание не должно скрыть участки от следующего пересчёта
+        self.years = years
+        self._stale.clear()
+        if job is not None:
+            job.progress = 1.0
+        return results
@@ -5,6 +5,15 @@
 
 import math
 
+import numpy as np
+
+from .cache import RateCache, VersionedTable
+from .resolvers import SpecialCoefficientResolver, SubstringResolver
+from .regions import REGION_AGGRESSION, WATER_BODIES
+from utils.log import DIAGNOSTICS, get_logger
+
+logger = get_logger(__name__)
+
 # ============================================================================
 # ФУНДАМЕНТАЛЬНЫЕ МОДЕЛИ КОРРОЗИИ
 # ============================================================================
@@ -32,6 +41,12 @@ def de_waard_milliams_co2_rate(T_C: float, P_CO2_bar: float, pH: float,
     if P_CO2_bar <= 0:
         return 0.0
     
+    V_corr, f_pH, f_oil = _de_waard_terms(T_C, P_CO2_bar, pH)
+    return V_corr * f_pH * f_oil * material_factor
+
+
+def _de_waard_terms(T_C, P_CO2_bar, pH):
+    """Множители модели де Вааля, не зависящие от компонента"""
     T_K = T_C + 273.15  # Конвертация в Кельвины
     
     # Уравнение де Вааля-Милльямса (1995)
@@ -49,7 +64,7 @@ def de_waard_milliams_co2_rate(T_C: float, P_CO2_bar: float, pH: float,
     # Поправка на масляную фазу (только для нефти)
     f_oil = 0.7  # Упрощённо - наличие нефти снижает коррозию на 30%
     
-    return V_corr * f_pH * f_oil * material_factor
+    return V_corr, f_pH, f_oil
 
 
 def norsok_m506_co2_rate(T_C: float, P_CO2_bar: float, P_H2S_bar: float, 
@@ -74,6 +89,14 @@ def norsok_m506_co2_rate(T_C: float, P_CO2_bar: float, P_H2S_bar: float,
     ----------
     Norsok Standard M-506 (2005) "CO2 corrosion rate calculation model"
     """
+    V_corr, f_pH, f_H2S = _norsok_terms(T_C, P_CO2_bar, P_H2S_bar, pH)
+    f_flow = _norsok_flow_factor(velocity_ms)
+    
+    return V_corr * f_pH * f_flow * f_H2S * material_factor
+
+
+def _norsok_terms(T_C, P_CO2_bar, P_H2S_bar, pH):
+    """Множители модели Norsok, не зависящие от компонента"""
     T_K = T_C + 273.15
     
     # Основное уравнение Norsok
@@ -88,23 +111,34 @@ def norsok_m506_co2_rate(T_C: float, P_CO2_bar: float, P_H2S_bar: float,
     else:
         f_pH = 0.1   # При высоком pH образуется защитная плёнка
     
-    # Поправка на скорость потока (эрозионная коррозия)
-    if velocity_ms < 1.0:
-        f_flow = 1.0
-    elif velocity_ms < 10.0:
-        f_flow = 1.0 + 0.1 * (velocity_ms - 1.0)
-    elif velocity_ms < 20.0:
-        f_flow = 2.0 + 0.3 * (velocity_ms - 10.0)
-    else:
-        f_flow = 5.0  # Сильная эрозия при высоких скоростях
-    
     # Поправка на H2S (защитная сульфидная плёнка при определённых условиях)
     f_H2S = 1.0
     if P_H2S_bar > 0.01 and T_C < 100:
         if P_H2S_bar / P_CO2_bar > 0.01:  # Сульфидная плёнка может формироваться
             f_H2S = 0.5  # Снижение коррозии за счёт плёнки
     
-    return V_corr * f_pH * f_flow * f_H2S * material_factor
+    return V_corr, f_pH, f_H2S
+
+
+def _norsok_flow_factor(velocity_ms):
+    """Поправка на скорость потока (эрозионная коррозия)"""
+    if velocity_ms < 1.0:
+        return 1.0
+    elif velocity_ms < 10.0:
+        return 1.0 + 0.1 * (velocity_ms - 1.0)
+    elif velocity_ms < 20.0:
+        return 2.0 + 0.3 * (velocity_ms - 10.0)
+    else:
+        return 5.0  # Сильная эрозия при высоких скоростях
+
+
+def _norsok_flow_factor_array(velocity_ms):
+    """Векторная версия _norsok_flow_factor для массива скоростей"""
+    return np.select(
+        [velocity_ms < 1.0, velocity_ms < 10.0, velocity_ms < 20.0],
+        [1.0, 1.0 + 0.1 * (velocity_ms - 1.0), 2.0 + 0.3 * (velocity_ms - 10.0)],
+        default=5.0
+    )
 
 
 def calculate_ph(T_C: float, P_CO2_bar: float, bicarbonate_mmol: float = 1.0) -> float:
@@ -205,27 +239,11 @@ def calculate_corrosion_oil(years, temperature, water_content, h2s_content,
     water_factor = water_content / 100
     
     # 3.2. Вязкость (высокая вязкость снижает массоперенос)
-    if viscosity > 100:
-        viscosity_factor = 0.3
-    elif viscosity > 50:
-        viscosity_factor = 0.5
-    elif viscosity > 20:
-        viscosity_factor = 0.7
-    elif viscosity > 10:
-        viscosity_factor = 0.8
-    else:
-        viscosity_factor = 1.0
+    viscosity_factor = _viscosity_factor(viscosity)
     
     # 3.3. Условия прокладки
-    from .regions import REGION_AGGRESSION, WATER_BODIES
-    
-    if location == "подводная":
-        environment_factor = WATER_BODIES.get(environment, 1.0)
-    else:
-        environment_factor = REGION_AGGRESSION.get(environment, 1.0)
-    
-    location_factor = PIPELINE_LOCATION.get(location, 1.0)
-    protection_factor = PROTECTION_TYPES.get(protection, 1.0)
+    location_factor, environment_factor, protection_factor = \
+        get_laying_factors(location, protection, environment)
     
     # 3.4. Специальный коэффициент для компонента
     special_factor = get_special_coefficient(component_type, component_id, object_type)
@@ -237,18 +255,22 @@ def calculate_corrosion_oil(years, temperature, water_content, h2s_content,
     # 5. ПОТЕРЯ ТОЛЩИНЫ
     thickness_loss = corrosion_rate * years
     
-    # 6. ЛОГГИРОВАНИЕ (для отладки и демонстрации)
-    print(f"\n📊 МОДЕЛЬ КОРРОЗИИ ДЛЯ НЕФТИ:")
-    print(f"   Использована модель: {model_name}")
-    print(f"   Параметры: T={temperature}°C, P_CO2={P_CO2_bar} бар, pH={pH:.2f}")
-    print(f"   Базовая скорость: {base_rate:.3f} мм/год")
-    print(f"   Поправочные коэффициенты:")
-    print(f"     - Обводнённость: {water_factor:.2f}")
-    print(f"     - Вязкость: {viscosity_factor:.2f}")
-    print(f"     - Локация: {location_factor:.2f}")
-    print(f"     - Защита: {protection_factor:.2f}")
-    print(f"     - Специальный: {special_factor:.2f}")
-    print(f"   Итоговая скорость: {corrosion_rate:.3f} мм/год")
+    # 6. ДИАГНОСТИКА (структурированная запись, только при включённом уровне)
+    if logger.isEnabledFor(DIAGNOSTICS):
+        logger.log(DIAGNOSTICS, "Модель коррозии для нефти", extra={"diagnostics": {
+            "model": model_name,
+            "temperature": temperature,
+            "P_CO2_bar": P_CO2_bar,
+            "pH": pH,
+            "base_rate": base_rate,
+            "water_factor": water_factor,
+            "viscosity_factor": viscosity_factor,
+            "location_factor": location_factor,
+            "environment_factor": environment_factor,
+            "protection_factor": protection_factor,
+            "special_factor": special_factor,
+            "corrosion_rate": corrosion_rate,
+        }})
     
     return thickness_loss, corrosion_rate
 
@@ -308,15 +330,8 @@ def calculate_corrosion_gas(years, temperature, pressure, co2_content,
     methane_factor = 1.0 - 0.005 * methane_content
     
     # 3.3. Условия прокладки
-    from .regions import REGION_AGGRESSION, WATER_BODIES
-    
-    if location == "подводная":
-        environment_factor = WATER_BODIES.get(environment, 1.0)
-    else:
-        environment_factor = REGION_AGGRESSION.get(environment, 1.0)
-    
-    location_factor = PIPELINE_LOCATION.get(location, 1.0)
-    protection_factor = PROTECTION_TYPES.get(protection, 1.0)
+    location_factor, environment_factor, protection_factor = \
+        get_laying_factors(location, protection, environment)
     
     # 3.4. Специальный коэффициент
     special_factor = get_special_coefficient(component_type, component_id, object_type)
@@ -328,17 +343,300 @@ def calculate_corrosion_gas(years, temperature, pressure, co2_content,
     # 5. ПОТЕРЯ ТОЛЩИНЫ
     thickness_loss = corrosion_rate * years
     
-    # 6. ЛОГГИРОВАНИЕ
-    print(f"\n📊 МОДЕЛЬ КОРРОЗИИ ДЛЯ ГАЗА:")
-    print(f"   Использована модель: {model_name}")
-    print(f"   Параметры: T={temperature}°C, P_CO2={P_CO2_bar:.1f} бар, pH={pH:.2f}")
-    print(f"   Конденсация: {'да' if condensation_factor > 1 else 'нет'}")
-    print(f"   Базовая скорость: {base_rate:.3f} мм/год")
-    print(f"   Итоговая скорость: {corrosion_rate:.3f} мм/год")
+    # 6. ДИАГНОСТИКА
+    if logger.isEnabledFor(DIAGNOSTICS):
+        logger.log(DIAGNOSTICS, "Модель коррозии для газа", extra={"diagnostics": {
+            "model": model_name,
+            "temperature": temperature,
+            "P_CO2_bar": P_CO2_bar,
+            "pH": pH,
+            "condensation_factor": condensation_factor,
+            "base_rate": base_rate,
+            "methane_factor": methane_factor,
+            "location_factor": location_factor,
+            "environment_factor": environment_factor,
+            "protection_factor": protection_factor,
+            "special_factor": special_factor,
+            "corrosion_rate": corrosion_rate,
+        }})
+    
+    return thickness_loss, corrosion_rate
+
+
+# ============================================================================
+# ПАКЕТНЫЙ (ВЕКТОРНЫЙ) РАСЧЁТ
+# ============================================================================
+
+def calculate_corrosion_batch(fluid_type, fluid_params, pipe_diameter, material_factor,
+                              location_factor, environment_factor, protection_factor,
+                              special_factor, years):
+    """
+    Векторный расчёт коррозии сразу для массива компонентов
+    
+    Даёт те же значения, что calculate_corrosion_oil / calculate_corrosion_gas,
+    но за один вызов: параметры среды и модель считаются один раз,
+    а покомпонентные множители - операциями NumPy над столбцами.
+    
+    Parameters:
+    -----------
+    fluid_type : "oil" или "gas"
+    fluid_params : dict параметров среды (ключи как в update_calculation)
+    pipe_diameter : массив диаметров, мм
+    material_factor : массив коэффициентов материала
+    location_factor, environment_factor, protection_factor : массивы коэффициентов прокладки
+    special_factor : массив специальных коэффициентов компонентов
+    years : срок эксплуатации (число или массив той же длины)
+    
+    Returns:
+    --------
+    thickness_loss, corrosion_rate : np.ndarray, мм и мм/год
+    """
+    temperature = fluid_params["temperature"]
+    material_factor = np.asarray(material_factor, dtype=float)
+    
+    if fluid_type == "oil":
+        P_CO2_bar = 0.5
+        P_H2S_bar = fluid_params["h2s_content"] * 1e-6 * 10
+        
+        # Скорость потока зависит от диаметра - единственная векторная часть модели
+        diameter = np.asarray(pipe_diameter, dtype=float)
+        area = math.pi * (diameter / 1000)**2 / 4
+        with np.errstate(divide="ignore", invalid="ignore"):
+            velocity_ms = np.where(area > 0, fluid_params["flow_rate"] / 3600 / area, 1.0)
+        
+        bicarbonate = 5.0 if fluid_params["water_content"] > 10 else 1.0
+        pH = calculate_ph(temperature, P_CO2_bar, bicarbonate)
+        
+        if P_H2S_bar > 0.001:
+            V_corr, f_pH, f_H2S = _norsok_terms(temperature, P_CO2_bar, P_H2S_bar, pH)
+            f_flow = _norsok_flow_factor_array(velocity_ms)
+            base_rate = V_corr * f_pH * f_flow * f_H2S * material_factor
+            model_name = "Norsok M-506"
+        else:
+            V_corr, f_pH, f_oil = _de_waard_terms(temperature, P_CO2_bar, pH)
+            base_rate = V_corr * f_pH * f_oil * material_factor
+            model_name = "De Waard-Milliams"
+        
+        corrosion_rate = base_rate * (fluid_params["water_content"] / 100) * \
+            _viscosity_factor(fluid_params["viscosity"]) * \
+            location_factor * environment_factor * protection_factor * special_factor
+    else:
+        P_CO2_bar = fluid_params["pressure"] * (fluid_params["co2_content"] / 100) * 10
+        P_H2S_bar = 0.001
+        pH = calculate_ph(temperature, P_CO2_bar, 0.1)
+        condensation_factor = 2.0 if temperature <= fluid_params["dew_point"] else 1.0
+        
+        if P_CO2_bar > 10:
+            V_corr, f_pH, f_H2S = _norsok_terms(temperature, P_CO2_bar, P_H2S_bar, pH)
+            base_rate = V_corr * f_pH * _norsok_flow_factor(15.0) * f_H2S * material_factor
+            model_name = "Norsok M-506"
+        elif P_CO2_bar <= 0:
+            base_rate = np.zeros_like(material_factor)
+            model_name = "De Waard-Milliams"
+        else:
+            V_corr, f_pH, f_oil = _de_waard_terms(temperature, P_CO2_bar, pH)
+            base_rate = V_corr * f_pH * f_oil * material_factor
+            model_name = "De Waard-Milliams"
+        
+        corrosion_rate = base_rate * condensation_factor * \
+            (1.0 - 0.005 * fluid_params["methane_content"]) * \
+            location_factor * environment_factor * protection_factor * special_factor
+    
+    thickness_loss = corrosion_rate * np.asarray(years, dtype=float)
+    
+    if logger.isEnabledFor(DIAGNOSTICS):
+        logger.log(DIAGNOSTICS, "Пакетный расчёт коррозии", extra={"diagnostics": {
+            "fluid_type": fluid_type,
+            "model": model_name,
+            "temperature": temperature,
+            "P_CO2_bar": P_CO2_bar,
+            "pH": pH,
+            "components": int(material_factor.size),
+        }})
     
     return thickness_loss, corrosion_rate
 
 
+def get_factor_columns(records):
+    """
+    Собирает столбцы коэффициентов для calculate_corrosion_batch
+    
+    records : последовательность dict с ключами diameter, material, location,
+              protection, environment, component_type, component_id, object_type
+    """
+    n = len(records)
+    columns = {
+        "pipe_diameter": np.empty(n),
+        "material_factor": np.empty(n),
+        "location_factor": np.empty(n),
+        "environment_factor": np.empty(n),
+        "protection_factor": np.empty(n),
+        "special_factor": np.empty(n),
+    }
+    
+    for i, rec in enumerate(records):
+        location_factor, environment_factor, protection_factor = get_laying_factors(
+            rec["location"], rec["protection"], rec["environment"])
+        columns["pipe_diameter"][i] = rec["diameter"]
+        columns["material_factor"][i] = get_material_factor(rec["material"])
+        columns["location_factor"][i] = location_factor
+        columns["environment_factor"][i] = environment_factor
+        columns["protection_factor"][i] = protection_factor
+        columns["special_factor"][i] = get_special_coefficient(
+            rec.get("component_type", "pipe"), rec.get("component_id", ""),
+            rec.get("object_type", ""))
+    
+    return columns
+
+
+# ============================================================================
+# ПРОГНОЗ ПО НЕСКОЛЬКИМ ГОРИЗОНТАМ
+# ============================================================================
+
+# Горизонты прогноза по умолчанию (годы)
+FORECAST_HORIZONS = tuple(range(0, 51, 5))
+
+
+def get_corrosion_rate(fluid_type, fluid_params, pipe_thickness, pipe_diameter,
+                       pipe_material, location="надземная", protection="без защиты",
+                       environment="Поволжье", component_type="pipe",
+                       component_id="", object_type=""):
+    """
+    Скорость коррозии компонента, мм/год
+    
+    Скорость не зависит от срока эксплуатации, поэтому для прогноза
+    на любые горизонты её достаточно посчитать один раз.
+    Результат берётся из RATE_CACHE; толщина стенки на скорость не влияет
+    и в ключ кэша не входит.
+    fluid_params : dict параметров среды (ключи как в update_calculation)
+    """
+    key = _fluid_cache_key(fluid_type, fluid_params) + _component_cache_key(
+        fluid_type, pipe_diameter, pipe_material, location, protection,
+        environment, component_type, component_id, object_type)
+    corrosion_rate = RATE_CACHE.get(key)
+    if corrosion_rate is not None:
+        return corrosion_rate
+    
+    if fluid_type == "oil":
+        _, corrosion_rate = calculate_corrosion_oil(
+            1, fluid_params["temperature"], fluid_params["water_content"],
+            fluid_params["h2s_content"], fluid_params["viscosity"],
+            fluid_params["flow_rate"], pipe_thickness, pipe_diameter, pipe_material,
+            location, protection, environment, component_type=component_type,
+            component_id=component_id, object_type=object_type)
+    else:
+        _, corrosion_rate = calculate_corrosion_gas(
+            1, fluid_params["temperature"], fluid_params["pressure"],
+            fluid_params["co2_content"], fluid_params["methane_content"],
+            fluid_params["dew_point"], pipe_thickness, pipe_diameter, pipe_material,
+            location, protection, environment, component_type=component_type,
+            component_id=component_id, object_type=object_type)
+    
+    RATE_CACHE.put(key, corrosion_rate)
+    return corrosion_rate
+
+
+def get_corrosion_rates(fluid_type, fluid_params, records):
+    """
+    Скорости коррозии для набора компонентов через RATE_CACHE, мм/год
+    
+    Промахи кэша (без повторов) досчитываются одним вызовом
+    calculate_corrosion_batch. records - как в get_factor_columns.
+    
+    Returns:
+    --------
+    np.ndarray скоростей в порядке records
+    """
+    fluid_key = _fluid_cache_key(fluid_type, fluid_params)
+    rates = np.empty(len(records))
+    pending = {}
+    
+    for i, rec in enumerate(records):
+        key = fluid_key + _component_cache_key(
+            fluid_type, rec["diameter"], rec["material"], rec["location"],
+            rec["protection"], rec["environment"], rec.get("component_type", "pipe"),
+            rec.get("component_id", ""), rec.get("object_type", ""))
+        rate = RATE_CACHE.get(key)
+        if rate is None:
+            pending.setdefault(key, []).append(i)
+        else:
+            rates[i] = rate
+    
+    if pending:
+        missed = [records[indices[0]] for indices in pending.values()]
+        _, missed_rates = calculate_corrosion_batch(
+            fluid_type, fluid_params, years=0, **get_factor_columns(missed))
+        for (key, indices), rate in zip(pending.items(), missed_rates.tolist()):
+            RATE_CACHE.put(key, rate)
+            rates[indices] = rate
+    
+    return rates
+
+
+def forecast_remaining_thickness(thickness, corrosion_rate, horizons, min_thickness=0.0):
+    """
+    Остаточная толщина на сетке горизонтов: max(min_thickness, thickness - rate * t)
+    
+    thickness и corrosion_rate могут быть столбцами формы (n, 1) -
+    тогда результат имеет форму (n, len(horizons)).
+    """
+    years = np.asarray(horizons, dtype=float)
+    return np.maximum(min_thickness, thickness - corrosion_rate * years)
+
+
+def get_level_crossing_times(thickness, corrosion_rate):
+    """
+    Через сколько лет компонент перейдёт в каждый из уровней get_corrosion_level
+    
+    Returns:
+    --------
+    dict {уровень: лет}: 0.0 - уровень уже достигнут или пройден,
+    math.inf - при нулевой скорости коррозии уровень не наступит
+    """
+    crossing_times = {}
+    next_levels = [level for _, level, _ in CORROSION_LEVELS[1:]] + [WORST_CORROSION_LEVEL[0]]
+    
+    for (threshold, _, _), level in zip(CORROSION_LEVELS, next_levels):
+        if thickness < threshold:
+            crossing_times[level] = 0.0
+        elif corrosion_rate > 0:
+            crossing_times[level] = (thickness - threshold) / corrosion_rate
+        else:
+            crossing_times[level] = math.inf
+    
+    return crossing_times
+
+
+def forecast_corrosion(fluid_type, fluid_params, pipe_thickness, pipe_diameter,
+                       pipe_material, location="надземная", protection="без защиты",
+                       environment="Поволжье", component_type="pipe", component_id="",
+                       object_type="", horizons=FORECAST_HORIZONS, min_thickness=0.0):
+    """
+    Прогноз коррозии компонента на произвольную сетку горизонтов
+    
+    Скорость считается один раз, кривая остаточной толщины и моменты
+    перехода между уровнями - в закрытой форме.
+    
+    Returns:
+    --------
+    dict: corrosion_rate (мм/год), years, remaining (np.ndarray),
+          level_times (см. get_level_crossing_times)
+    """
+    corrosion_rate = get_corrosion_rate(
+        fluid_type, fluid_params, pipe_thickness, pipe_diameter, pipe_material,
+        location, protection, environment, component_type=component_type,
+        component_id=component_id, object_type=object_type)
+    years = np.asarray(horizons, dtype=float)
+    
+    return {
+        "corrosion_rate": corrosion_rate,
+        "years": years,
+        "remaining": forecast_remaining_thickness(
+            pipe_thickness, corrosion_rate, years, min_thickness),
+        "level_times": get_level_crossing_times(pipe_thickness, corrosion_rate)
+    }
+
+
 # ============================================================================
 # ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ (обновлённые)
 # ============================================================================
@@ -347,57 +645,94 @@ def get_material_factor(material: str) -> float:
     """
     Коэффициенты коррозионной стойкости материалов
     на основе стандартов NACE MR0175/ISO 15156
-    """
-    material_factors = {
-        # Углеродистые стали
-        "Ст20": 1.00, "Ст45": 0.95,
-        # Низколегированные
-        "09Г2С": 0.85, "17Г1С": 0.80, "10Г2": 0.88,
-        # Трубные стали API
-        "X42": 0.90, "X46": 0.88, "X52": 0.85,
-        "X56": 0.82, "X60": 0.80, "X65": 0.75,
-        "X70": 0.70, "X80": 0.65,
-        # Нержавеющие стали
-        "13ХФА": 0.50, "08Х18Н10Т": 0.30,
-        "AISI 304": 0.25, "AISI 316": 0.20,
-        "Duplex 2205": 0.15, "Super Duplex 2507": 0.10,
-        # Сплавы
-        "Inconel 625": 0.05, "Hastelloy C276": 0.03,
-    }
     
-    for key, value in material_factors.items():
-        if key.upper() in material.upper():
-            return value
+    Поиск по таблице MATERIAL_FACTORS (первая марка, входящая в название
+    без учёта регистра), иначе - оценка по категории легирования.
+    """
+    return MATERIAL_RESOLVER(material)
+
+
+def register_material(material, factor):
+    """Добавляет марку материала в справочник во время работы"""
+    MATERIAL_RESOLVER.register(material, factor)
+
+
+def get_laying_factors(location, protection, environment):
+    """Коэффициенты условий прокладки: (локация, среда/регион, защита)"""
+    if location == "подводная":
+        environment_factor = WATER_BODIES.get(environment, 1.0)
+    else:
+        environment_factor = REGION_AGGRESSION.get(environment, 1.0)
     
-    # Если материал не найден, оцениваем по категориям
-    material_upper = material.upper()
-    if any(x in material_upper for x in ["Х", "CR", "NI", "MO", "INCONEL"]):
-        return 0.30  # Нержавеющая/коррозионностойкая
-    elif any(x in material_upper for x in ["Г", "MN", "X"]):
-        return 0.80  # Низколегированная
+    location_factor = PIPELINE_LOCATION.get(location, 1.0)
+    protection_factor = PROTECTION_TYPES.get(protection, 1.0)
+    return location_factor, environment_factor, protection_factor
+
+
+def _viscosity_factor(viscosity):
+    """Поправка на вязкость нефти (высокая вязкость снижает массоперенос)"""
+    if viscosity > 100:
+        return 0.3
+    elif viscosity > 50:
+        return 0.5
+    elif viscosity > 20:
+        return 0.7
+    elif viscosity > 10:
+        return 0.8
     else:
-        return 1.00  # Углеродистая
+        return 1.0
+
+
+# Пороги уровней коррозии: (минимальная остаточная толщина, мм; уровень; цвет)
+CORROSION_LEVELS = [
+    (10.0, "отличное", "green"),
+    (8.0, "хорошее", "lightgreen"),
+    (6.0, "удовлетворительное", "yellow"),
+    (4.0, "плохое", "orange"),
+]
+WORST_CORROSION_LEVEL = ("аварийное", "red")
 
 
 def get_corrosion_level(remaining_thickness):
     """Определяет уровень коррозии по остаточной толщине"""
-    if remaining_thickness >= 10.0:
-        return "отличное", "green"
-    elif remaining_thickness >= 8.0:
-        return "хорошее", "lightgreen" 
-    elif remaining_thickness >= 6.0:
-        return "удовлетворительное", "yellow"
-    elif remaining_thickness >= 4.0:
-        return "плохое", "orange"
-    else:
-        return "аварийное", "red"
+    for threshold, level, color in CORROSION_LEVELS:
+        if remaining_thickness >= threshold:
+            return level, color
+    return WORST_CORROSION_LEVEL
+
+
+# Названия уровней от лучшего к худшему (см. get_corrosion_level_indices)
+CORROSION_LEVEL_NAMES = [level for _, level, _ in CORROSION_LEVELS] + [WORST_CORROSION_LEVEL[0]]
+
+
+def get_corrosion_level_indices(remaining_thickness):
+    """
+    Индексы уровней коррозии в CORROSION_LEVEL_NAMES для массива
+    остаточных толщин (чем больше индекс, тем хуже состояние)
+    """
+    remaining = np.asarray(remaining_thickness, dtype=float)
+    thresholds = np.array([threshold for threshold, _, _ in CORROSION_LEVELS])
+    # Индекс первого выполненного порога = число невыполненных (пороги убывают)
+    return (~(remaining[:, None] >= thresholds)).sum(axis=1)
+
+
+def get_corrosion_levels(remaining_thickness):
+    """
+    Уровни коррозии для массива остаточных толщин (как get_corrosion_level)
+
+    Returns:
+    --------
+    list названий уровней
+    """
+    indices = get_corrosion_level_indices(remaining_thickness)
+    return [CORROSION_LEVEL_NAMES[index] for index in indices.tolist()]
 
 
 # ============================================================================
 # КОЭФФИЦИЕНТЫ (обновлённые с ссылками на стандарты)
 # ============================================================================
 
-PROTECTION_TYPES = {
+PROTECTION_TYPES = VersionedTable({
     "без защиты": 1.00,
     "ППУ изоляц.": 0.05,  # ГОСТ 30732-2006, эффективность 95%
     "эпоксид. покр.": 0.03,  # ГОСТ Р 51164, эффективность 97%
@@ -408,16 +743,16 @@ PROTECTION_TYPES = {
     "катод. защ. + протекторы": 0.005,  # комбинированная защита
     "двойная изоляция + мониторинг": 0.001,  # для ответственных объектов
     "комплекс. защ.": 0.0001,  # изоляция + катодная + ингибиторы
-}
+})
 
-PIPELINE_LOCATION = {
+PIPELINE_LOCATION = VersionedTable({
     "надземная": 1.0,  # атмосферная коррозия
     "подземная": 3.0,  # почвенная коррозия + блуждающие токи
     "подводная": 2.0,  # водная коррозия + обрастание
-}
+})
 
 # Специальные коэффициенты для сложных объектов
-SPECIAL_COEFFICIENTS = {
+SPECIAL_COEFFICIENTS = VersionedTable({
     # Базовые условия
     "pipe": 1.0,
     "equipment": 1.2,
@@ -437,30 +772,92 @@ SPECIAL_COEFFICIENTS = {
     "dryer_adsorbers": 1.8,         # Циклические нагрузки
     "grs_filter": 1.4,              # Конденсация + загрязнения
     "grs_fork": 1.2,                # Турбулентность потока
+})
+
+# Коэффициенты по типу компонента, если не найден специальный
+COMPONENT_TYPE_COEFFICIENTS = {
+    "equipment": 1.2,
+    "tank": 1.2,
+    "separator": 1.2,
+    "compressor": 1.2,
+    "pipe": 1.0,
 }
 
+# Коэффициенты коррозионной стойкости материалов (NACE MR0175/ISO 15156)
+MATERIAL_FACTORS = VersionedTable({
+    # Углеродистые стали
+    "Ст20": 1.00, "Ст45": 0.95,
+    # Низколегированные
+    "09Г2С": 0.85, "17Г1С": 0.80, "10Г2": 0.88,
+    # Трубные стали API
+    "X42": 0.90, "X46": 0.88, "X52": 0.85,
+    "X56": 0.82, "X60": 0.80, "X65": 0.75,
+    "X70": 0.70, "X80": 0.65,
+    # Нержавеющие стали
+    "13ХФА": 0.50, "08Х18Н10Т": 0.30,
+    "AISI 304": 0.25, "AISI 316": 0.20,
+    "Duplex 2205": 0.15, "Super Duplex 2507": 0.10,
+    # Сплавы
+    "Inconel 625": 0.05, "Hastelloy C276": 0.03,
+})
+
+# Если марка не найдена - оценка по категории (проверяются по порядку)
+MATERIAL_CATEGORIES = [
+    (("Х", "CR", "NI", "MO", "INCONEL"), 0.30),  # Нержавеющая/коррозионностойкая
+    (("Г", "MN", "X"), 0.80),                    # Низколегированная
+]
+
+MATERIAL_RESOLVER = SubstringResolver(MATERIAL_FACTORS, fallback=MATERIAL_CATEGORIES,
+                                      default=1.00)  # Углеродистая
+SPECIAL_RESOLVER = SpecialCoefficientResolver(SPECIAL_COEFFICIENTS,
+                                              type_factors=COMPONENT_TYPE_COEFFICIENTS)
+
+
 def get_special_coefficient(component_type="", component_id="", object_type=""):
     """Возвращает специальный коэффициент для компонента"""
-    # Приоритет 1: точное совпадение component_id
-    if component_id and component_id in SPECIAL_COEFFICIENTS:
-        return SPECIAL_COEFFICIENTS[component_id]
-    
-    # Приоритет 2: ищем по ключевым словам
-    search_keys = []
-    if component_id:
-        search_keys.append(component_id)
-    if object_type:
-        search_keys.append(object_type)
-    
-    for key in search_keys:
-        for coeff_key in SPECIAL_COEFFICIENTS:
-            if key in coeff_key or coeff_key in key:
-                return SPECIAL_COEFFICIENTS[coeff_key]
-    
-    # Приоритет 3: по типу компонента
-    if component_type in ["equipment", "tank", "separator", "compressor"]:
-        return 1.2
-    elif component_type == "pipe":
-        return 1.0
+    return SPECIAL_RESOLVER(component_type, component_id, object_type)
+
+
+def register_special_coefficient(key, coefficient):
+    """Добавляет специальный коэффициент (component_id или ключевое слово)"""
+    SPECIAL_RESOLVER.register(key, coefficient)
+
+
+# ============================================================================
+# КЭШ СКОРОСТЕЙ КОРРОЗИИ
+# ============================================================================
+
+# Ограниченный LRU-кэш скоростей; сбрасывается при изменении любой из таблиц
+RATE_CACHE = RateCache(maxsize=4096, tables=(
+    PROTECTION_TYPES, PIPELINE_LOCATION, SPECIAL_COEFFICIENTS,
+    MATERIAL_FACTORS, REGION_AGGRESSION, WATER_BODIES))
+
+
+def _fluid_cache_key(fluid_type, fluid_params):
+    """Нормализованная часть ключа по параметрам среды"""
+    return (fluid_type,
+            tuple(sorted((name, float(value)) for name, value in fluid_params.items())))
+
+
+def _component_cache_key(fluid_type, pipe_diameter, pipe_material, location,
+                         protection, environment, component_type, component_id,
+                         object_type):
+    """
+    Нормализованная часть ключа по компоненту
     
-    return 1.0
+    Диаметр влияет только на скорость потока нефти, материал сравнивается
+    без учёта регистра (как в get_material_factor).
+    """
+    diameter = float(pipe_diameter) if fluid_type == "oil" else 0.0
+    return (diameter, pipe_material.upper(), location, protection, environment,
+            component_type, component_id, object_type)
+
+
+def get_rate_cache_stats():
+    """Счётчики попаданий/промахов кэша скоростей коррозии"""
+    return RATE_CACHE.stats()
+
+
+def clear_rate_cache():
+    """Принудительно очищает кэш скоростей коррозии"""
+    RATE_CACHE.clear()
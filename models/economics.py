@@ -1,4 +1,16 @@
 """Экономические расчёты для трубопровода"""
+from collections import OrderedDict
+
+import numpy as np
+
+from .corrosion import CORROSION_LEVEL_NAMES, get_corrosion_level_indices
+from .project import mark_project_changed
+from .results import (
+    get_component_remaining,
+    get_initial_thickness,
+    get_section_remaining,
+    get_section_revision
+)
 
 ECONOMIC_PARAMS = {
     "работа_руб_час": 1500,
@@ -78,166 +90,394 @@ ECONOMIC_PARAMS = {
     }
 }
 
+# Ревизия цен: номер последнего изменения ECONOMIC_PARAMS
+_prices = {"revision": 0}
+
+def mark_prices_changed():
+    """Отмечает изменение ECONOMIC_PARAMS (вызывается после их правки)"""
+    _prices["revision"] = mark_project_changed()
+
+def get_prices_revision():
+    """Номер последнего изменения цен"""
+    return _prices["revision"]
+
+# Поля сводки, возвращаемые get_economic_summary
+ECONOMIC_SUMMARY_KEYS = ("urgent_repair_cost", "planned_repair_cost", "total_repair_cost",
+                         "urgent_count", "planned_count")
+
 def get_economic_summary(sections_data):
-    """Сводная экономическая статистика по всем участкам"""
-    urgent_repair = 0
-    planned_repair = 0
-    urgent_count = 0
-    planned_count = 0
-    
-    for section in sections_data:
-        # Определяем состояние участка
-        is_complex = section.get("is_complex", False)
-        
-        if is_complex:
-            # Для комплексных участков определяем состояние по худшему компоненту
-            components = section.get("components", [])
-            if components:
-                from .corrosion import get_corrosion_level
-                worst_level = "отличное"
-                for comp in components:
-                    remaining = comp.get("remaining", 
-                                       comp.get("thickness", 
-                                              comp.get("wall_thickness", 10)))
-                    level, _ = get_corrosion_level(remaining)
-                    # Приоритет состояний: аварийное (0), плохое (1), и т.д.
-                    priority = {"аварийное": 0, "плохое": 1, "удовлетворительное": 2, 
-                               "хорошее": 3, "отличное": 4}
-                    if priority.get(level, 5) < priority.get(worst_level, 5):
-                        worst_level = level
-                section["corrosion_level"] = worst_level
-            else:
-                section["corrosion_level"] = "удовлетворительное"
-        else:
-            # Для простых участков определяем уровень коррозии
-            remaining = section.get("remaining_thickness", section.get("thickness", 10))
-            from .corrosion import get_corrosion_level
-            level, _ = get_corrosion_level(remaining)
-            section["corrosion_level"] = level
-        
-        # Расчёт стоимости
-        cost, method = calculate_repair_cost_detailed(section)
-        
-        # Учёт комплексности
-        if is_complex:
-            components_count = len(section.get("components", []))
-            cost *= min(2.0, 1.0 + (components_count * 0.1))
-        
-        # Распределение по срочности
-        urgency = section.get("corrosion_level", "удовлетворительное")
-        
-        if urgency in ["плохое", "аварийное"]:
-            urgent_repair += cost
-            urgent_count += 1
-        else:
-            planned_repair += cost  
-            planned_count += 1
-    
-    return {
-        "urgent_repair_cost": round(urgent_repair),
-        "planned_repair_cost": round(planned_repair),
-        "total_repair_cost": round(urgent_repair + planned_repair),
-        "urgent_count": urgent_count,
-        "planned_count": planned_count
-    }
+    """
+    Сводная экономическая статистика по всем участкам
+
+    Берётся из общей сводки по участкам (models.fleet), которая
+    пересчитывается только после изменения участков или цен.
+    """
+    from .fleet import get_fleet_summary
+
+    summary = get_fleet_summary(sections_data)
+    return {key: summary[key] for key in ECONOMIC_SUMMARY_KEYS}
+
+def get_component_state(component, remaining=None):
+    """
+    Определяет состояние компонента по остаточной толщине
 
-def get_component_state(component):
-    """Определяет состояние компонента по остаточной толщине"""
+    remaining - остаточная толщина из хранилища результатов
+    (models.results); если не передана, используется исходная толщина
+    """
     from models.corrosion import get_corrosion_level
     
-    # Получаем остаточную толщину
-    remaining = component.get("remaining")
     if remaining is None:
-        # Если нет остаточной, используем текущую толщину
-        remaining = component.get("thickness", component.get("wall_thickness", 10))
+        remaining = get_initial_thickness(component)
     
     # Используем существующую функцию определения уровня коррозии
     level, _ = get_corrosion_level(remaining)
     return level
 
-def calculate_component_repair_cost(component, section_params):
-    """РАСЧЁТ СТОИМОСТИ РЕМОНТА КОМПОНЕНТА С УЧЁТОМ СОСТОЯНИЯ"""
-    
-    # 1. Определяем состояние компонента
-    state = get_component_state(component)
-    
-    # 2. Получаем базовые параметры компонента
-    comp_type = component.get("component_type", "pipe")
-    diameter = component.get("diameter", 100)
-    length = component.get("length", 1)
-    thickness = component.get("thickness", component.get("wall_thickness", 10))
-    material = component.get("material", "Ст20")
-    
-    # 3. Получаем параметры участка
-    location = section_params.get("location", "надземная")
-    protection = section_params.get("protection", "без защиты")
-    environment = section_params.get("environment", "Поволжье")
-    
-    # 4. Коэффициенты из экономических параметров
-    state_params = ECONOMIC_PARAMS["коэффициенты_состояния"].get(state, 
-        {"коэффициент": 1.0, "метод": "ремонт", "часы_на_м": 2.0})
-    
-    urgency_mult = ECONOMIC_PARAMS["коэффициенты_срочности"].get(state, 1.0)
-    location_mult = ECONOMIC_PARAMS["сложность_ремонта"].get(location, 1.0)
-    region_mult = ECONOMIC_PARAMS["региональные_коэффициенты"].get(environment, 1.0)
-    
-    # 5. Расчёт трудозатрат
-    if comp_type == "pipe":
-        base_hours = state_params["часы_на_м"] * length
-    elif comp_type in ["valve", "flange", "tee"]:
-        base_hours = state_params["часы_на_м"] * (diameter / 100) * 2
-    else:
-        base_hours = 8  # минимальные трудозатраты для неизвестных компонентов
-    
-    labor_hours = base_hours * location_mult
-    labor_cost = labor_hours * ECONOMIC_PARAMS["работа_руб_час"] * urgency_mult
-    
-    # 6. Расчёт стоимости материалов
-    material_price = ECONOMIC_PARAMS["стоимость_материалов"].get(material, 50000)
-    
-    if comp_type == "pipe":
-        # Для труб считаем вес
-        volume = 3.14159 * (diameter/1000) * (thickness/1000) * length  # м³
-        weight = volume * 7850  # кг (плотность стали)
-        material_cost = (weight / 1000) * material_price * state_params["коэффициент"]
-    else:
-        # Для фитингов - упрощённый расчёт
-        material_cost = diameter * 10 * material_price / 1000 * state_params["коэффициент"]
-    
-    # 7. Стоимость покрытия (если нужно восстановление)
-    protection_cost = 0
-    if state in ["плохое", "аварийное"] or protection == "без защиты":
-        protection_price = ECONOMIC_PARAMS["стоимость_покрытий"].get(protection, 0)
-        if protection_price > 0:
-            area = 3.14159 * diameter * length / 1000  # м²
-            protection_cost = area * protection_price * 1.5  # +50% за восстановление
-    
-    # 8. Транспорт и логистика
-    transport_cost = length * 0.001 * ECONOMIC_PARAMS["транспорт_руб_км"] * region_mult
-    
-    # 9. Накладные расходы
+# ============================================================================
+# ПАКЕТНЫЙ РАСЧЁТ СТОИМОСТИ КОМПОНЕНТОВ
+# ============================================================================
+
+# Типы компонентов в расчёте трудозатрат и материалов
+COMPONENT_PIPE = 0
+COMPONENT_FITTING = 1
+COMPONENT_OTHER = 2
+FITTING_TYPES = ("valve", "flange", "tee")
+
+# Коэффициенты состояния, отсутствующего в ECONOMIC_PARAMS
+DEFAULT_STATE_PARAMS = {"коэффициент": 1.0, "метод": "ремонт", "часы_на_м": 2.0}
+
+# Состояния, при которых покрытие восстанавливается в любом случае
+PROTECTION_RESTORE_STATES = ("плохое", "аварийное")
+
+# Составляющие стоимости, которые возвращает calculate_component_costs
+COST_FIELDS = ("labor_hours", "labor_cost", "material_cost", "protection_cost",
+               "transport_cost", "overhead", "total_cost")
+
+# Не больше стольких участков в кэше стоимостей (самые давние вытесняются)
+SECTION_COSTS_CACHE_SIZE = 4096
+
+# Метод ремонта сложного участка по худшему состоянию компонентов
+SECTION_REPAIR_METHODS = {
+    "аварийное": "экстренный_комплексный_ремонт",
+    "плохое": "комплексный_ремонт",
+    "удовлетворительное": "плановый_ремонт",
+    "хорошее": "техническое_обслуживание",
+    "отличное": "диагностика"
+}
+
+class CostTables:
+    """
+    Коэффициенты ECONOMIC_PARAMS, подготовленные для пакетного расчёта
+
+    Коэффициенты состояния - массивы по индексу уровня коррозии
+    (CORROSION_LEVEL_NAMES), цены и коэффициенты участка - плоские словари.
+    revision - ревизия цен (get_prices_revision): таблицы и посчитанные
+    по ним стоимости действительны, пока она не изменилась.
+    """
+
+    def __init__(self, params, revision=0):
+        self.revision = revision
+        self.labor_rate = params["работа_руб_час"]
+        self.transport_rate = params["транспорт_руб_км"]
+        self.overhead_percent = params["накладные_процент"]
+        self.material_prices = dict(params["стоимость_материалов"])
+        self.protection_prices = dict(params["стоимость_покрытий"])
+        self.location_multipliers = dict(params["сложность_ремонта"])
+        self.region_multipliers = dict(params["региональные_коэффициенты"])
+
+        states = [params["коэффициенты_состояния"].get(level, DEFAULT_STATE_PARAMS)
+                  for level in CORROSION_LEVEL_NAMES]
+        self.state_coefficients = np.array([state["коэффициент"] for state in states], dtype=float)
+        self.hours_per_m = np.array([state["часы_на_м"] for state in states], dtype=float)
+        self.methods = [state["метод"] for state in states]
+        self.urgency_multipliers = np.array(
+            [params["коэффициенты_срочности"].get(level, 1.0) for level in CORROSION_LEVEL_NAMES],
+            dtype=float)
+        self.restore_protection = np.array(
+            [level in PROTECTION_RESTORE_STATES for level in CORROSION_LEVEL_NAMES])
+
+_cost_tables = [None]
+
+def get_cost_tables():
+    """Таблицы коэффициентов по текущим ECONOMIC_PARAMS (пересоздаются после mark_prices_changed)"""
+    tables = _cost_tables[0]
+    revision = get_prices_revision()
+    if tables is None or tables.revision != revision:
+        tables = _cost_tables[0] = CostTables(ECONOMIC_PARAMS, revision)
+    return tables
+
+def get_cost_columns(rows, tables):
+    """
+    Столбцы исходных данных для calculate_component_costs
+
+    rows - список (компонент, параметры участка, остаточная толщина или None).
+    Строковые параметры (тип, материал, защита, прокладка, регион) здесь же
+    заменяются кодами и множителями из таблиц.
+    """
+    component_types = []
+    diameters = []
+    lengths = []
+    thicknesses = []
+    remaining = []
+    material_prices = []
+    protection_prices = []
+    unprotected = []
+    location_multipliers = []
+    region_multipliers = []
+
+    for component, section_params, component_remaining in rows:
+        comp_type = component.get("component_type", "pipe")
+        if comp_type == "pipe":
+            component_types.append(COMPONENT_PIPE)
+        elif comp_type in FITTING_TYPES:
+            component_types.append(COMPONENT_FITTING)
+        else:
+            component_types.append(COMPONENT_OTHER)
+
+        thickness = component.get("thickness", component.get("wall_thickness", 10))
+        diameters.append(component.get("diameter", 100))
+        lengths.append(component.get("length", 1))
+        thicknesses.append(thickness)
+        remaining.append(get_initial_thickness(component)
+                         if component_remaining is None else component_remaining)
+        material_prices.append(tables.material_prices.get(component.get("material", "Ст20"), 50000))
+
+        protection = section_params.get("protection", "без защиты")
+        protection_prices.append(tables.protection_prices.get(protection, 0))
+        unprotected.append(protection == "без защиты")
+        location_multipliers.append(
+            tables.location_multipliers.get(section_params.get("location", "надземная"), 1.0))
+        region_multipliers.append(
+            tables.region_multipliers.get(section_params.get("environment", "Поволжье"), 1.0))
+
+    return {
+        "component_type": np.array(component_types, dtype=np.int8),
+        "diameter": np.array(diameters, dtype=float),
+        "length": np.array(lengths, dtype=float),
+        "thickness": np.array(thicknesses, dtype=float),
+        "state": get_corrosion_level_indices(np.array(remaining, dtype=float)),
+        "material_price": np.array(material_prices, dtype=float),
+        "protection_price": np.array(protection_prices, dtype=float),
+        "unprotected": np.array(unprotected, dtype=bool),
+        "location_multiplier": np.array(location_multipliers, dtype=float),
+        "region_multiplier": np.array(region_multipliers, dtype=float)
+    }
+
+def calculate_component_costs(columns, tables):
+    """
+    Стоимость ремонта компонентов по столбцам (get_cost_columns)
+
+    Формулы те же, что в calculate_component_repair_cost, но считаются
+    сразу для всех строк.
+
+    Returns:
+    --------
+    dict: COST_FIELDS -> массив по строкам (без округления)
+    """
+    state = columns["state"]
+    diameter = columns["diameter"]
+    length = columns["length"]
+    is_pipe = columns["component_type"] == COMPONENT_PIPE
+    is_fitting = columns["component_type"] == COMPONENT_FITTING
+    hours_per_m = tables.hours_per_m[state]
+    state_coefficient = tables.state_coefficients[state]
+
+    # Трудозатраты: трубы - по длине, фитинги - по диаметру, прочее - минимум
+    base_hours = np.where(is_pipe, hours_per_m * length,
+                          np.where(is_fitting, hours_per_m * (diameter / 100) * 2, 8.0))
+    labor_hours = base_hours * columns["location_multiplier"]
+    labor_cost = labor_hours * tables.labor_rate * tables.urgency_multipliers[state]
+
+    # Материалы: для труб по весу стали, для фитингов упрощённо
+    volume = 3.14159 * (diameter / 1000) * (columns["thickness"] / 1000) * length
+    weight = volume * 7850
+    material_price = columns["material_price"]
+    material_cost = np.where(is_pipe,
+                             (weight / 1000) * material_price * state_coefficient,
+                             diameter * 10 * material_price / 1000 * state_coefficient)
+
+    # Покрытие (+50% за восстановление)
+    protection_price = columns["protection_price"]
+    restore = (tables.restore_protection[state] | columns["unprotected"]) & (protection_price > 0)
+    area = 3.14159 * diameter * length / 1000
+    protection_cost = np.where(restore, area * protection_price * 1.5, 0.0)
+
+    transport_cost = length * 0.001 * tables.transport_rate * columns["region_multiplier"]
+
     subtotal = labor_cost + material_cost + protection_cost + transport_cost
-    overhead = subtotal * (ECONOMIC_PARAMS["накладные_процент"] / 100)
-    
-    # 10. Итоговая стоимость
-    total_cost = subtotal + overhead
-    
+    overhead = subtotal * (tables.overhead_percent / 100)
+
     return {
-        "total_cost": round(total_cost),
-        "state": state,
-        "repair_method": state_params["метод"],
-        "labor_hours": round(labor_hours, 1),
-        "labor_cost": round(labor_cost),
-        "material_cost": round(material_cost),
-        "protection_cost": round(protection_cost),
-        "transport_cost": round(transport_cost),
-        "overhead": round(overhead),
-        "state_coefficient": state_params["коэффициент"],
-        "urgency_multiplier": urgency_mult,
-        "location_multiplier": location_mult,
-        "region_multiplier": region_mult
+        "labor_hours": labor_hours,
+        "labor_cost": labor_cost,
+        "material_cost": material_cost,
+        "protection_cost": protection_cost,
+        "transport_cost": transport_cost,
+        "overhead": overhead,
+        "total_cost": subtotal + overhead
+    }
+
+class SectionCosts:
+    """
+    Стоимости ремонта компонентов участка
+
+    Участок занимает строки start:stop общих столбцов columns
+    (get_cost_columns) и стоимостей costs (COST_FIELDS -> массив),
+    округлённых так же, как в calculate_component_repair_cost
+    (labor_hours - до 0.1, остальное - до рубля); у простого участка
+    одна строка. Массивы общие для всех участков пакета и пользователей
+    кэша и не должны изменяться.
+    """
+
+    __slots__ = ("is_complex", "columns", "costs", "tables", "start", "stop")
+
+    def __init__(self, is_complex, columns, costs, tables, start=0, stop=None):
+        self.is_complex = is_complex
+        self.columns = columns
+        self.costs = costs
+        self.tables = tables
+        self.start = start
+        self.stop = len(columns["state"]) if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def get_worst_state(self):
+        """Худшее состояние компонентов или None, если их нет"""
+        if self.stop == self.start:
+            return None
+        return CORROSION_LEVEL_NAMES[self.columns["state"][self.start:self.stop].max()]
+
+    def get_total(self, field):
+        """Сумма округлённых значений по компонентам"""
+        total = self.costs[field][self.start:self.stop].sum()
+        return float(total) if field == "labor_hours" else int(total)
+
+    def get_component_result(self, index):
+        """Результат в формате calculate_component_repair_cost"""
+        row = self.start + index
+        state = self.columns["state"][row]
+        costs = self.costs
+        return {
+            "total_cost": int(costs["total_cost"][row]),
+            "state": CORROSION_LEVEL_NAMES[state],
+            "repair_method": self.tables.methods[state],
+            "labor_hours": float(costs["labor_hours"][row]),
+            "labor_cost": int(costs["labor_cost"][row]),
+            "material_cost": int(costs["material_cost"][row]),
+            "protection_cost": int(costs["protection_cost"][row]),
+            "transport_cost": int(costs["transport_cost"][row]),
+            "overhead": int(costs["overhead"][row]),
+            "state_coefficient": float(self.tables.state_coefficients[state]),
+            "urgency_multiplier": float(self.tables.urgency_multipliers[state]),
+            "location_multiplier": float(self.columns["location_multiplier"][row]),
+            "region_multiplier": float(self.columns["region_multiplier"][row])
+        }
+
+    def get_repair_cost(self):
+        """Стоимость и метод ремонта участка (как calculate_repair_cost_detailed)"""
+        if not self.is_complex:
+            return self.get_total("total_cost"), self.tables.methods[self.columns["state"][self.start]]
+        worst_state = self.get_worst_state()
+        if worst_state is None:
+            return 0, "техническое_обслуживание"
+        return self.get_total("total_cost"), SECTION_REPAIR_METHODS.get(worst_state, "ремонт")
+
+def round_costs(costs):
+    """Округление составляющих стоимости, как в calculate_component_repair_cost"""
+    rounded = {field: np.round(values) for field, values in costs.items()}
+    # np.round до десятых иногда расходится с round() в последнем знаке
+    rounded["labor_hours"] = np.array([round(hours, 1) for hours in costs["labor_hours"].tolist()])
+    return rounded
+
+def get_simple_section_component(section):
+    """Простой участок как трубный компонент для расчёта стоимости"""
+    return {
+        "component_type": "pipe",
+        "diameter": section.get("diameter", 500),
+        "length": section.get("length", 100),
+        "thickness": section.get("thickness", 10),
+        "wall_thickness": section.get("thickness", 10),
+        "material": section.get("material", "Ст20")
     }
 
+def get_section_cost_rows(section):
+    """Строки (компонент, участок, остаточная толщина) для расчёта участка"""
+    if not section.get("is_complex", False):
+        return [(get_simple_section_component(section), section, get_section_remaining(section))]
+    return [(component, section, get_component_remaining(section, component, index))
+            for index, component in enumerate(section.get("components", []))]
+
+_section_costs = OrderedDict()   # (ревизия участка, ревизия цен) -> SectionCosts
+
+def calculate_sections_costs(sections_data, tables=None):
+    """
+    Стоимости компонентов (SectionCosts) для списка участков без кэша
+
+    Компоненты всех участков считаются одним вызовом calculate_component_costs.
+    """
+    if tables is None:
+        tables = get_cost_tables()
+
+    rows = []
+    bounds = []
+    for section in sections_data:
+        start = len(rows)
+        rows.extend(get_section_cost_rows(section))
+        bounds.append((start, len(rows)))
+
+    columns = get_cost_columns(rows, tables)
+    costs = round_costs(calculate_component_costs(columns, tables))
+    return [SectionCosts(section.get("is_complex", False), columns, costs, tables, start, stop)
+            for section, (start, stop) in zip(sections_data, bounds)]
+
+def get_sections_costs(sections_data):
+    """
+    Стоимости компонентов (SectionCosts) для списка участков с кэшем
+
+    Стоимости запоминаются по ревизии участка (get_section_revision)
+    и ревизии цен: повторный запрос после изменения одного участка
+    пересчитывает только его.
+    """
+    tables = get_cost_tables()
+    keys = [(get_section_revision(section), tables.revision) for section in sections_data]
+    result = [_section_costs.get(key) for key in keys]
+
+    missing = [index for index, section_costs in enumerate(result) if section_costs is None]
+    for index, section_costs in enumerate(result):
+        if section_costs is not None:
+            _section_costs.move_to_end(keys[index])
+
+    if missing:
+        calculated = calculate_sections_costs([sections_data[index] for index in missing], tables)
+        for index, section_costs in zip(missing, calculated):
+            result[index] = _section_costs[keys[index]] = section_costs
+        while len(_section_costs) > SECTION_COSTS_CACHE_SIZE:
+            _section_costs.popitem(last=False)
+
+    return result
+
+def get_section_costs(section):
+    """Стоимости компонентов одного участка (см. get_sections_costs)"""
+    return get_sections_costs([section])[0]
+
+def get_component_repair_costs(section):
+    """Результаты calculate_component_repair_cost для всех компонентов участка"""
+    if not section.get("is_complex", False):
+        # Простой участок считается как одна труба, а не по компонентам
+        return [calculate_component_repair_cost(component, section,
+                                                get_component_remaining(section, component, index))
+                for index, component in enumerate(section.get("components", []))]
+    section_costs = get_section_costs(section)
+    return [section_costs.get_component_result(index) for index in range(len(section_costs))]
+
+def calculate_component_repair_cost(component, section_params, remaining=None):
+    """РАСЧЁТ СТОИМОСТИ РЕМОНТА КОМПОНЕНТА С УЧЁТОМ СОСТОЯНИЯ"""
+    tables = get_cost_tables()
+    columns = get_cost_columns([(component, section_params, remaining)], tables)
+    costs = round_costs(calculate_component_costs(columns, tables))
+    return SectionCosts(True, columns, costs, tables).get_component_result(0)
+
 def get_section_display_params(section):
     """Получает параметры для отображения с учётом ВСЕХ компонентов"""
     is_complex = section.get("is_complex", False)
@@ -306,69 +546,18 @@ def get_section_display_params(section):
 
 def calculate_repair_cost_detailed(section):
     """Детальный расчет стоимости участка с учётом ВСЕХ компонентов"""
-    is_complex = section.get("is_complex", False)
-    
-    if not is_complex:
-        # Простой участок - считаем как компонент
-        component_data = {
-            "component_type": "pipe",
-            "diameter": section.get("diameter", 500),
-            "length": section.get("length", 100),
-            "thickness": section.get("thickness", 10),
-            "wall_thickness": section.get("thickness", 10),
-            "material": section.get("material", "Ст20"),
-            "remaining": section.get("remaining_thickness", section.get("thickness", 10))
-        }
-        result = calculate_component_repair_cost(component_data, section)
-        return result["total_cost"], result["repair_method"]
-    
-    # СЛОЖНЫЙ УЧАСТОК: суммируем стоимость всех компонентов
-    components = section.get("components", [])
-    if not components:
-        return 0, "техническое_обслуживание"
-    
-    total_cost = 0
-    component_states = []
-    
-    for component in components:
-        comp_result = calculate_component_repair_cost(component, section)
-        total_cost += comp_result["total_cost"]
-        component_states.append(comp_result["state"])
-    
-    # Определяем общий метод ремонта по худшему состоянию
-    state_priority = {"аварийное": 0, "плохое": 1, "удовлетворительное": 2, "хорошее": 3, "отличное": 4}
-    worst_state = min(component_states, key=lambda x: state_priority.get(x, 5))
-    
-    # Метод ремонта в зависимости от худшего состояния
-    state_to_method = {
-        "аварийное": "экстренный_комплексный_ремонт",
-        "плохое": "комплексный_ремонт",
-        "удовлетворительное": "плановый_ремонт",
-        "хорошее": "техническое_обслуживание",
-        "отличное": "диагностика"
-    }
-    
-    repair_method = state_to_method.get(worst_state, "ремонт")
-    
-    return round(total_cost), repair_method
+    return get_section_costs(section).get_repair_cost()
 
 def calculate_detailed_repair_costs(section):
     """Детальный расчет всех составляющих стоимости ремонта участка"""
     is_complex = section.get("is_complex", False)
     
+    section_costs = get_section_costs(section)
+    
     if not is_complex:
-        # Для простых участков используем функцию компонента
-        component_data = {
-            "component_type": "pipe",
-            "diameter": section.get("diameter", 500),
-            "length": section.get("length", 100),
-            "thickness": section.get("thickness", 10),
-            "wall_thickness": section.get("thickness", 10),
-            "material": section.get("material", "Ст20"),
-            "remaining": section.get("remaining_thickness", section.get("thickness", 10))
-        }
-        
-        result = calculate_component_repair_cost(component_data, section)
+        # Для простых участков - результат единственного компонента
+        component_data = get_simple_section_component(section)
+        result = section_costs.get_component_result(0)
         
         # Добавляем параметры для совместимости
         result.update({
@@ -400,26 +589,14 @@ def calculate_detailed_repair_costs(section):
     # СЛОЖНЫЙ УЧАСТОК: агрегируем данные всех компонентов
     components = section.get("components", [])
     
-    total_labor_hours = 0
-    total_labor_cost = 0
-    total_material_cost = 0
-    total_protection_cost = 0
-    total_transport_cost = 0
-    component_states = []
-    
-    for component in components:
-        comp_result = calculate_component_repair_cost(component, section)
-        
-        total_labor_hours += comp_result["labor_hours"]
-        total_labor_cost += comp_result["labor_cost"]
-        total_material_cost += comp_result["material_cost"]
-        total_protection_cost += comp_result.get("protection_cost", 0)
-        total_transport_cost += comp_result["transport_cost"]
-        component_states.append(comp_result["state"])
+    total_labor_hours = section_costs.get_total("labor_hours")
+    total_labor_cost = section_costs.get_total("labor_cost")
+    total_material_cost = section_costs.get_total("material_cost")
+    total_protection_cost = section_costs.get_total("protection_cost")
+    total_transport_cost = section_costs.get_total("transport_cost")
     
     # Определяем общее состояние
-    state_priority = {"аварийное": 0, "плохое": 1, "удовлетворительное": 2, "хорошее": 3, "отличное": 4}
-    worst_state = min(component_states, key=lambda x: state_priority.get(x, 5))
+    worst_state = section_costs.get_worst_state()
     
     # Суммируем субтотал
     subtotal = total_labor_cost + total_material_cost + total_protection_cost + total_transport_cost
@@ -442,14 +619,7 @@ def calculate_detailed_repair_costs(section):
     total_cost = total_before_overhead + overhead_cost
     
     # Определяем метод ремонта
-    state_to_method = {
-        "аварийное": "экстренный_комплексный_ремонт",
-        "плохое": "комплексный_ремонт",
-        "удовлетворительное": "плановый_ремонт",
-        "хорошее": "техническое_обслуживание",
-        "отличное": "диагностика"
-    }
-    repair_method = state_to_method.get(worst_state, "ремонт")
+    repair_method = SECTION_REPAIR_METHODS.get(worst_state, "ремонт")
     
     return {
         "repair_method": repair_method,
@@ -0,0 +1,190 @@
+"""
+Сводные показатели по всем участкам проекта
+
+Общий анализ, экономическая сводка и экспорт отчёта используют одни и
+те же итоги: состояние каждого участка, число компонентов по уровням
+коррозии, длины, стоимость ремонта и деление на срочный и плановый
+ремонт. Всё это считается за один проход по участкам (aggregate_sections),
+а get_fleet_summary запоминает результат до следующего изменения проекта:
+участков, их результатов расчёта или цен (ревизия models.project).
+"""
+from .economics import get_sections_costs
+from .project import get_project_revision
+from .results import (
+    get_component_level,
+    get_component_remaining,
+    get_section_level,
+    get_section_remaining
+)
+
+# Уровни коррозии от худшего к лучшему
+LEVELS = ("аварийное", "плохое", "удовлетворительное", "хорошее", "отличное")
+LEVEL_PRIORITY = {level: priority for priority, level in enumerate(LEVELS)}
+
+# Участки с этими уровнями требуют срочного ремонта
+URGENT_LEVELS = ("плохое", "аварийное")
+
+# Уровень сложного участка без компонентов
+EMPTY_SECTION_LEVEL = "удовлетворительное"
+
+
+def get_worst_level(levels, default="отличное"):
+    """Худший из уровней коррозии"""
+    return min(levels, key=lambda level: LEVEL_PRIORITY.get(level, len(LEVELS)), default=default)
+
+
+def get_complexity_factor(section):
+    """Надбавка к стоимости сложного участка за число компонентов"""
+    if not section.get("is_complex", False):
+        return 1.0
+    return min(2.0, 1.0 + len(section.get("components", [])) * 0.1)
+
+
+def aggregate_sections(sections_data):
+    """
+    Сводные показатели по участкам за один проход
+
+    Returns:
+    --------
+    dict:
+        section_count, component_count - участков и компонентов (у участков
+            с компонентами);
+        row_count - строк отчёта (компонент или простой участок);
+        section_levels - уровень каждого участка (худший компонент);
+        status_counts - участков с компонентами по уровням;
+        component_status_counts - компонентов по уровням;
+        worst_remaining - наименьшая остаточная толщина участка, мм
+            (None для сложного участка без компонентов);
+        section_lengths, total_length - длина участков (сумма трубных
+            компонентов для сложных), м;
+        avg_diameter, avg_thickness - средние по компонентам, мм;
+        section_costs, repair_methods - стоимость и метод ремонта участков;
+        urgent_sections - индексы участков для срочного ремонта;
+        urgent_repair_cost, planned_repair_cost, total_repair_cost,
+        urgent_count, planned_count - как в get_economic_summary
+    """
+    status_counts = dict.fromkeys(LEVELS, 0)
+    component_status_counts = dict.fromkeys(LEVELS, 0)
+    section_levels = []
+    worst_remaining = []
+    section_lengths = []
+    section_costs = []
+    repair_methods = []
+    urgent_sections = []
+    component_count = 0
+    row_count = 0
+    diameter_sum = diameter_count = 0
+    thickness_sum = thickness_count = 0
+    urgent_repair = planned_repair = 0
+    sections_costs = get_sections_costs(sections_data)
+
+    for section_index, section in enumerate(sections_data):
+        components = section.get("components", [])
+
+        if components:
+            levels = []
+            remaining = None
+            length = 0
+            for index, component in enumerate(components):
+                level = get_component_level(section, component, index)
+                component_status_counts[level] = component_status_counts.get(level, 0) + 1
+                levels.append(level)
+
+                component_remaining = get_component_remaining(section, component, index)
+                if remaining is None or component_remaining < remaining:
+                    remaining = component_remaining
+
+                if component.get("component_type") == "pipe":
+                    length += component.get("length", 0)
+                if component.get("diameter", 0) > 0:
+                    diameter_sum += component["diameter"]
+                    diameter_count += 1
+                thickness = component.get("thickness", 0) or component.get("wall_thickness", 0)
+                if thickness > 0:
+                    thickness_sum += thickness
+                    thickness_count += 1
+
+            worst_level = get_worst_level(levels)
+            status_counts[worst_level] = status_counts.get(worst_level, 0) + 1
+            component_count += len(components)
+            row_count += len(components)
+        else:
+            worst_level = get_section_level(section)
+            remaining = get_section_remaining(section, default=0)
+            length = section.get("length", 0)
+            if section.get("diameter", 0) > 0:
+                diameter_sum += section["diameter"]
+                diameter_count += 1
+            if section.get("thickness", 0) > 0:
+                thickness_sum += section["thickness"]
+                thickness_count += 1
+            row_count += 1
+
+        if section.get("is_complex", False):
+            level = worst_level if components else EMPTY_SECTION_LEVEL
+        else:
+            level = get_section_level(section) if components else worst_level
+
+        cost, method = sections_costs[section_index].get_repair_cost()
+        cost *= get_complexity_factor(section)
+
+        if level in URGENT_LEVELS:
+            urgent_repair += cost
+            urgent_sections.append(section_index)
+        else:
+            planned_repair += cost
+
+        section_levels.append(level)
+        worst_remaining.append(remaining)
+        section_lengths.append(length)
+        section_costs.append(cost)
+        repair_methods.append(method)
+
+    return {
+        "section_count": len(section_levels),
+        "component_count": component_count,
+        "row_count": row_count,
+        "section_levels": section_levels,
+        "status_counts": status_counts,
+        "component_status_counts": component_status_counts,
+        "worst_remaining": worst_remaining,
+        "section_lengths": section_lengths,
+        "total_length": sum(section_lengths),
+        "avg_diameter": diameter_sum / diameter_count if diameter_count else 0,
+        "avg_thickness": thickness_sum / thickness_count if thickness_count else 0,
+        "section_costs": section_costs,
+        "repair_methods": repair_methods,
+        "urgent_sections": urgent_sections,
+        "urgent_repair_cost": round(urgent_repair),
+        "planned_repair_cost": round(planned_repair),
+        "total_repair_cost": round(urgent_repair + planned_repair),
+        "urgent_count": len(urgent_sections),
+        "planned_count": len(section_levels) - len(urgent_sections)
+    }
+
+
+def get_fleet_key(sections_data):
+    """Ключ сводки: список участков и ревизия проекта; совпадает, пока сводка не устарела"""
+    return (id(sections_data), get_project_revision())
+
+
+# Список участков хранится вместе с ключом, чтобы его id не достался другому списку
+_summary = {"key": None, "sections": None, "value": None}
+
+
+def get_fleet_summary(sections_data):
+    """
+    Сводные показатели (aggregate_sections) с запоминанием
+
+    sections_data - список участков проекта (models.project.ProjectSections).
+    Сводка пересчитывается, только если с прошлого вызова изменилась
+    ревизия проекта: участки, их результаты расчёта или цены. Проверка -
+    O(1), участки при этом не перебираются. Возвращаемый словарь общий
+    для всех вызывающих и не должен изменяться.
+    """
+    key = get_fleet_key(sections_data)
+    if key != _summary["key"]:
+        _summary["value"] = aggregate_sections(sections_data)
+        _summary["key"] = key
+        _summary["sections"] = sections_data
+    return _summary["value"]
@@ -0,0 +1,89 @@
+"""
+Список участков проекта и счётчик его изменений
+
+Участки проекта - обычные словари в списке ProjectSections. Ревизия
+проекта (get_project_revision) меняется при любом изменении, от которого
+зависят сводки: добавлении, удалении и замене участков и изменении их
+результатов расчёта (models.results). Кэши сравнивают ревизию за O(1),
+не перебирая и не хэшируя участки. Изменённый участок не правится на
+месте, а заменяется новым словарём.
+"""
+import itertools
+
+# Номера ревизий не повторяются: по номеру можно кэшировать и после
+# удаления участка, чей id(...) может достаться новому словарю
+_revisions = itertools.count(1)
+_state = {"revision": 0}
+
+
+def new_revision():
+    """Новый уникальный номер ревизии (ревизия проекта не меняется)"""
+    return next(_revisions)
+
+
+def mark_project_changed():
+    """Отмечает изменение проекта; возвращает новый номер ревизии"""
+    revision = _state["revision"] = new_revision()
+    return revision
+
+
+def get_project_revision():
+    """Номер последнего изменения проекта"""
+    return _state["revision"]
+
+
+class ProjectSections(list):
+    """
+    Список участков проекта (обычный list словарей)
+
+    Добавление, удаление и замена участков меняют ревизию проекта.
+    """
+
+    def _touch(self):
+        mark_project_changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._touch()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._touch()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._touch()
+        return result
+
+    def append(self, section):
+        super().append(section)
+        self._touch()
+
+    def extend(self, sections):
+        super().extend(sections)
+        self._touch()
+
+    def insert(self, index, section):
+        super().insert(index, section)
+        self._touch()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._touch()
+        return result
+
+    def remove(self, section):
+        super().remove(section)
+        self._touch()
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._touch()
+
+    def reverse(self):
+        super().reverse()
+        self._touch()
@@ -1,6 +1,7 @@
 """Коэффициенты агрессивности среды по регионам"""
+from .cache import VersionedTable
 
-REGION_AGGRESSION = {
+REGION_AGGRESSION = VersionedTable({
     "Ямал/Арктика": 0.5,
     "Сибирь (тайга)": 2.5, 
     "Урал": 1.8,
@@ -9,9 +10,9 @@ REGION_AGGRESSION = {
     "Юг России": 1.7,
     "Дальний Восток": 2.2,
     "Болотные местности": 3.5
-}
+})
 
-WATER_BODIES = {
+WATER_BODIES = VersionedTable({
     # Моря
     "Балтийское море": 1.6,
     "Чёрное море": 1.9,
@@ -24,4 +25,4 @@ WATER_BODIES = {
     "Озёра": 1.1,
     "Водохранилища": 1.2,
     "Болота": 2.4
-}
+})
@@ -0,0 +1,395 @@
+"""
+План ремонтов по годам при ограниченном бюджете и времени простоя
+
+Кандидаты - все компоненты проекта (простой участок - один кандидат).
+Для каждого кандидата и каждого года горизонта считаются:
+- стоимость ремонта - формулы calculate_component_repair_cost для
+  прогнозного состояния в этом году (пакетный расчёт models.economics);
+- простой - трудозатраты этого ремонта, ч;
+- ценность - снижение ожидаемых потерь от отказов до конца горизонта
+  (после ремонта стенка восстанавливается до исходной толщины и дальше
+  корродирует с той же скоростью) за вычетом стоимости простоя
+  (ECONOMIC_PARAMS["простой_руб_час"]).
+
+Выбор ремонтов - многомерный рюкзак с выбором года: каждый компонент
+ремонтируется не больше одного раза, в каждом году - не больше бюджета
+и часов простоя. Он решается жадно по удельной ценности (на долю годового
+бюджета и часов, которую занимает ремонт) с уточнением по множителям
+лагранжиана; верхняя граница лагранжевой релаксации показывает, насколько
+план может уступать оптимальному. Расчёт векторный: десятки тысяч
+компонентов обрабатываются за секунды.
+"""
+import math
+
+import numpy as np
+
+from .calculation import MIN_REMAINING_THICKNESS, get_section_rows
+from .corrosion import CORROSION_LEVEL_NAMES, get_corrosion_level_indices, get_corrosion_rates
+from .economics import (
+    ECONOMIC_PARAMS,
+    calculate_component_costs,
+    get_cost_columns,
+    get_cost_tables,
+    get_section_cost_rows
+)
+from .results import get_section_results
+
+# Горизонт планирования по умолчанию, лет
+PLAN_HORIZON = 10
+
+# Вероятность отказа компонента за год по уровню коррозии
+# (оценка для ранжирования ремонтов, а не расчёт надёжности)
+FAILURE_PROBABILITY = {
+    "отличное": 0.001,
+    "хорошее": 0.005,
+    "удовлетворительное": 0.02,
+    "плохое": 0.1,
+    "аварийное": 0.3
+}
+
+# Уровень, по которому оценивается ремонт после отказа
+FAILURE_LEVEL = "аварийное"
+
+# Уточнений плана по множителям лагранжиана и итераций подбора
+# множителей в каждом уточнении
+BOUND_ROUNDS = 4
+BOUND_ITERATIONS = 25
+
+
+class RepairCandidates:
+    """
+    Кандидаты на ремонт: строки - компоненты, столбцы матриц - годы горизонта
+
+    rows - строки get_section_rows (участок, компонент, component_id);
+    levels - индексы уровней коррозии (CORROSION_LEVEL_NAMES) на начало
+    каждого года без ремонта; cost, hours, value - стоимость ремонта
+    в этом году, руб, простой, ч, и ценность ремонта, руб.
+    """
+
+    __slots__ = ("rows", "levels", "cost", "hours", "value")
+
+    def __init__(self, rows, levels, cost, hours, value):
+        self.rows = rows
+        self.levels = levels
+        self.cost = cost
+        self.hours = hours
+        self.value = value
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def horizon(self):
+        return self.cost.shape[1]
+
+
+def get_failure_probabilities():
+    """Вероятности отказа по индексу уровня коррозии"""
+    return np.array([FAILURE_PROBABILITY.get(level, 0.0) for level in CORROSION_LEVEL_NAMES])
+
+
+def get_level_costs(cost_rows, tables):
+    """
+    Стоимость и трудозатраты ремонта каждого компонента в каждом состоянии
+
+    Returns:
+    --------
+    (cost, hours) - матрицы (компонент, индекс уровня коррозии)
+    """
+    columns = get_cost_columns(cost_rows, tables)
+    cost = np.empty((len(cost_rows), len(CORROSION_LEVEL_NAMES)))
+    hours = np.empty_like(cost)
+    for level_index in range(len(CORROSION_LEVEL_NAMES)):
+        columns["state"] = np.full(len(cost_rows), level_index)
+        costs = calculate_component_costs(columns, tables)
+        cost[:, level_index] = np.round(costs["total_cost"])
+        hours[:, level_index] = costs["labor_hours"]
+    return cost, hours
+
+
+def get_repair_candidates(sections_data, fluid_type, fluid_params, horizon=PLAN_HORIZON):
+    """
+    Кандидаты на ремонт всех компонентов проекта на horizon лет вперёд
+
+    Остаточная толщина на сегодня берётся из результатов расчёта
+    (models.results), до расчёта - исходная; скорости коррозии - как
+    в IncrementalCalculator (get_corrosion_rates с параметрами среды проекта).
+    """
+    rows = []
+    cost_rows = []
+    for section in sections_data:
+        rows.extend(get_section_rows(section))
+        cost_rows.extend(get_section_cost_rows(section))
+
+    thickness = np.array([row["thickness"] for row in rows], dtype=float)
+    remaining = np.array([
+        get_section_results(row["section"]).get(row["component_id"], {}).get("remaining", row["thickness"])
+        for row in rows], dtype=float)
+    rates = get_corrosion_rates(fluid_type, fluid_params, rows) if rows else np.empty(0)
+
+    # Уровни без ремонта на начало каждого года и после ремонта через k лет
+    years = np.arange(horizon)
+    forecast = np.maximum(MIN_REMAINING_THICKNESS, remaining[:, None] - rates[:, None] * years)
+    restored = np.maximum(MIN_REMAINING_THICKNESS, thickness[:, None] - rates[:, None] * years)
+    levels = get_corrosion_level_indices(forecast.ravel()).reshape(forecast.shape)
+    restored_levels = get_corrosion_level_indices(restored.ravel()).reshape(restored.shape)
+
+    tables = get_cost_tables()
+    level_cost, level_hours = get_level_costs(cost_rows, tables)
+    cost = np.take_along_axis(level_cost, levels, axis=1)
+    hours = np.take_along_axis(level_hours, levels, axis=1)
+
+    # Потери от одного отказа: аварийный ремонт и простой на время ремонта
+    downtime_rate = ECONOMIC_PARAMS["простой_руб_час"]
+    failure_index = CORROSION_LEVEL_NAMES.index(FAILURE_LEVEL)
+    failure_loss = level_cost[:, failure_index] + level_hours[:, failure_index] * downtime_rate
+
+    # Ожидаемые отказы с года y до конца горизонта: без ремонта - хвост
+    # суммы по годам, с ремонтом в году y - первые horizon - y лет
+    # после восстановления
+    probabilities = get_failure_probabilities()
+    failures = probabilities[levels]
+    remaining_failures = np.cumsum(failures[:, ::-1], axis=1)[:, ::-1]
+    restored_failures = np.cumsum(probabilities[restored_levels], axis=1)[:, ::-1]
+    value = (remaining_failures - restored_failures) * failure_loss[:, None] - hours * downtime_rate
+
+    return RepairCandidates(rows, levels, cost, hours, value)
+
+
+def get_annual_limits(limit, horizon):
+    """Ограничение по годам: число (каждый год), последовательность или None (без ограничения)"""
+    if limit is None:
+        return np.full(horizon, math.inf)
+    if np.isscalar(limit):
+        return np.full(horizon, float(limit))
+    limits = np.asarray(limit, dtype=float)
+    if len(limits) != horizon:
+        raise ValueError(f"Ожидалось {horizon} годовых ограничений, получено {len(limits)}")
+    return limits
+
+
+class RepairProblem:
+    """
+    Задача выбора ремонтов: допустимые варианты (компонент, год)
+
+    Вариант допустим, если его ценность положительна и он один помещается
+    в ограничения своего года. Затраты вариантов хранятся и в долях
+    годовых ограничений (cost_share, hours_share; у неограниченного года - 0),
+    чтобы бюджет и часы простоя были соизмеримы.
+    """
+
+    def __init__(self, candidates, budgets, outage_limits):
+        self.size = len(candidates)
+        self.budgets = budgets
+        self.outage_limits = outage_limits
+        self.limited = np.concatenate([np.isfinite(budgets), np.isfinite(outage_limits)])
+
+        feasible = ((candidates.value > 0) & (candidates.cost <= budgets)
+                    & (candidates.hours <= outage_limits))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost_share = np.where(np.isfinite(budgets), candidates.cost / budgets, 0.0)
+            hours_share = np.where(np.isfinite(outage_limits), candidates.hours / outage_limits, 0.0)
+
+        # Матрицы (компонент, год) для подбора множителей
+        self.value_matrix = np.where(feasible, candidates.value, -math.inf)
+        self.cost_share_matrix = cost_share
+        self.hours_share_matrix = hours_share
+
+        # Списки допустимых вариантов для жадного выбора
+        self.rows, self.years = np.nonzero(feasible)
+        self.value = candidates.value[self.rows, self.years]
+        self.cost = candidates.cost[self.rows, self.years]
+        self.hours = candidates.hours[self.rows, self.years]
+        self.cost_share = cost_share[self.rows, self.years]
+        self.hours_share = hours_share[self.rows, self.years]
+
+    def schedule(self, score):
+        """
+        Жадный выбор вариантов по убыванию score
+
+        Вариант берётся, если компонент ещё не запланирован и вариант
+        помещается в остаток ограничений своего года.
+
+        Returns:
+        --------
+        (индексы выбранных вариантов, их суммарная ценность)
+        """
+        order = np.lexsort((self.years, -score))
+        budget_left = self.budgets.copy()
+        hours_left = self.outage_limits.copy()
+        scheduled = np.zeros(self.size, dtype=bool)
+        chosen = []
+        for index, row, year, cost, hours in zip(
+                order.tolist(), self.rows[order].tolist(), self.years[order].tolist(),
+                self.cost[order].tolist(), self.hours[order].tolist()):
+            if scheduled[row] or cost > budget_left[year] or hours > hours_left[year]:
+                continue
+            scheduled[row] = True
+            budget_left[year] -= cost
+            hours_left[year] -= hours
+            chosen.append(index)
+        return chosen, float(self.value[chosen].sum())
+
+    def get_score(self, multipliers):
+        """Удельная ценность вариантов за вычетом цены затрат (множители лагранжиана)"""
+        horizon = len(self.budgets)
+        reduced = (self.value - multipliers[:horizon][self.years] * self.cost_share
+                   - multipliers[horizon:][self.years] * self.hours_share)
+        return reduced / np.maximum(self.cost_share + self.hours_share, 1e-12)
+
+    def improve_multipliers(self, multipliers, lower_bound, iterations):
+        """
+        Субградиентный спуск для множителей годовых ограничений
+
+        При множителях (цене доли бюджета и часов каждого года) задача
+        распадается на компоненты: каждый ремонтируется в году с наибольшей
+        ценностью за вычетом цены затрат, если она положительна; сумма этих
+        величин и множителей - верхняя граница ценности плана. Шаг Поляка
+        направлен к lower_bound - ценности лучшего найденного плана.
+
+        Returns:
+        --------
+        (наименьшая граница, множители, на которых она получена)
+        """
+        horizon = len(self.budgets)
+        rows = np.arange(self.size)
+        best_bound, best_multipliers = math.inf, multipliers
+        for _ in range(iterations):
+            reduced = (self.value_matrix - multipliers[:horizon] * self.cost_share_matrix
+                       - multipliers[horizon:] * self.hours_share_matrix)
+            # Лучший положительный вариант каждого компонента
+            best_years = reduced.argmax(axis=1)
+            best = reduced[rows, best_years]
+            taken = best > 0
+            years = best_years[taken]
+
+            bound = float(multipliers.sum() + best[taken].sum())
+            if bound < best_bound:
+                best_bound, best_multipliers = bound, multipliers
+
+            # Субградиент: 1 минус занятая доля ограничения каждого года
+            used = np.concatenate([
+                np.bincount(years, self.cost_share_matrix[rows[taken], years], minlength=horizon),
+                np.bincount(years, self.hours_share_matrix[rows[taken], years], minlength=horizon)])
+            gradient = np.where(self.limited, 1.0 - used, 0.0)
+            norm = float(gradient @ gradient)
+            if norm == 0 or bound <= lower_bound:
+                break
+            multipliers = np.maximum(0.0, multipliers - (bound - lower_bound) / norm * gradient)
+        return best_bound, best_multipliers
+
+
+def optimize_repair_plan(candidates, annual_budget, annual_outage_hours=None):
+    """
+    Выбор ремонтов по годам с наибольшей суммарной ценностью
+
+    Первый план - лучший из жадных по ценности на долю годовых ограничений
+    и по ценности. Затем несколько раз уточняются множители лагранжиана
+    (верхняя граница) и строится жадный план по ценности за вычетом цены
+    затрат: он учитывает, что ремонт одних компонентов теряет ценность при
+    откладывании быстрее, чем других. Остаётся лучший план.
+
+    annual_budget, annual_outage_hours - годовые ограничения бюджета, руб,
+    и простоя, ч (см. get_annual_limits).
+
+    Returns:
+    --------
+    dict:
+        years - список по годам: year (1 - ближайший), items (выбранные
+            ремонты по убыванию ценности: section, component, component_id,
+            level, cost, hours, value), cost, hours, value, budget, outage_hours;
+        total_cost, total_hours, total_value - итоги плана;
+        upper_bound - верхняя граница ценности оптимального плана;
+        candidates, scheduled - число кандидатов и выбранных ремонтов
+    """
+    horizon = candidates.horizon
+    budgets = get_annual_limits(annual_budget, horizon)
+    outage_limits = get_annual_limits(annual_outage_hours, horizon)
+    problem = RepairProblem(candidates, budgets, outage_limits)
+
+    # Начальный план - лучший из жадных по удельной ценности и по ценности
+    # (второй выручает, когда дорогой ремонт ценнее нескольких дешёвых)
+    multipliers = np.zeros(2 * horizon)
+    chosen, plan_value = max(problem.schedule(problem.get_score(multipliers)),
+                             problem.schedule(problem.value), key=lambda plan: plan[1])
+    if problem.limited.any() and len(problem.value):
+        upper_bound = math.inf
+        for _ in range(BOUND_ROUNDS):
+            bound, multipliers = problem.improve_multipliers(multipliers, plan_value, BOUND_ITERATIONS)
+            upper_bound = min(upper_bound, bound)
+            if upper_bound <= plan_value:
+                break
+            round_chosen, round_value = problem.schedule(problem.get_score(multipliers))
+            if round_value > plan_value:
+                chosen, plan_value = round_chosen, round_value
+    else:
+        # Без ограничений жадный план берёт лучший вариант каждого компонента
+        upper_bound = plan_value
+    upper_bound = max(upper_bound, plan_value)
+
+    years = [{"year": year + 1, "items": [], "cost": 0.0, "hours": 0.0, "value": 0.0,
+              "budget": float(budgets[year]), "outage_hours": float(outage_limits[year])}
+             for year in range(horizon)]
+    for index in chosen:
+        row, year = int(problem.rows[index]), int(problem.years[index])
+        source = candidates.rows[row]
+        component = source["component"]
+        plan_year = years[year]
+        plan_year["items"].append({
+            "section": source["section"].get("name", ""),
+            "component": component.get("name", source["component_id"]) if component else source["section"].get("name", ""),
+            "component_id": source["component_id"],
+            "level": CORROSION_LEVEL_NAMES[candidates.levels[row, year]],
+            "cost": float(problem.cost[index]),
+            "hours": float(problem.hours[index]),
+            "value": float(problem.value[index])
+        })
+        plan_year["cost"] += float(problem.cost[index])
+        plan_year["hours"] += float(problem.hours[index])
+        plan_year["value"] += float(problem.value[index])
+
+    for plan_year in years:
+        plan_year["items"].sort(key=lambda item: item["value"], reverse=True)
+
+    return {
+        "years": years,
+        "total_cost": sum(plan_year["cost"] for plan_year in years),
+        "total_hours": sum(plan_year["hours"] for plan_year in years),
+        "total_value": sum(plan_year["value"] for plan_year in years),
+        "upper_bound": upper_bound,
+        "candidates": len(candidates),
+        "scheduled": len(chosen)
+    }
+
+
+def plan_repairs(sections_data, fluid_type, fluid_params, annual_budget,
+                 annual_outage_hours=None, horizon=PLAN_HORIZON):
+    """План ремонтов проекта (get_repair_candidates + optimize_repair_plan)"""
+    candidates = get_repair_candidates(sections_data, fluid_type, fluid_params, horizon)
+    return optimize_repair_plan(candidates, annual_budget, annual_outage_hours)
+
+
+def format_repair_plan(plan, max_items=20):
+    """Текстовый отчёт по плану: итоги и выбранные ремонты по годам"""
+    lines = [
+        "ПЛАН РЕМОНТОВ ПО ГОДАМ",
+        "=" * 50,
+        f"Кандидатов: {plan['candidates']}, запланировано ремонтов: {plan['scheduled']}",
+        f"Стоимость: {plan['total_cost']:,.0f} руб, простой: {plan['total_hours']:,.1f} ч",
+        f"Снижение риска: {plan['total_value']:,.0f} руб "
+        f"(верхняя граница {plan['upper_bound']:,.0f} руб)",
+        ""
+    ]
+    for plan_year in plan["years"]:
+        budget = "без ограничения" if math.isinf(plan_year["budget"]) else f"{plan_year['budget']:,.0f} руб"
+        outage = "без ограничения" if math.isinf(plan_year["outage_hours"]) else f"{plan_year['outage_hours']:,.1f} ч"
+        lines.append(f"Год {plan_year['year']}: ремонтов {len(plan_year['items'])}, "
+                     f"{plan_year['cost']:,.0f} руб из {budget}, "
+                     f"простой {plan_year['hours']:,.1f} ч из {outage}")
+        for item in plan_year["items"][:max_items]:
+            lines.append(f"   - {item['section']} / {item['component']} ({item['level']}): "
+                         f"{item['cost']:,.0f} руб, {item['hours']:,.1f} ч, "
+                         f"снижение риска {item['value']:,.0f} руб")
+        if len(plan_year["items"]) > max_items:
+            lines.append(f"   ... и ещё {len(plan_year['items']) - max_items}")
+    return "\n".join(lines)
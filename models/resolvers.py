@@ -0,0 +1,182 @@
+"""
+Предкомпилированные резолверы коэффициентов по справочным таблицам
+
+Таблица компилируется один раз в индекс точных совпадений и регулярное
+выражение-сопоставитель подстрок; результат для каждой строки кэшируется.
+При изменении таблицы (VersionedTable.revision) резолвер перекомпилируется.
+Семантика и порядок приоритетов совпадают с прежним перебором:
+побеждает первый по порядку таблицы ключ.
+"""
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+
+def _compile_alternation(keys):
+    """
+    Регулярка, находящая на каждой позиции первый (по порядку) ключ,
+    который с неё начинается; lookahead даёт и перекрывающиеся совпадения
+    """
+    if not keys:
+        return None
+    return re.compile("(?=(" + "|".join(re.escape(key) for key in keys) + "))")
+
+
+class _TableResolver:
+    """
+    Общая часть: отслеживание ревизии таблицы и кэш результатов
+
+    Подкласс определяет _resolve(*args) - расчёт значения без кэша.
+    """
+
+    def __init__(self, table, cache_size=4096):
+        self.table = table
+        self.cache_size = cache_size
+        self._revision = None
+        self._compile()
+
+    def _compile(self):
+        self._revision = getattr(self.table, "revision", None)
+        self._cached = lru_cache(maxsize=self.cache_size)(self._resolve)
+
+    def _ensure_compiled(self):
+        if getattr(self.table, "revision", None) != self._revision:
+            self._compile()
+
+    def register(self, key, value):
+        """Добавляет/заменяет запись таблицы во время работы"""
+        self.table[key] = value
+        self._compile()
+
+    def cache_info(self):
+        """Статистика кэша результатов (functools.lru_cache)"""
+        return self._cached.cache_info()
+
+
+class SubstringResolver(_TableResolver):
+    """
+    Значение первого ключа таблицы, входящего подстрокой во входную строку
+
+    Сравнение идёт после normalize (например, str.upper). Если ни один ключ
+    не найден, проверяются категории fallback: [(подстроки, значение), ...],
+    затем возвращается default.
+    """
+
+    def __init__(self, table, fallback=(), default=1.0, normalize=str.upper,
+                 cache_size=4096):
+        self.normalize = normalize
+        self.default = default
+        self._fallback = [(_compile_alternation([normalize(token) for token in tokens]), value)
+                          for tokens, value in fallback]
+        super().__init__(table, cache_size)
+
+    def _compile(self):
+        self._keys = []
+        self._values = []
+        seen = set()
+        for key, value in self.table.items():
+            normalized = self.normalize(key)
+            if normalized in seen:
+                continue  # более ранний ключ всё равно победит
+            seen.add(normalized)
+            self._keys.append(normalized)
+            self._values.append(value)
+        self._matcher = _compile_alternation(self._keys)
+        self._priority = {key: index for index, key in enumerate(self._keys)}
+        super()._compile()
+        # Точные совпадения: полный результат считается заранее
+        self._exact = {key: self._resolve(key) for key in self._keys}
+
+    def _first_contained(self, text):
+        """Индекс первого по порядку ключа, входящего в text, или None"""
+        if self._matcher is None:
+            return None
+        best = None
+        for match in self._matcher.finditer(text):
+            index = self._priority[match.group(1)]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return best
+
+    def _resolve(self, text):
+        index = self._first_contained(text)
+        if index is not None:
+            return self._values[index]
+        for pattern, value in self._fallback:
+            if pattern is not None and pattern.search(text):
+                return value
+        return self.default
+
+    def __call__(self, value):
+        self._ensure_compiled()
+        text = self.normalize(value)
+        result = self._exact.get(text)
+        if result is None:
+            result = self._cached(text)
+        return result
+
+
+class SpecialCoefficientResolver(_TableResolver):
+    """
+    Специальный коэффициент компонента по таблице SPECIAL_COEFFICIENTS
+
+    Приоритеты:
+    1. точное совпадение component_id;
+    2. для component_id, затем object_type - первый по порядку ключ таблицы,
+       который содержит искомую строку или сам в неё входит;
+    3. коэффициент по типу компонента (type_factors), иначе default.
+    """
+
+    SEPARATOR = "\x00"
+
+    def __init__(self, table, type_factors=None, default=1.0, cache_size=4096):
+        self.type_factors = type_factors or {}
+        self.default = default
+        super().__init__(table, cache_size)
+
+    def _compile(self):
+        self._keys = list(self.table)
+        self._values = [self.table[key] for key in self._keys]
+        self._priority = {key: index for index, key in enumerate(self._keys)}
+        # Все ключи одной строкой: поиск «ключ содержит строку» - один str.find
+        self._joined = self.SEPARATOR.join(self._keys)
+        self._starts = []
+        offset = 0
+        for key in self._keys:
+            self._starts.append(offset)
+            offset += len(key) + len(self.SEPARATOR)
+        self._matcher = _compile_alternation(self._keys)
+        super()._compile()
+
+    def _first_match(self, search_key):
+        """Индекс первого ключа таблицы, связанного с search_key подстрокой"""
+        best = None
+        if self.SEPARATOR not in search_key:
+            position = self._joined.find(search_key)
+            if position >= 0:
+                best = bisect_right(self._starts, position) - 1
+        if self._matcher is not None:
+            for match in self._matcher.finditer(search_key):
+                index = self._priority[match.group(1)]
+                if best is None or index < best:
+                    best = index
+        return best
+
+    def _resolve(self, component_type, component_id, object_type):
+        if component_id and component_id in self.table:
+            return self.table[component_id]
+
+        for search_key in (component_id, object_type):
+            if not search_key:
+                continue
+            index = self._first_match(search_key)
+            if index is not None:
+                return self._values[index]
+
+        return self.type_factors.get(component_type, self.default)
+
+    def __call__(self, component_type="", component_id="", object_type=""):
+        self._ensure_compiled()
+        return self._cached(component_type, component_id, object_type)
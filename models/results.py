@@ -0,0 +1,153 @@
+"""
+Хранилище результатов расчёта по участкам
+
+Результаты участка хранятся в section["results"] (SectionResults):
+component_id -> запись {"component_id", "remaining", "level"} с порядком
+первого добавления. Вкладки, 3D-просмотр, экономика и экспорт читают
+остаточную толщину и состояние только через функции этого модуля.
+
+У каждого участка есть номер ревизии (get_section_revision): он меняется
+при изменении результатов расчёта, а вместе с ним - и ревизия проекта
+(models.project). Поля участка и его компоненты на месте не меняются:
+изменённый участок - это новый словарь (без "results"), которым заменяют
+прежний в ProjectSections.
+"""
+from .corrosion import get_corrosion_level
+from .project import mark_project_changed, new_revision
+
+RESULTS_KEY = "results"
+
+# Толщина по умолчанию, если у компонента не указана ни thickness, ни wall_thickness
+DEFAULT_THICKNESS = 10.0
+
+
+def get_component_id(component, index):
+    """Идентификатор компонента участка (как в таблице расчёта)"""
+    return component.get("component_id", f"comp_{index}")
+
+
+def get_initial_thickness(item, default=DEFAULT_THICKNESS):
+    """Исходная толщина стенки компонента или простого участка"""
+    return item.get("thickness", item.get("wall_thickness", default))
+
+
+class SectionResults:
+    """Результаты расчёта участка с доступом по component_id за O(1)"""
+
+    def __init__(self):
+        self._records = {}
+        self.revision = new_revision()
+
+    def _touch(self):
+        self.revision = mark_project_changed()
+
+    def set(self, component_id, remaining, level):
+        """Записывает (или обновляет на месте) результат компонента"""
+        record = self._records.get(component_id)
+        if record is None:
+            self._records[component_id] = {
+                "component_id": component_id,
+                "remaining": remaining,
+                "level": level
+            }
+        elif record["remaining"] != remaining or record["level"] != level:
+            record["remaining"] = remaining
+            record["level"] = level
+        else:
+            return
+        self._touch()
+
+    def get(self, component_id, default=None):
+        return self._records.get(component_id, default)
+
+    def worst(self):
+        """Запись с наименьшей остаточной толщиной или None"""
+        if not self._records:
+            return None
+        return min(self._records.values(), key=lambda record: record["remaining"])
+
+    def clear(self):
+        if self._records:
+            self._records.clear()
+            self._touch()
+
+    def __contains__(self, component_id):
+        return component_id in self._records
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __len__(self):
+        return len(self._records)
+
+
+def get_section_results(section):
+    """Хранилище результатов участка (создаётся при первом обращении)"""
+    results = section.get(RESULTS_KEY)
+    if results is None:
+        results = section[RESULTS_KEY] = SectionResults()
+    return results
+
+
+def get_section_revision(section):
+    """Номер ревизии участка: меняется с его результатами расчёта"""
+    return get_section_results(section).revision
+
+
+# ============================================================================
+# ЧТЕНИЕ РЕЗУЛЬТАТОВ
+# ============================================================================
+
+def get_component_remaining(section, component, index, default=DEFAULT_THICKNESS):
+    """Остаточная толщина компонента; до расчёта - исходная толщина"""
+    record = get_section_results(section).get(get_component_id(component, index))
+    if record is not None:
+        return record["remaining"]
+    return get_initial_thickness(component, default)
+
+
+def get_component_level(section, component, index):
+    """Уровень коррозии компонента"""
+    record = get_section_results(section).get(get_component_id(component, index))
+    if record is not None:
+        return record["level"]
+    level, _ = get_corrosion_level(get_initial_thickness(component))
+    return level
+
+
+def get_section_remaining(section, default=DEFAULT_THICKNESS):
+    """Остаточная толщина простого участка; до расчёта - исходная толщина"""
+    record = get_section_results(section).get(section.get("component_id", ""))
+    if record is not None:
+        return record["remaining"]
+    return section.get("thickness", default)
+
+
+def get_section_level(section):
+    """Уровень коррозии простого участка"""
+    record = get_section_results(section).get(section.get("component_id", ""))
+    if record is not None:
+        return record["level"]
+    level, _ = get_corrosion_level(section.get("thickness", DEFAULT_THICKNESS))
+    return level
+
+
+def get_worst_remaining(section, default=DEFAULT_THICKNESS):
+    """
+    Наименьшая остаточная толщина участка
+
+    Для сложного участка - по результатам компонентов, а до расчёта -
+    по исходным толщинам; для простого - get_section_remaining.
+    """
+    if not section.get("is_complex", False):
+        return get_section_remaining(section, default)
+
+    worst = get_section_results(section).worst()
+    if worst is not None:
+        return worst["remaining"]
+
+    components = section.get("components", [])
+    if components:
+        return min(get_initial_thickness(comp) for comp in components)
+    return default
+
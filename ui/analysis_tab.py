@@ -2,9 +2,16 @@
 import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
+from PIL import Image, ImageTk
 import numpy as np
-from models.corrosion import calculate_corrosion_oil, calculate_corrosion_gas, get_corrosion_level
+import copy
+import hashlib
+import math
+from dataclasses import asdict
+from models.corrosion import forecast_corrosion, get_corrosion_level
+from models.pipeline_data import OilParameters, GasParameters
 from models.economics import (
     get_economic_summary,
     calculate_repair_cost,
@@ -12,101 +19,119 @@ from models.economics import (
     calculate_repair_cost_detailed,
     calculate_detailed_repair_costs,
     get_repair_method_info,
-    calculate_component_repair_cost
+    get_component_repair_costs,
+    get_prices_revision
 )
+from models.fleet import get_fleet_key, get_fleet_summary
+from models.results import (
+    RESULTS_KEY,
+    get_component_remaining,
+    get_section_revision
+)
+from utils.log import DIAGNOSTICS, get_logger
+from utils.plot_renderer import get_plot_renderer
 
-def create_corrosion_plot(parent_frame, section, fluid_type):
-    """График прогноза коррозии для ВСЕХ компонентов сложного участка"""
-    plot_frame = ttk.Frame(parent_frame)
-    plot_frame.pack(fill="x", pady=10)
+logger = get_logger(__name__)
+
+# Годы прогноза на графике коррозии участка
+PLOT_YEARS = tuple(range(0, 51, 5))
+
+# Опрос готовности картинки графика, мс
+PLOT_POLL_MS = 50
+
+def get_section_fluid_params(section, fluid_type):
+    """Параметры среды участка (со значениями по умолчанию)"""
+    defaults = asdict(OilParameters() if fluid_type == "oil" else GasParameters())
+    return {key: section.get(key, value) for key, value in defaults.items()}
+
+def get_plot_layout(n_components):
+    """Сетка подграфиков (строки, столбцы) и высота фигуры для числа компонентов"""
+    if n_components <= 3:
+        return 1, n_components, 4
+    elif n_components <= 6:
+        return 2, (n_components + 1) // 2, 7
+    else:
+        return 3, (n_components + 2) // 3, 10
+
+def forecast_components(section, fluid_type, years):
+    """Прогноз остаточной толщины каждого компонента участка на годы years"""
+    fluid_params = get_section_fluid_params(section, fluid_type)
+    forecasts = []
+    for component in section.get("components", []):
+        # Прогноз сразу на все годы (скорость считается один раз)
+        forecasts.append(forecast_corrosion(
+            fluid_type, fluid_params,
+            component.get("thickness", component.get("wall_thickness", 10)),
+            component.get("diameter", 100),
+            component.get("material", "сталь"),
+            section.get("location", "надземная"),
+            section.get("protection", "без защиты"),
+            section.get("environment", "Поволжье"),
+            horizons=years
+        ))
+    return forecasts
+
+def get_plot_layout_key(section):
+    """Всё, кроме данных кривых: при совпадении фигура обновляется на месте"""
+    return (section.get("name"), tuple(
+        (component.get("name"), component.get("component_type"),
+         component.get("thickness", component.get("wall_thickness", 10)))
+        for component in section.get("components", [])))
+
+def get_plot_snapshot(section):
+    """Копия данных участка для отрисовки в рабочем потоке (без результатов расчёта)"""
+    return copy.deepcopy({key: value for key, value in section.items() if key != RESULTS_KEY})
+
+def get_plot_key(snapshot, fluid_type):
+    """
+    Ключ растра графика: хэш входных данных участка (get_plot_snapshot)
+    и параметров среды, тип среды и горизонт прогноза
+
+    Результаты расчёта в ключ не входят: график от них не зависит.
+    """
+    content = repr((sorted((key, repr(value)) for key, value in snapshot.items()),
+                    sorted(get_section_fluid_params(snapshot, fluid_type).items())))
+    return ("corrosion", hashlib.sha1(content.encode("utf-8")).hexdigest(), fluid_type, PLOT_YEARS)
+
+def draw_corrosion_figure(fig, section, fluid_type, years):
+    """
+    Рисует прогноз коррозии всех компонентов участка и задаёт размер фигуры
+    
+    Не обращается к Tk: вызывается и в рабочем потоке (растр Agg),
+    и для интерактивного холста.
+    
+    Returns:
+    --------
+    (кривые, подписи скорости, оси) по компонентам - для обновления данных на месте
+    """
+    curves, rate_labels, plot_axes = [], [], []
     
     components = section.get("components", [])
     if not components:
         # Пустой график, если нет компонентов
-        fig, ax = plt.subplots(figsize=(10, 4))
+        fig.set_size_inches(10, 4)
+        ax = fig.add_subplot(1, 1, 1)
         ax.text(0.5, 0.5, "Нет данных о компонентах", 
                ha='center', va='center', fontsize=12, transform=ax.transAxes)
         ax.axis('off')
-        canvas = FigureCanvasTkAgg(fig, plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10)
-        return
+        return curves, rate_labels, plot_axes
     
     # Создаем подграфики для всех компонентов
     n_components = len(components)
-    if n_components <= 3:
-        rows, cols = 1, n_components
-        fig_height = 4
-    elif n_components <= 6:
-        rows, cols = 2, (n_components + 1) // 2
-        fig_height = 7
-    else:
-        rows, cols = 3, (n_components + 2) // 3
-        fig_height = 10
-    
-    fig, axes = plt.subplots(rows, cols, figsize=(4*cols, fig_height))
+    rows, cols, fig_height = get_plot_layout(n_components)
+    fig.set_size_inches(4 * cols, fig_height)
+    axes = np.atleast_1d(fig.subplots(rows, cols)).flatten()
     fig.suptitle(f'Прогноз коррозии для всех компонентов ({section["name"]})', fontsize=14, fontweight='bold')
     
-    # Если только один компонент, axes не будет массивом
-    if n_components == 1:
-        axes = [axes]
-    elif rows == 1:
-        axes = axes
-    else:
-        axes = axes.flatten()
-    
-    years = list(range(0, 51, 5))
     colors = plt.cm.tab10(np.linspace(0, 1, min(10, n_components)))
+    forecasts = forecast_components(section, fluid_type, years)
     
-    for idx, (component, ax, color) in enumerate(zip(components, axes[:n_components], colors)):
-        # Получаем параметры компонента
+    for idx, (component, ax, color, forecast) in enumerate(zip(components, axes, colors, forecasts)):
         thickness = component.get("thickness", component.get("wall_thickness", 10))
-        diameter = component.get("diameter", 100)
-        material = component.get("material", "сталь")
-        
-        thickness_remaining = []
-        corrosion_rates = []
-        
-        # Расчет для каждого года
-        for year in years:
-            if fluid_type == "oil":
-                loss, rate = calculate_corrosion_oil(
-                    year,
-                    section.get("temperature", 60),          
-                    section.get("water_content", 5),        
-                    section.get("h2s_content", 50),         
-                    section.get("viscosity", 15),           
-                    section.get("flow_rate", 1000),           
-                    thickness,
-                    diameter,
-                    material,
-                    section.get("location", "надземная"),     
-                    section.get("protection", "без защиты"), 
-                    section.get("environment", "Поволжье")   
-                )
-            else:
-                loss, rate = calculate_corrosion_gas(
-                    year,
-                    section.get("temperature", 20),           
-                    section.get("pressure", 5),              
-                    section.get("co2_content", 2),           
-                    section.get("methane_content", 85),      
-                    section.get("dew_point", -10),           
-                    thickness,
-                    diameter,
-                    material,
-                    section.get("location", "надземная"),     
-                    section.get("protection", "без защиты"), 
-                    section.get("environment", "Поволжье")    
-                )
-            
-            remaining = max(0, thickness - loss)
-            thickness_remaining.append(remaining)
-            corrosion_rates.append(rate)
         
         # Отрисовка графика для компонента
-        ax.plot(years, thickness_remaining, 'o-', color=color, linewidth=2, markersize=4,
-               label=f'Толщ: {thickness}мм')
+        curve, = ax.plot(years, forecast["remaining"], 'o-', color=color, linewidth=2, markersize=4,
+                         label=f'Толщ: {thickness}мм')
         
         # Критические уровни
         ax.axhline(y=5.0, color='r', linestyle='--', alpha=0.5, label='Крит. уровень' if idx == 0 else "")
@@ -123,19 +148,121 @@ def create_corrosion_plot(parent_frame, section, fluid_type):
         ax.legend(loc='upper right', fontsize=8)
         
         # Добавляем текстовую информацию о скорости коррозии
-        avg_rate = np.mean(corrosion_rates)
-        ax.text(0.02, 0.98, f'Ср. скорость: {avg_rate:.3f} мм/год',
-                transform=ax.transAxes, fontsize=8, verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+        rate_label = ax.text(0.02, 0.98, f'Ср. скорость: {forecast["corrosion_rate"]:.3f} мм/год',
+                             transform=ax.transAxes, fontsize=8, verticalalignment='top',
+                             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+        
+        curves.append(curve)
+        rate_labels.append(rate_label)
+        plot_axes.append(ax)
     
     # Скрываем пустые подграфики
     for i in range(n_components, len(axes)):
         axes[i].axis('off')
     
-    plt.tight_layout(rect=[0, 0, 1, 0.96])  # Учитываем заголовок
-    canvas = FigureCanvasTkAgg(fig, plot_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill="both", expand=True, padx=10)
+    fig.tight_layout(rect=[0, 0, 1, 0.96])  # Учитываем заголовок
+    return curves, rate_labels, plot_axes
+
+def create_corrosion_plot(parent_frame, section, fluid_type):
+    """
+    График прогноза коррозии для ВСЕХ компонентов сложного участка
+    
+    По умолчанию показывается картинка: фигура рисуется бэкендом Agg
+    в пуле отрисовки (utils.plot_renderer) и кэшируется по отпечатку
+    участка и горизонту прогноза, поэтому переключение вкладок не ждёт
+    отрисовки. Интерактивный холст с масштабированием создаётся только
+    по щелчку на графике.
+    
+    Returns:
+    --------
+    update_plot(section) - показать график для новых данных участка
+    (в интерактивном режиме - обновлением кривых на месте)
+    """
+    plot_frame = ttk.Frame(parent_frame)
+    plot_frame.pack(fill="x", pady=10)
+    
+    preview = ttk.Label(plot_frame, text="Построение графика...", cursor="hand2")
+    preview.pack(padx=10)
+    hint = ttk.Label(plot_frame, text="Щёлкните по графику для масштабирования и перемещения",
+                     font=("Arial", 8), foreground="#888888")
+    hint.pack()
+    
+    renderer = get_plot_renderer()
+    state = {"section": section, "key": None, "photo": None,
+             "fig": None, "canvas": None, "layout": None, "curves": [], "rate_labels": [], "axes": []}
+    
+    def show_raster(image):
+        picture = Image.frombuffer("RGBA", (image.width, image.height), image.rgba, "raw", "RGBA", 0, 1)
+        state["photo"] = ImageTk.PhotoImage(picture)
+        preview.configure(image=state["photo"], text="")
+    
+    def wait_raster(key, future):
+        """Показывает растр, когда он готов (устаревшие запросы пропускаются)"""
+        if key != state["key"]:
+            return
+        if not future.done():
+            plot_frame.after(PLOT_POLL_MS, wait_raster, key, future)
+        elif future.exception() is None:
+            show_raster(future.result())
+        else:
+            preview.configure(text="Не удалось построить график")
+    
+    def update_interactive(section):
+        fig, canvas = state["fig"], state["canvas"]
+        layout = get_plot_layout_key(section)
+        if layout != state["layout"]:
+            fig.clear()
+            state["curves"], state["rate_labels"], state["axes"] = draw_corrosion_figure(
+                fig, section, fluid_type, PLOT_YEARS)
+            width, height = fig.get_size_inches()
+            canvas.get_tk_widget().configure(width=int(width * fig.dpi), height=int(height * fig.dpi))
+            state["layout"] = layout
+        else:
+            forecasts = forecast_components(section, fluid_type, PLOT_YEARS)
+            for curve, rate_label, ax, forecast in zip(state["curves"], state["rate_labels"],
+                                                       state["axes"], forecasts):
+                curve.set_data(PLOT_YEARS, forecast["remaining"])
+                rate_label.set_text(f'Ср. скорость: {forecast["corrosion_rate"]:.3f} мм/год')
+                ax.relim()
+                ax.autoscale_view()
+        canvas.draw_idle()
+    
+    def make_interactive(event=None):
+        """Заменяет картинку интерактивным холстом с панелью масштабирования"""
+        if state["canvas"] is not None:
+            return
+        state["key"] = None
+        preview.destroy()
+        hint.destroy()
+        
+        # Фигура без pyplot: не попадает в его список открытых фигур
+        # и освобождается вместе с холстом
+        state["fig"] = Figure()
+        state["canvas"] = FigureCanvasTkAgg(state["fig"], plot_frame)
+        toolbar = NavigationToolbar2Tk(state["canvas"], plot_frame)
+        toolbar.update()
+        state["canvas"].get_tk_widget().pack(fill="both", expand=True, padx=10)
+        update_interactive(state["section"])
+    
+    def update_plot(section):
+        state["section"] = section
+        if state["canvas"] is not None:
+            update_interactive(section)
+            return
+        
+        snapshot = get_plot_snapshot(section)
+        key = get_plot_key(snapshot, fluid_type)
+        state["key"] = key
+        image = renderer.get(key)
+        if image is not None:
+            show_raster(image)
+            return
+        future = renderer.render(key, draw_corrosion_figure, snapshot, fluid_type, PLOT_YEARS)
+        wait_raster(key, future)
+    
+    preview.bind("<Button-1>", make_interactive)
+    update_plot(section)
+    return update_plot
 
 def create_component_analysis(parent_frame, components, fluid_type, section_params):
     """Создает детальный анализ для каждого компонента"""
@@ -214,44 +341,33 @@ def create_component_analysis(parent_frame, components, fluid_type, section_para
         thickness = component.get("thickness", component.get("wall_thickness", 10))
         periods = [1, 5, 10, 20, 30]
         
+        forecast = forecast_corrosion(
+            fluid_type,
+            get_section_fluid_params(section_params, fluid_type),
+            thickness,
+            component.get("diameter", 100),
+            component.get("material", "сталь"),
+            section_params.get("location", "надземная"),
+            section_params.get("protection", "без защиты"),
+            section_params.get("environment", "Поволжье"),
+            horizons=periods
+        )
+        
         corrosion_text = "Остаточная толщина:\n"
-        for period in periods:
-            if fluid_type == "oil":
-                loss, rate = calculate_corrosion_oil(
-                    period,
-                    section_params.get("temperature", 60),
-                    section_params.get("water_content", 5),
-                    section_params.get("h2s_content", 50),
-                    section_params.get("viscosity", 15),
-                    section_params.get("flow_rate", 1000),
-                    thickness,
-                    component.get("diameter", 100),
-                    component.get("material", "сталь"),
-                    section_params.get("location", "надземная"),
-                    section_params.get("protection", "без защиты"),
-                    section_params.get("environment", "Поволжье")
-                )
-            else:
-                loss, rate = calculate_corrosion_gas(
-                    period,
-                    section_params.get("temperature", 20),
-                    section_params.get("pressure", 5),
-                    section_params.get("co2_content", 2),
-                    section_params.get("methane_content", 85),
-                    section_params.get("dew_point", -10),
-                    thickness,
-                    component.get("diameter", 100),
-                    component.get("material", "сталь"),
-                    section_params.get("location", "надземная"),
-                    section_params.get("protection", "без защиты"),
-                    section_params.get("environment", "Поволжье")
-                )
-            
-            remaining = max(0, thickness - loss)
+        for period, remaining in zip(periods, forecast["remaining"]):
             corrosion_level, _ = get_corrosion_level(remaining)
             
             corrosion_text += f"• Через {period} лет: {remaining:.1f} мм ({corrosion_level})\n"
         
+        corrosion_text += "\nПереход в состояние:\n"
+        for level, level_years in forecast["level_times"].items():
+            if level_years == 0:
+                corrosion_text += f"• {level}: уже достигнуто\n"
+            elif math.isinf(level_years):
+                corrosion_text += f"• {level}: не наступит\n"
+            else:
+                corrosion_text += f"• {level}: через {level_years:.1f} лет\n"
+        
         ttk.Label(corrosion_frame, text=corrosion_text, font=("Arial", 9), justify="left").pack(anchor="w")
         
         # Рекомендации для компонента
@@ -292,13 +408,21 @@ def create_component_analysis(parent_frame, components, fluid_type, section_para
             ttk.Label(rec_frame, text=rec, font=("Arial", 9), justify="left").pack(anchor="w", padx=5)
 
 def create_section_analysis(parent, section, fluid_type):
-    """Создаёт детальный анализ для сложного участка с ВСЕМИ компонентами"""
+    """
+    Создаёт детальный анализ для сложного участка с ВСЕМИ компонентами
+    
+    Returns:
+    --------
+    update_section(section) - перестраивает текстовые блоки и таблицы
+    по новым данным участка, а график обновляет на месте; None, если
+    данные участка не словарь
+    """
     if not isinstance(section, dict):
         error_frame = ttk.Frame(parent)
         error_frame.pack(fill="both", expand=True)
         ttk.Label(error_frame, text=f"❌ Ошибка в данных участка: {section}", 
                  font=("Arial", 12, "bold"), foreground="red").pack(pady=50)
-        return
+        return None
     
     # Основной фрейм с прокруткой
     main_frame = ttk.Frame(parent)
@@ -313,18 +437,47 @@ def create_section_analysis(parent, section, fluid_type):
     tk_canvas.configure(yscrollcommand=scrollbar.set)
     tk_canvas.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
+    
+    # Блоки до и после графика пересоздаются при изменении участка,
+    # график между ними - постоянный
+    header_frame = ttk.Frame(scrollable_frame)
+    header_frame.pack(fill="x")
+    
+    # ГРАФИК КОРРОЗИИ ДЛЯ ВСЕХ КОМПОНЕНТОВ
+    plot_frame = ttk.LabelFrame(scrollable_frame, text="ПРОГНОЗ КОРРОЗИИ ДЛЯ ВСЕХ КОМПОНЕНТОВ", padding=10)
+    plot_frame.pack(fill="x", padx=20, pady=10)
+    update_plot = create_corrosion_plot(plot_frame, section, fluid_type)
+    
+    details_frame = ttk.Frame(scrollable_frame)
+    details_frame.pack(fill="x")
+    
+    def fill(section):
+        for frame in (header_frame, details_frame):
+            for child in frame.winfo_children():
+                child.destroy()
+        create_section_header(header_frame, section, fluid_type)
+        create_section_details(details_frame, section, fluid_type)
+    
+    def update_section(section):
+        fill(section)
+        update_plot(section)
+    
+    fill(section)
+    return update_section
 
+def create_section_header(parent, section, fluid_type):
+    """Заголовок, параметры участка и сводная таблица компонентов"""
     # Заголовок
     components = section.get("components", [])
     title_text = f"АНАЛИЗ: {section['name']}"
     if components:
         title_text += f" [{len(components)} комп.]"
     
-    title_label = ttk.Label(scrollable_frame, text=title_text, font=("Arial", 16, "bold"))
+    title_label = ttk.Label(parent, text=title_text, font=("Arial", 16, "bold"))
     title_label.pack(pady=20)
     
     # ОСНОВНАЯ ИНФОРМАЦИЯ 
-    info_frame = ttk.LabelFrame(scrollable_frame, text="ОСНОВНЫЕ ПАРАМЕТРЫ", padding=10)
+    info_frame = ttk.LabelFrame(parent, text="ОСНОВНЫЕ ПАРАМЕТРЫ", padding=10)
     info_frame.pack(fill="x", padx=20, pady=10)
     
     # Операционные параметры участка
@@ -362,7 +515,7 @@ def create_section_analysis(parent, section, fluid_type):
     
     # Сводная таблица компонентов
     if components:
-        comp_frame = ttk.LabelFrame(scrollable_frame, text="СВОДНАЯ ТАБЛИЦА КОМПОНЕНТОВ", padding=10)
+        comp_frame = ttk.LabelFrame(parent, text="СВОДНАЯ ТАБЛИЦА КОМПОНЕНТОВ", padding=10)
         comp_frame.pack(fill="x", padx=20, pady=10)
         
         columns = ("№", "Компонент", "Тип", "Материал", "Размеры", "Толщина", "Состояние")
@@ -407,7 +560,7 @@ def create_section_analysis(parent, section, fluid_type):
             thickness_value = comp.get("thickness", comp.get("wall_thickness", 0))
             
             # Состояние компонента
-            comp_remaining = comp.get("remaining", thickness_value)
+            comp_remaining = get_component_remaining(section, comp, idx - 1, default=0)
             comp_level, _ = get_corrosion_level(comp_remaining)
             
             # Цвет строки в зависимости от состояния
@@ -446,23 +599,22 @@ def create_section_analysis(parent, section, fluid_type):
                 frame.pack(side="left", padx=10)
                 tk.Label(frame, text="■", font=("Arial", 12), foreground=color).pack(side="left")
                 ttk.Label(frame, text=state).pack(side="left", padx=2)
-    
-    # ГРАФИК КОРРОЗИИ ДЛЯ ВСЕХ КОМПОНЕНТОВ
-    plot_frame = ttk.LabelFrame(scrollable_frame, text="ПРОГНОЗ КОРРОЗИИ ДЛЯ ВСЕХ КОМПОНЕНТОВ", padding=10)
-    plot_frame.pack(fill="x", padx=20, pady=10)
-    create_corrosion_plot(plot_frame, section, fluid_type)
+
+def create_section_details(parent, section, fluid_type):
+    """Анализ компонентов, рекомендации и смета ремонта участка"""
+    components = section.get("components", [])
     
     # ДЕТАЛЬНЫЙ АНАЛИЗ КАЖДОГО КОМПОНЕНТА
     if components:
-        create_component_analysis(scrollable_frame, components, fluid_type, section)
+        create_component_analysis(parent, components, fluid_type, section)
     
     # РЕКОМЕНДАЦИИ ПО УЧАСТКУ
-    rec_frame = ttk.LabelFrame(scrollable_frame, text="РЕКОМЕНДАЦИИ ПО УЧАСТКУ", padding=10)
+    rec_frame = ttk.LabelFrame(parent, text="РЕКОМЕНДАЦИИ ПО УЧАСТКУ", padding=10)
     rec_frame.pack(fill="x", padx=20, pady=10)
     create_recommendations(rec_frame, section, fluid_type)
         
     # ЭКОНОМИКА - расчёт для всего участка
-    cost_frame = ttk.LabelFrame(scrollable_frame, text="ДЕТАЛИЗИРОВАННАЯ СМЕТА РЕМОНТА", padding=10)
+    cost_frame = ttk.LabelFrame(parent, text="ДЕТАЛИЗИРОВАННАЯ СМЕТА РЕМОНТА", padding=10)
     cost_frame.pack(fill="x", padx=20, pady=10)
 
     # Рассчитываем детальные затраты для всего участка
@@ -481,14 +633,16 @@ def create_section_analysis(parent, section, fluid_type):
         component_repair_details = []
         total_components_cost = 0
     
-        # ДОБАВЛЯЕМ ЭТОТ ЦИКЛ для расчёта стоимости каждого компонента
-        for comp in components:
+        # Стоимости всех компонентов посчитаны одним пакетом (и запомнены)
+        component_costs = get_component_repair_costs(section)
+        
+        for comp_index, comp in enumerate(components):
             comp_type = comp.get("component_type", "unknown")
             comp_name = comp.get("name", f"Компонент {len(component_repair_details)+1}")
+            comp_remaining = get_component_remaining(section, comp, comp_index)
         
             try:
-                # ИСПОЛЬЗУЕМ НОВУЮ ФУНКЦИЮ из economics.py
-                comp_cost_data = calculate_component_repair_cost(comp, section)
+                comp_cost_data = component_costs[comp_index]
                 comp_cost = comp_cost_data['total_cost']
                 repair_method = comp_cost_data['repair_method']
                 wear_percentage = comp_cost_data.get('wear_percentage', 0)
@@ -500,7 +654,7 @@ def create_section_analysis(parent, section, fluid_type):
                     "cost": comp_cost,
                     "method": repair_method,
                     "wear_percentage": wear_percentage,
-                    "remaining": comp.get("remaining", comp.get("thickness", comp.get("wall_thickness", 10)))
+                    "remaining": comp_remaining
                 })
             
                 # Суммируем общую стоимость
@@ -510,7 +664,7 @@ def create_section_analysis(parent, section, fluid_type):
                 repair_summary[comp_type] = repair_summary.get(comp_type, 0) + comp_cost
             
             except Exception as e:
-                print(f"Ошибка расчета стоимости для компонента {comp_name}: {e}")
+                logger.warning("Ошибка расчета стоимости для компонента %s: %s", comp_name, e)
             continue
     
         if repair_summary:
@@ -665,16 +819,9 @@ def create_recommendations(parent_frame, section, fluid_type):
     component_states = []
     urgent_components = []
     
-    for component in components:
+    for index, component in enumerate(components):
         # Получаем остаточную толщину компонента
-        if "remaining" in component:
-            remaining = component["remaining"]
-        elif "thickness" in component:
-            remaining = component["thickness"]
-        elif "wall_thickness" in component:
-            remaining = component["wall_thickness"]
-        else:
-            remaining = 10
+        remaining = get_component_remaining(section, component, index)
         
         # Определяем состояние
         if remaining >= 10.0:
@@ -836,7 +983,7 @@ def create_economic_summary(parent_frame, sections_data, fluid_type):
             if root:
                 create_export_dialog(root, fluid_type, sections_data)
         except Exception as e:
-            print(f"❌ Ошибка открытия диалога экспорта: {e}")
+            logger.exception("Ошибка открытия диалога экспорта: %s", e)
     
     export_btn = tk.Button(buttons_frame, text="Экспорт",
                           bg='#18171C', fg='#FADADD', font=("Arial", 9, "bold"),
@@ -853,7 +1000,7 @@ def create_economic_summary(parent_frame, sections_data, fluid_type):
             if root:
                 create_economics_settings_dialog(root)
         except Exception as e:
-            print(f"❌ Ошибка открытия настроек: {e}")
+            logger.exception("Ошибка открытия настроек: %s", e)
     
     settings_btn = tk.Button(buttons_frame, text="Настроить цены",
                             bg='#18171C', fg='#FADADD', font=("Arial", 9, "bold"),
@@ -905,14 +1052,13 @@ def create_economic_summary(parent_frame, sections_data, fluid_type):
         
 def create_general_analysis(parent, fluid_type, sections_data):
     """Создаёт общий анализ системы"""
-    print(f"🔍 В create_general_analysis:")
-    print(f"   fluid_type: {fluid_type}")
-    print(f"   sections_data тип: {type(sections_data)}")
-    print(f"   sections_data длина: {len(sections_data) if sections_data else 0}")
-    
-    if sections_data and len(sections_data) > 0:
-        print(f"   Первый элемент тип: {type(sections_data[0])}")
-        print(f"   Первый элемент: {sections_data[0].get('name', 'No name')}")
+    if logger.isEnabledFor(DIAGNOSTICS):
+        logger.log(DIAGNOSTICS, "create_general_analysis", extra={"diagnostics": {
+            "fluid_type": fluid_type,
+            "sections_type": type(sections_data).__name__,
+            "sections": len(sections_data) if sections_data else 0,
+            "first_section": sections_data[0].get("name", "No name") if sections_data else None,
+        }})
     
     # Проверяем, что есть данные для анализа
     if not sections_data:
@@ -981,51 +1127,11 @@ def create_general_analysis(parent, fluid_type, sections_data):
     stats_frame = ttk.LabelFrame(scrollable_frame, text="СВОДНАЯ СТАТИСТИКА", padding=15)
     stats_frame.pack(fill="x", padx=20, pady=10)
     
-    total_sections = len(sections_data)
-    total_components = 0
-    
-    for section in sections_data:
-        components = section.get("components", [])
-        total_components += len(components)
-    
-    # Подсчёт состояний
-    from models.corrosion import get_corrosion_level
-    status_counts = {"отличное": 0, "хорошее": 0, "удовлетворительное": 0, "плохое": 0, "аварийное": 0}
-    
-    # Считаем состояния по компонентам
-    component_status_counts = {"отличное": 0, "хорошее": 0, "удовлетворительное": 0, "плохое": 0, "аварийное": 0}
-    
-    for section in sections_data:
-        components = section.get("components", [])
-        
-        for component in components:
-            # Получаем толщину компонента
-            thickness = component.get("remaining", 
-                                    component.get("thickness", 
-                                                component.get("wall_thickness", 10)))
-            level, _ = get_corrosion_level(thickness)
-            component_status_counts[level] += 1
-    
-    # Преобразуем в сводное состояние участка (по худшему компоненту)
-    for section in sections_data:
-        components = section.get("components", [])
-        if not components:
-            continue
-            
-        # Находим худшее состояние среди компонентов
-        worst_level = "отличное"
-        for component in components:
-            thickness = component.get("remaining", 
-                                    component.get("thickness", 
-                                                component.get("wall_thickness", 10)))
-            level, _ = get_corrosion_level(thickness)
-            
-            # Определяем приоритет состояния
-            priorities = {"аварийное": 0, "плохое": 1, "удовлетворительное": 2, "хорошее": 3, "отличное": 4}
-            if priorities.get(level, 5) < priorities.get(worst_level, 5):
-                worst_level = level
-        
-        status_counts[worst_level] += 1
+    summary = get_fleet_summary(sections_data)
+    total_sections = summary["section_count"]
+    total_components = summary["component_count"]
+    status_counts = summary["status_counts"]
+    component_status_counts = summary["component_status_counts"]
     
     stats_text = (
         f"• Всего участков: {total_sections}\n"
@@ -1067,149 +1173,170 @@ def create_general_analysis(parent, fluid_type, sections_data):
 
     create_economic_summary(scrollable_frame, sections_data, fluid_type)
 
+def create_empty_message(parent):
+    """Сообщение вместо вкладок, когда участков нет"""
+    message_frame = ttk.Frame(parent)
+    message_frame.pack(fill="both", expand=True)
+    
+    message_label = ttk.Label(
+        message_frame,
+        text="Добавьте участки во вкладке 'Параметры'",
+        font=("Arial", 16, "bold"),
+        foreground="#666666"
+    )
+    message_label.pack(pady=40)
+    
+    # Иконка или дополнительный текст
+    info_label = ttk.Label(
+        message_frame,
+        text="Перейдите на вкладку 'Параметры', чтобы добавить новые участки трубопровода\nи рассчитать их состояние",
+        font=("Arial", 12),
+        foreground="#888888",
+        justify="center"
+    )
+    info_label.pack(pady=10)
+    
+    # Разделительная линия
+    separator = ttk.Separator(message_frame, orient="horizontal")
+    separator.pack(fill="x", pady=30, padx=50)
+    
+    # Подсказка
+    hint_label = ttk.Label(
+        message_frame,
+        text="Используйте кнопку 'Добавить участок' для создания нового участка",
+        font=("Arial", 10, "italic"),
+        foreground="#999999"
+    )
+    hint_label.pack(pady=10)
+    return message_frame
+
+def get_tab_name(section):
+    """Сокращённое имя участка для вкладки"""
+    tab_name = section["name"]
+    if len(tab_name) > 20:
+        tab_name = tab_name[:17] + "..."
+    return tab_name
+
 def create_analysis_tab(parent, fluid_type, sections_data):
-    """Создаёт вкладку анализа с внутренними вкладками"""
+    """
+    Создаёт вкладку анализа с внутренними вкладками
+    
+    Вкладки участков заполняются при первом выборе, а не при каждом
+    обновлении. Заполненная вкладка запоминает ревизии участка
+    (get_section_revision) и цен (get_prices_revision) и при следующем
+    выборе перестраивается, только если они изменились; график участка
+    при этом обновляется на месте. Вкладки удалённых участков
+    уничтожаются вместе с их фигурами.
+    """
     tab = parent
     
     # Внутренние вкладки анализа
     analysis_notebook = ttk.Notebook(tab)
+    analysis_notebook.pack(fill="both", expand=True)
     
-    def update_analysis():
-        """Полностью пересоздаёт вкладки анализа"""      
-        # Удаляем все существующие вкладки
+    # Постоянные вкладки: общий анализ и по участку (в порядке sections_data)
+    general_tab = {"frame": None, "revision": None}
+    section_tabs = []   # {"section", "frame", "update", "revision"}
+    notice_frame = [None]  # "Нет данных" или ошибка в данных
+    
+    def clear_tabs():
+        """Уничтожает все вкладки (с виджетами и фигурами)"""
         for tab_id in analysis_notebook.tabs():
             analysis_notebook.forget(tab_id)
-        
+        for frame in [general_tab["frame"], notice_frame[0]] + [entry["frame"] for entry in section_tabs]:
+            if frame is not None:
+                frame.destroy()
+        general_tab["frame"] = general_tab["revision"] = None
+        notice_frame[0] = None
+        section_tabs.clear()
+    
+    def show_notice(create_frame, text):
+        clear_tabs()
+        notice_frame[0] = create_frame()
+        analysis_notebook.add(notice_frame[0], text=text)
+    
+    def create_error_frame():
+        error_frame = ttk.Frame(analysis_notebook)
+        error_frame.pack(fill="both", expand=True)
+        ttk.Label(error_frame, text="❌ Ошибка в данных участков", 
+                 font=("Arial", 14, "bold"), foreground="red").pack(pady=50)
+        return error_frame
+    
+    def refresh_general():
+        """Общий анализ зависит от всех участков - сравнивается ревизия проекта"""
+        revision = get_fleet_key(sections_data)
+        if revision == general_tab["revision"]:
+            return
+        for child in general_tab["frame"].winfo_children():
+            child.destroy()
+        create_general_analysis(general_tab["frame"], fluid_type, sections_data)
+        general_tab["revision"] = revision
+    
+    def refresh_section(entry):
+        """Заполняет вкладку участка или обновляет её, если участок изменился"""
+        section = entry["section"]
+        if entry["update"] is None:
+            entry["update"] = create_section_analysis(entry["frame"], section, fluid_type)
+        elif (get_section_revision(section), get_prices_revision()) != entry["revision"]:
+            entry["update"](section)
+        else:
+            return
+        entry["revision"] = (get_section_revision(section), get_prices_revision())
+    
+    def refresh_selected(event=None):
+        """Заполняет (или обновляет) только выбранную вкладку"""
+        selected = analysis_notebook.select()
+        if not selected:
+            return
+        if general_tab["frame"] is not None and selected == str(general_tab["frame"]):
+            refresh_general()
+            return
+        for entry in section_tabs:
+            if selected == str(entry["frame"]):
+                refresh_section(entry)
+                return
+    
+    def update_analysis():
+        """Сверяет вкладки с участками и обновляет выбранную вкладку"""
         if not sections_data:
             # НЕТ УЧАСТКОВ - показываем красивое сообщение
-            message_frame = ttk.Frame(analysis_notebook)
-            message_frame.pack(fill="both", expand=True)
-            
-            message_label = ttk.Label(
-                message_frame,
-                text="Добавьте участки во вкладке 'Параметры'",
-                font=("Arial", 16, "bold"),
-                foreground="#666666"
-            )
-            message_label.pack(pady=40)
-            
-            # Иконка или дополнительный текст
-            info_label = ttk.Label(
-                message_frame,
-                text="Перейдите на вкладку 'Параметры', чтобы добавить новые участки трубопровода\nи рассчитать их состояние",
-                font=("Arial", 12),
-                foreground="#888888",
-                justify="center"
-            )
-            info_label.pack(pady=10)
-            
-            # Разделительная линия
-            separator = ttk.Separator(message_frame, orient="horizontal")
-            separator.pack(fill="x", pady=30, padx=50)
-            
-            # Подсказка
-            hint_label = ttk.Label(
-                message_frame,
-                text="Используйте кнопку 'Добавить участок' для создания нового участка",
-                font=("Arial", 10, "italic"),
-                foreground="#999999"
-            )
-            hint_label.pack(pady=10)
-            
-            analysis_notebook.add(message_frame, text="Нет данных")
+            show_notice(lambda: create_empty_message(analysis_notebook), "Нет данных")
             return
         elif not all(isinstance(s, dict) for s in sections_data):
             # Ошибка в данных
-            error_frame = ttk.Frame(analysis_notebook)
-            error_frame.pack(fill="both", expand=True)
-            ttk.Label(error_frame, text="❌ Ошибка в данных участков", 
-                     font=("Arial", 14, "bold"), foreground="red").pack(pady=50)
-            analysis_notebook.add(error_frame, text="ОШИБКА")
+            show_notice(create_error_frame, "ОШИБКА")
             return
         
-        # Пересоздаём вкладки с актуальными данными
-        general_frame = ttk.Frame(analysis_notebook)
-        create_general_analysis(general_frame, fluid_type, sections_data)
-        analysis_notebook.add(general_frame, text="ОБЩИЙ АНАЛИЗ")
+        if notice_frame[0] is not None:
+            analysis_notebook.forget(notice_frame[0])
+            notice_frame[0].destroy()
+            notice_frame[0] = None
         
-        # СОЗДАЕМ ВКЛАДКИ ДЛЯ КАЖДОГО УЧАСТКА
-        for section in sections_data:
-            if isinstance(section, dict):  
-                section_frame = ttk.Frame(analysis_notebook)
-                create_section_analysis(section_frame, section, fluid_type)
-                # Сокращаем имя для вкладки
-                tab_name = section["name"]
-                if len(tab_name) > 20:
-                    tab_name = tab_name[:17] + "..."
-                analysis_notebook.add(section_frame, text=tab_name)
-            else:
-                print(f"❌ Пропускаем не-словарь: {section} (тип: {type(section)})")
-    
-    # ПЕРВОНАЧАЛЬНОЕ СОЗДАНИЕ ВКЛАДОК 
-    if not sections_data:
-        # НЕТ УЧАСТКОВ - показываем красивое сообщение
-        message_frame = ttk.Frame(analysis_notebook)
-        message_frame.pack(fill="both", expand=True)
+        if general_tab["frame"] is None:
+            general_tab["frame"] = ttk.Frame(analysis_notebook)
+            analysis_notebook.add(general_tab["frame"], text="ОБЩИЙ АНАЛИЗ")
         
-        message_label = ttk.Label(
-            message_frame,
-            text="Добавьте участки во вкладке 'Параметры'",
-            font=("Arial", 16, "bold"),
-            foreground="#666666"
-        )
-        message_label.pack(pady=40)
+        # Вкладки удалённых участков уничтожаются, новых - добавляются пустыми
+        known = {id(entry["section"]): entry for entry in section_tabs}
+        current = {id(section) for section in sections_data}
+        for entry in section_tabs:
+            if id(entry["section"]) not in current:
+                analysis_notebook.forget(entry["frame"])
+                entry["frame"].destroy()
         
-        # Иконка или дополнительный текст
-        info_label = ttk.Label(
-            message_frame,
-            text="Перейдите на вкладку 'Параметры', чтобы добавить новые участки трубопровода\nи рассчитать их состояние",
-            font=("Arial", 12),
-            foreground="#888888",
-            justify="center"
-        )
-        info_label.pack(pady=10)
+        section_tabs[:] = [known.get(id(section)) or
+                           {"section": section, "frame": ttk.Frame(analysis_notebook),
+                            "update": None, "revision": None}
+                           for section in sections_data]
+        for index, entry in enumerate(section_tabs, 1):
+            position = index if index < len(analysis_notebook.tabs()) else "end"
+            analysis_notebook.insert(position, entry["frame"], text=get_tab_name(entry["section"]))
         
-        # Разделительная линия
-        separator = ttk.Separator(message_frame, orient="horizontal")
-        separator.pack(fill="x", pady=30, padx=50)
-        
-        # Подсказка
-        hint_label = ttk.Label(
-            message_frame,
-            text="Используйте кнопку 'Добавить участок' для создания нового участка",
-            font=("Arial", 10, "italic"),
-            foreground="#999999"
-        )
-        hint_label.pack(pady=10)
-        
-        analysis_notebook.add(message_frame, text="Нет данных")
-    elif not all(isinstance(s, dict) for s in sections_data):
-        # Ошибка в данных
-        error_frame = ttk.Frame(analysis_notebook)
-        error_frame.pack(fill="both", expand=True)
-        ttk.Label(error_frame, text="❌ Ошибка в данных участков", 
-                 font=("Arial", 14, "bold"), foreground="red").pack(pady=50)
-        analysis_notebook.add(error_frame, text="ОШИБКА")
-    else:
-        # 1. Общий анализ
-        general_frame = ttk.Frame(analysis_notebook)
-        create_general_analysis(general_frame, fluid_type, sections_data)
-        analysis_notebook.add(general_frame, text="ОБЩИЙ АНАЛИЗ")
-        
-        # 2. Детальный анализ по участкам
-        for section in sections_data:
-            section_frame = ttk.Frame(analysis_notebook)
-            create_section_analysis(section_frame, section, fluid_type)
-            # Сокращаем имя для вкладки
-            tab_name = section["name"]
-            if len(tab_name) > 20:
-                tab_name = tab_name[:17] + "..."
-            analysis_notebook.add(section_frame, text=tab_name)
+        refresh_selected()
     
-    analysis_notebook.pack(fill="both", expand=True)
+    analysis_notebook.bind("<<NotebookTabChanged>>", refresh_selected)
     
     # Первоначальное обновление
     update_analysis()
     
     return tab, update_analysis
-    
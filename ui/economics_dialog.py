@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
-from models.economics import ECONOMIC_PARAMS
+from models.economics import ECONOMIC_PARAMS, mark_prices_changed
 import os
 
 def create_economics_settings_dialog(parent, update_callback=None):
@@ -169,6 +169,7 @@ def create_economics_settings_dialog(parent, update_callback=None):
                     ECONOMIC_PARAMS["стоимость_покрытий"][coating] = float(entry.get())
                 else:
                     ECONOMIC_PARAMS[key] = float(entry.get())
+            mark_prices_changed()
             
             if update_callback:
                 update_callback()
@@ -14,6 +14,7 @@ def show_main_window(fluid_type):
     from ui.parameters_tab import create_parameters_tab
     from ui.scheme_tab import create_scheme_tab
     from ui.analysis_tab import create_analysis_tab
+    from models.project import ProjectSections
 
     root_main = tk.Tk()
     
@@ -33,7 +34,7 @@ def show_main_window(fluid_type):
     root_main.configure(bg='#4F273A')
     
     # НАЧИНАЕМ С ПУСТОГО СПИСКА - пользователь сам добавит участки через интерфейс
-    shared_sections_data = []
+    shared_sections_data = ProjectSections()
     
     # Главный фрейм
     main_frame = tk.Frame(root_main, bg='#4F273A')
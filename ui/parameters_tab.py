@@ -1,9 +1,12 @@
 """Вкладка с параметрами трубопровода и расчётами"""
 import tkinter as tk
 from tkinter import ttk
-from models.corrosion import calculate_corrosion_oil, calculate_corrosion_gas, get_corrosion_level, PROTECTION_TYPES, PIPELINE_LOCATION
+from models.corrosion import PROTECTION_TYPES, PIPELINE_LOCATION
+from models.calculation import IncrementalCalculator, store_section_results
+from ui.recalc_scheduler import RecalcScheduler
 from models.regions import REGION_AGGRESSION
 from utils.constants import PIPE_STANDARDS, PIPE_THICKNESS_STANDARD, PIPE_MATERIALS
+from utils.log import get_logger
 import os
 import sys
 try:
@@ -15,6 +18,17 @@ except ImportError:
         PIPE = "pipe"
         EQUIPMENT = "equipment"
 
+logger = get_logger(__name__)
+
+# Теги строк таблицы по уровню коррозии
+LEVEL_TAGS = {
+    "отличное": "excellent",
+    "хорошее": "good",
+    "удовлетворительное": "satisfactory",
+    "плохое": "poor",
+    "аварийное": "critical"
+}
+
 def get_recommended_thickness(diameter):
     """Возвращает рекомендуемую толщину стенки для диаметра"""
     return PIPE_THICKNESS_STANDARD.get(diameter, 10)
@@ -42,6 +56,9 @@ def create_parameters_tab(parent, fluid_type, sections_data, update_scheme_callb
     year_slider.set(0)
     year_slider.pack(fill="x", padx=10, pady=5)
 
+    # Индикатор фонового пересчёта (показывается только для долгих расчётов)
+    progress_bar = ttk.Progressbar(frame_time, mode="determinate", maximum=1.0)
+
     # Подписи
     label_frame = ttk.Frame(frame_time)
     label_frame.pack(fill="x", padx=10)
@@ -159,290 +176,187 @@ def create_parameters_tab(parent, fluid_type, sections_data, update_scheme_callb
         tree.pack(side="left", fill="both", expand=True, pady=5)
         scrollbar.pack(side="right", fill="y", pady=5)
 
-    def update_calculation():
-        """Обновляет расчёт коррозии для всех участков (включая сложные)"""
+    # Инкрементальный расчёт: кэш скоростей по участкам и строки таблицы по участкам
+    calculator = IncrementalCalculator(fluid_type)
+    section_items = {}    # ключ участка -> [id строк Treeview]
+    shown_values = {}     # id строки -> (остаток, статус), уже показанные в таблице
+
+    def read_fluid_params():
+        """Параметры среды из полей ввода"""
+        if fluid_type == "oil":
+            return {
+                "temperature": float(fluid_entries["Температура (°C):"].get()),
+                "water_content": float(fluid_entries["Обводнённость (%):"].get()),
+                "h2s_content": float(fluid_entries["H₂S (ppm):"].get()),
+                "viscosity": float(fluid_entries["Вязкость (сСт):"].get()),
+                "flow_rate": float(fluid_entries["Расход (м³/ч):"].get())
+            }
+        return {
+            "temperature": float(fluid_entries["Температура (°C):"].get()),
+            "pressure": float(fluid_entries["Давление (МПа):"].get()),
+            "co2_content": float(fluid_entries["CO₂ (%):"].get()),
+            "methane_content": float(fluid_entries["Метан (%):"].get()),
+            "dew_point": float(fluid_entries["Точка росы (°C):"].get())
+        }
+
+    def get_static_values(row):
+        """Неизменные с годами колонки строки таблицы (до «Остатка»)"""
+        section = row["section"]
+        comp_params = row["component"]
+
+        if comp_params is None:
+            return (
+                section["name"],
+                section["length"],
+                section["diameter"],
+                section["thickness"],
+                section["material"],
+                "1",
+                row["location"],
+                row["protection"],
+                row["environment"]
+            )
+
+        # Определяем количество для отображения
+        count = comp_params.get("count", 1)
+        if comp_params.get("component_type") == "pipe":
+            count_display = "1"  # для труб прочерк
+        else:
+            count_display = f"{count}"
+
+        # Название компонента
+        comp_name = f"{section['name']} - {comp_params.get('name', row['component_id'])}"
+
+        # Для оборудования показываем количество
+        if count > 1:
+            comp_name += f" (x{count})"
+
+        return (
+            comp_name,
+            f"{row['length']:.0f}" if row["length"] > 0 else "—",
+            f"{row['diameter']:.0f}" if row["diameter"] > 0 else "—",
+            f"{row['thickness']:.2f}",
+            row["material"],
+            count_display,
+            row["location"],
+            row["protection"],
+            row["environment"]
+        )
+
+    def sync_tree_rows(added, removed):
+        """Удаляет строки удалённых участков и вставляет строки новых на их место"""
+        for key in removed:
+            items = section_items.pop(key, [])
+            for item in items:
+                shown_values.pop(item, None)
+            if items:
+                tree.delete(*items)
+
+        if not added:
+            return
+
+        added = set(added)
+        position = 0
+        for key in calculator.keys():
+            if key in added:
+                items = []
+                for row in calculator.rows(key):
+                    items.append(tree.insert("", position, values=get_static_values(row) + ("", "")))
+                    position += 1
+                section_items[key] = items
+            else:
+                position += len(section_items.get(key, ()))
+
+    def prepare_calculation():
+        """
+        Поток Tk: входные данные и структура таблицы перед фоновым расчётом
+
+        Returns:
+        --------
+        срок эксплуатации для расчёта или None, если считать нечего
+        """
         try:
             years = year_slider.get()
-        
-            # Собираем параметры среды 
-            fluid_params = {}
-            if fluid_type == "oil":
-                fluid_params = {
-                    "temperature": float(fluid_entries["Температура (°C):"].get()),
-                    "water_content": float(fluid_entries["Обводнённость (%):"].get()),
-                    "h2s_content": float(fluid_entries["H₂S (ppm):"].get()),
-                    "viscosity": float(fluid_entries["Вязкость (сСт):"].get()),
-                    "flow_rate": float(fluid_entries["Расход (м³/ч):"].get())
-                }
-            else:
-                fluid_params = {
-                    "temperature": float(fluid_entries["Температура (°C):"].get()),
-                    "pressure": float(fluid_entries["Давление (МПа):"].get()),
-                    "co2_content": float(fluid_entries["CO₂ (%):"].get()),
-                    "methane_content": float(fluid_entries["Метан (%):"].get()),
-                    "dew_point": float(fluid_entries["Точка росы (°C):"].get())
-                }
-        
-            # Очищаем таблицу
-            for item in tree.get_children():
-                tree.delete(item)
-        
-            # Проверяем, есть ли данные
-            if not sections_data:
-                show_empty_message()
-                return
-            else:
-                show_table()
-        
-            rows_added = 0  # Счётчик добавленных строк
-            
-            # ОБНОВЛЁННЫЙ КОД: каждый компонент как отдельная строка
-            for section in sections_data:
-                is_complex = section.get("is_complex", False)
-            
-                if is_complex:
-                    # РАСЧЁТ ДЛЯ СЛОЖНОГО УЧАСТКА - КАЖДЫЙ КОМПОНЕНТ ОТДЕЛЬНО
-                    components = section.get("components", [])
-                
-                    for i, component in enumerate(components):
-                        # Определяем параметры компонента
-                        comp_params = component
-
-                        # ПОЛУЧАЕМ ИМЯ КОМПОНЕНТА
-                        comp_id = comp_params.get("component_id", f"comp_{i}")
-                        comp_name_display = comp_params.get("name", comp_id)
-
-                        # Определяем количество для отображения
-                        count = comp_params.get("count", 1)
-                        if comp_params.get("component_type") == "pipe":
-                            count_display = "1"  # для труб прочерк
-                        else:
-                            count_display = f"{count}"
-
-                        # ОПРЕДЕЛЯЕМ ПЕРЕМЕННЫЕ ДЛЯ ЭТОГО КОМПОНЕНТА
-                        thickness = 10.0  # значение по умолчанию
-                        diameter = 0.0
-                        length = 0.0
-                        material = "Ст20"
-                        
-                        if comp_params.get("component_type") == "pipe":
-                            thickness = comp_params.get("thickness", 10.0)
-                            diameter = comp_params.get("diameter", 500.0)
-                            length = comp_params.get("length", 0)
-                            material = comp_params.get("material", "Ст20")
-                        elif comp_params.get("component_type") == "equipment":
-                            thickness = comp_params.get("wall_thickness", 12.0)
-                            diameter = 0  # у оборудования нет диаметра
-                            length = 0
-                            material = comp_params.get("material", "09Г2С")
-                        else:
-                            # Для других типов или если component_type не указан
-                            thickness = comp_params.get("thickness", comp_params.get("wall_thickness", 10.0))
-                            diameter = comp_params.get("diameter", 0)
-                            length = comp_params.get("length", 0)
-                            material = comp_params.get("material", "Ст20")
-                        
-                        # Получаем тип компонента и тип объекта для специальных коэффициентов
-                        comp_type = comp_params.get("component_type", "pipe")
-                        object_type = section.get("object_type", "")
-                        
-                        # ТЕПЕРЬ ДЕЛАЕМ РАСЧЁТ ДЛЯ ЭТОГО КОМПОНЕНТА
-                        if fluid_type == "oil":
-                            thickness_loss, rate = calculate_corrosion_oil(
-                                years, 
-                                fluid_params["temperature"],
-                                fluid_params["water_content"], 
-                                fluid_params["h2s_content"],
-                                fluid_params["viscosity"],
-                                fluid_params["flow_rate"],
-                                thickness,  # ТОЛЩИНА ЭТОГО КОМПОНЕНТА
-                                diameter,   # ДИАМЕТР ЭТОГО КОМПОНЕНТА
-                                material,   # МАТЕРИАЛ ЭТОГО КОМПОНЕНТА
-                                section.get("location", "надземная"),
-                                section.get("protection", "без защиты"),
-                                section.get("environment", "Поволжье"),
-                                component_type=comp_type,
-                                component_id=comp_id,
-                                object_type=object_type
-                            )
-                        else:
-                            thickness_loss, rate = calculate_corrosion_gas(
-                                years,
-                                fluid_params["temperature"],
-                                fluid_params["pressure"],
-                                fluid_params["co2_content"],
-                                fluid_params["methane_content"], 
-                                fluid_params["dew_point"],
-                                thickness,  # ТОЛЩИНА ЭТОГО КОМПОНЕНТА
-                                diameter,   # ДИАМЕТР ЭТОГО КОМПОНЕНТА
-                                material,   # МАТЕРИАЛ ЭТОГО КОМПОНЕНТА
-                                section.get("location", "надземная"),
-                                section.get("protection", "без защиты"),
-                                section.get("environment", "Поволжье"),
-                                component_type=comp_type,
-                                component_id=comp_id,
-                                object_type=object_type
-                            )
-                    
-                        # Остаточная толщина ДЛЯ ЭТОГО КОМПОНЕНТА
-                        comp_remaining = max(0.1, thickness - thickness_loss)
-                        level, _ = get_corrosion_level(comp_remaining)
-                    
-                        # Определяем тег для цвета
-                        if level == "отличное":
-                            tag = 'excellent'
-                        elif level == "хорошее":
-                            tag = 'good'
-                        elif level == "удовлетворительное":
-                            tag = 'satisfactory'
-                        elif level == "плохое":
-                            tag = 'poor'
-                        else:
-                            tag = 'critical'
-                    
-                        # Название компонента
-                        comp_name = f"{section['name']} - {comp_name_display}"
-
-                        # Для оборудования показываем количество
-                        if comp_params.get("count", 1) > 1:
-                            comp_name += f" (x{comp_params['count']})"
-
-                        # Добавляем запись в таблицу ДЛЯ ЭТОГО КОМПОНЕНТА
-                        tree.insert("", "end", values=(
-                            comp_name,
-                            f"{length:.0f}" if length > 0 else "—",
-                            f"{diameter:.0f}" if diameter > 0 else "—",
-                            f"{thickness:.2f}",
-                            material,
-                            count_display,
-                            section.get("location", "надземная"),
-                            section.get("protection", "без защиты"),
-                            section.get("environment", "Поволжье"),
-                            f"{comp_remaining:.2f}",
-                            level
-                        ), tags=(tag,))
-                        rows_added += 1
-                    
-                        # Сохраняем данные компонента для схемы
-                        if "components_data" not in section:
-                            section["components_data"] = []
-                        # Проверяем, не существует ли уже данных для этого компонента
-                        existing_idx = -1
-                        for idx, data in enumerate(section["components_data"]):
-                            if data.get("component_id") == comp_id:
-                                existing_idx = idx
-                                break
-                        
-                        if existing_idx >= 0:
-                            # Обновляем существующие данные
-                            section["components_data"][existing_idx] = {
-                                "component_id": comp_params.get("component_id", f"comp_{i}"),
-                                "remaining": comp_remaining,
-                                "level": level
-                            }
-                        else:
-                            # Добавляем новые данные
-                            section["components_data"].append({
-                                "component_id": comp_params.get("component_id", f"comp_{i}"),
-                                "remaining": comp_remaining,
-                                "level": level
-                            })
-                
-                else:
-                    # РАСЧЁТ ДЛЯ ПРОСТОГО УЧАСТКА 
-                    if fluid_type == "oil":
-                        thickness_loss, rate = calculate_corrosion_oil(
-                            years, 
-                            fluid_params["temperature"],
-                            fluid_params["water_content"], 
-                            fluid_params["h2s_content"],
-                            fluid_params["viscosity"],
-                            fluid_params["flow_rate"],
-                            section["thickness"],     # ТОЛЩИНА СЕКЦИИ
-                            section["diameter"],      # ДИАМЕТР СЕКЦИИ
-                            section["material"],      # МАТЕРИАЛ СЕКЦИИ
-                            section.get("location", "надземная"),
-                            section.get("protection", "без защиты"),
-                            section.get("environment", "Поволжье"),
-                            component_type=section.get("component_type", "pipe"),
-                            component_id=section.get("component_id", ""),
-                            object_type=section.get("object_type", "")
-                        )
-                    else:
-                        thickness_loss, rate = calculate_corrosion_gas(
-                            years,
-                            fluid_params["temperature"],
-                            fluid_params["pressure"],
-                            fluid_params["co2_content"],
-                            fluid_params["methane_content"], 
-                            fluid_params["dew_point"],
-                            section["thickness"],     # ТОЛЩИНА СЕКЦИИ
-                            section["diameter"],      # ДИАМЕТР СЕКЦИИ
-                            section["material"],      # МАТЕРИАЛ СЕКЦИИ
-                            section.get("location", "надземная"),
-                            section.get("protection", "без защиты"),
-                            section.get("environment", "Поволжье"),
-                            component_type=section.get("component_type", "pipe"),
-                            component_id=section.get("component_id", ""),
-                            object_type=section.get("object_type", "")
-                        )
-                
-                    initial_thickness = section["thickness"]
-                    actual_remaining = max(0.1, initial_thickness - thickness_loss)
-                    level, color = get_corrosion_level(actual_remaining)
-                
-                    # СОХРАНЯЕМ ДАННЫЕ ДЛЯ СХЕМЫ
-                    section["remaining_thickness"] = actual_remaining
-                    section["corrosion_level"] = level
-                
-                    # Определяем тег для цвета
-                    if level == "отличное":
-                        tag = 'excellent'
-                    elif level == "хорошее":
-                        tag = 'good'
-                    elif level == "удовлетворительное":
-                        tag = 'satisfactory'
-                    elif level == "плохое":
-                        tag = 'poor'
-                    else:
-                        tag = 'critical'
-                
-                    tree.insert("", "end", values=(
-                        section["name"],
-                        section["length"], 
-                        section["diameter"],
-                        section["thickness"],
-                        section["material"],
-                        "1",
-                        section.get("location", "надземная"),
-                        section.get("protection", "без защиты"),
-                        section.get("environment", "Поволжье"),
-                        f"{actual_remaining:.2f}",
-                        level
-                    ), tags=(tag,))
-                    rows_added += 1
-            
-            # Если после расчётов строк не добавлено (все участки удалены)
-            if rows_added == 0:
-                show_empty_message()
-            
+            calculator.set_fluid_params(read_fluid_params())
+
+            # Структура: новые и удалённые участки
+            added, removed = calculator.sync_sections(sections_data)
+            sync_tree_rows(added, removed)
         except ValueError as e:
-            print(f"Ошибка ввода: {e}")
-            import traceback
-            traceback.print_exc()
-        except KeyError as e:
-            print(f"Ошибка ключа: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("Ошибка ввода: %s", e)
+            return None
         except Exception as e:
-            print(f"Неизвестная ошибка в update_calculation: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Неизвестная ошибка в update_calculation: %s", e)
+            return None
+
+        # Проверяем, есть ли данные
+        if not any(section_items.values()):
+            show_empty_message()
+            notify_scheme()
+            return None
+        show_table()
+        return years
+
+    def compute_calculation(years, job):
+        """Рабочий поток: расчёт только зависимых от изменений участков"""
+        return calculator.evaluate(years, job)
+
+    def apply_calculation(results):
+        """Поток Tk: обновляем строки таблицы на месте и сохраняем результаты для схемы"""
+        try:
+            for result in results:
+                store_section_results(result["section"], result["rows"],
+                                      result["remaining"], result["levels"])
+
+                items = section_items.get(result["key"], ())
+                for item, row, remaining, level in zip(
+                        items, result["rows"], result["remaining"], result["levels"]):
+                    shown = (f"{remaining:.2f}", level)
+                    if shown_values.get(item) == shown:
+                        continue
+                    shown_values[item] = shown
+                    tree.item(item, values=get_static_values(row) + shown,
+                              tags=(LEVEL_TAGS.get(level, 'critical'),))
+        except Exception as e:
+            logger.exception("Ошибка обновления таблицы: %s", e)
+
+        notify_scheme()
+
+    def show_progress(value):
+        """Индикатор долгого расчёта (None - спрятать)"""
+        if value is None:
+            progress_bar.pack_forget()
+            return
+        if not progress_bar.winfo_ismapped():
+            progress_bar.pack(fill="x", padx=10, pady=(5, 0))
+        progress_bar["value"] = value
+
+    # Пересчёт схлопывается и выполняется в фоне, результат - через after()
+    scheduler = RecalcScheduler(tab, prepare_calculation, compute_calculation,
+                                apply_calculation, on_progress=show_progress)
+    tree.bind("<Destroy>", lambda event: scheduler.shutdown())
+    notify_pending = False
+
+    def notify_scheme():
+        """Обновляет остальные вкладки, если об этом просили при запросе расчёта"""
+        nonlocal notify_pending
+        if notify_pending and update_scheme_callback:
+            update_scheme_callback()
+        notify_pending = False
+
+    def update_calculation(notify=False, immediate=False):
+        """
+        Запрашивает пересчёт коррозии (пересчитывается только изменившееся)
+
+        notify - после расчёта обновить схему и анализ;
+        immediate - без задержки на схлопывание событий
+        """
+        nonlocal notify_pending
+        notify_pending = notify_pending or notify
+        scheduler.request(immediate=immediate)
 
     def on_parameter_change(*args):
-        update_calculation()
-        if update_scheme_callback:
-            update_scheme_callback()
+        update_calculation(notify=True)
 
     def on_slider_change(event):
         """При движении ползунка обновляем расчёт"""
@@ -454,7 +368,7 @@ def create_parameters_tab(parent, fluid_type, sections_data, update_scheme_callb
         """Диалог добавления нового участка"""
         def on_section_added(new_section):
             """Callback при добавлении новой секции"""
-            print("🔄 Вызван on_section_added")
+            logger.debug("Вызван on_section_added")
     
             try:
                 # Просто преобразуем в словарь
@@ -492,30 +406,26 @@ def create_parameters_tab(parent, fluid_type, sections_data, update_scheme_callb
                         comp_dict['thickness'] = comp_dict['wall_thickness']
             
                     section_dict["components"].append(comp_dict)
-                    print(f"   Добавлен компонент: {comp_dict.get('name', 'unknown')}")
+                    logger.debug("Добавлен компонент: %s", comp_dict.get('name', 'unknown'))
         
-                print(f"✅ Участок '{section_dict['name']}' добавлен")
-                print(f"   Компонентов: {len(section_dict['components'])}")
+                logger.info("Участок '%s' добавлен, компонентов: %d",
+                            section_dict['name'], len(section_dict['components']))
         
                 sections_data.append(section_dict)
         
             except Exception as e:
-                print(f"🔥 ОШИБКА в on_section_added: {type(e).__name__}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Ошибка в on_section_added: %s: %s", type(e).__name__, e)
                 return
     
             # Обновляем интерфейс
-            update_calculation()
-            if update_scheme_callback:
-                update_scheme_callback()
+            update_calculation(notify=True, immediate=True)
     
         # Показываем новый диалог
         try:
             from ui.add_section_dialog import show_add_dialog
             show_add_dialog(tab, fluid_type, sections_data, on_section_added)
         except ImportError as e:
-            print(f"Ошибка импорта диалога: {e}")
+            logger.error("Ошибка импорта диалога: %s", e)
             # Заглушка для тестирования
             from models.pipeline_data import ComplexSection
             test_section = ComplexSection(
@@ -547,14 +457,12 @@ def create_parameters_tab(parent, fluid_type, sections_data, update_scheme_callb
             for i, section in enumerate(sections_data):
                 if section["name"] == base_name:
                     sections_data.pop(i)
-                    print(f"🗑️ Удалён участок: {base_name}")
+                    logger.info("Удалён участок: %s", base_name)
                     break
                 
-            update_calculation()
-            if update_scheme_callback:
-                update_scheme_callback()
+            update_calculation(notify=True, immediate=True)
         else:
-            print("❌ Ничего не выбрано")
+            logger.debug("Ничего не выбрано")
 
     # =========================================================================
     # ПРИВЯЗКА СОБЫТИЙ И РАЗМЕЩЕНИЕ ЭЛЕМЕНТОВ
@@ -581,7 +489,7 @@ def create_parameters_tab(parent, fluid_type, sections_data, update_scheme_callb
     delete_btn.pack(side="left", padx=5)
 
     # Первоначальный расчёт
-    update_calculation()
+    update_calculation(immediate=True)
 
     return tab
 
@@ -0,0 +1,152 @@
+"""
+Планировщик фонового пересчёта для вкладок Tk
+
+Серии событий (ползунок, ввод в поля) схлопываются: пересчёт стартует
+через delay_ms после последнего события, но не реже чем раз в max_wait_ms
+при непрерывном перетаскивании. Численная часть выполняется в рабочем
+потоке, результат возвращается в цикл Tk через after(). Одновременно
+идёт не больше одного задания; если во время расчёта пришли новые данные,
+текущее задание отменяется, а по его завершении запускается новое.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from models.calculation import CalculationJob
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class RecalcScheduler:
+    """
+    Схлопывание событий и фоновый расчёт с доставкой результата через after()
+
+    prepare()          - в потоке Tk; возвращает входные данные задания
+                         или None, если считать нечего
+    compute(data, job) - в рабочем потоке; результат или None при отмене
+    apply(result)      - в потоке Tk; применение результата к интерфейсу
+    on_progress(value) - в потоке Tk; доля 0..1 для долгих расчётов,
+                         None - расчёт завершён (спрятать индикатор)
+    """
+
+    def __init__(self, widget, prepare, compute, apply, on_progress=None,
+                 delay_ms=80, max_wait_ms=250, poll_ms=30, progress_delay_ms=300):
+        self.widget = widget
+        self.prepare = prepare
+        self.compute = compute
+        self.apply = apply
+        self.on_progress = on_progress
+
+        self.delay_ms = delay_ms
+        self.max_wait_ms = max_wait_ms
+        self.poll_ms = poll_ms
+        self.progress_delay_ms = progress_delay_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recalc")
+        self._timer = None          # id отложенного запуска after()
+        self._first_request = None  # время первого необработанного события
+        self._pending = False       # есть данные новее текущего задания
+        self._job = None
+        self._future = None
+        self._started = 0.0
+        self._progress_shown = False
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Запросы на пересчёт
+    # ------------------------------------------------------------------
+
+    def request(self, immediate=False):
+        """Запрос пересчёта; immediate - без задержки на схлопывание"""
+        if self._closed:
+            return
+
+        now = time.monotonic()
+        if self._first_request is None:
+            self._first_request = now
+
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+            self._timer = None
+
+        waited_ms = (now - self._first_request) * 1000
+        if immediate or waited_ms >= self.max_wait_ms:
+            self._fire()
+        else:
+            delay = min(self.delay_ms, int(self.max_wait_ms - waited_ms))
+            self._timer = self.widget.after(delay, self._fire)
+
+    def _fire(self):
+        self._timer = None
+        self._first_request = None
+
+        if self._future is not None:
+            # Идёт расчёт по устаревшим данным - отменяем и ждём его окончания
+            self._job.cancel()
+            self._pending = True
+            return
+
+        self._start()
+
+    def _start(self):
+        self._pending = False
+        data = self.prepare()
+        if data is None:
+            return
+
+        self._job = CalculationJob()
+        self._started = time.monotonic()
+        self._future = self._executor.submit(self.compute, data, self._job)
+        self.widget.after(self.poll_ms, self._poll)
+
+    # ------------------------------------------------------------------
+    # Получение результата в потоке Tk
+    # ------------------------------------------------------------------
+
+    def _poll(self):
+        if self._closed:
+            return
+
+        future = self._future
+        if not future.done():
+            elapsed_ms = (time.monotonic() - self._started) * 1000
+            if self.on_progress and elapsed_ms >= self.progress_delay_ms:
+                self._progress_shown = True
+                self.on_progress(self._job.progress)
+            self.widget.after(self.poll_ms, self._poll)
+            return
+
+        self._future = None
+        self._job = None
+
+        if self._progress_shown and self.on_progress:
+            self._progress_shown = False
+            self.on_progress(None)
+
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.exception("Ошибка фонового расчёта: %s", e)
+            result = None
+
+        # Завершившийся несмотря на отмену расчёт корректен для своих данных
+        # (состояние калькулятора уже продвинуто) - применяем, новое задание
+        # всё равно будет запущено следом
+        if result is not None:
+            self.apply(result)
+
+        if self._pending:
+            self._start()
+
+    def shutdown(self):
+        """Останавливает планировщик (при закрытии вкладки)"""
+        self._closed = True
+        if self._job is not None:
+            self._job.cancel()
+        if self._timer is not None:
+            try:
+                self.widget.after_cancel(self._timer)
+            except Exception:
+                pass
+            self._timer = None
+        self._executor.shutdown(wait=False)
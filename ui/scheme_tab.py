@@ -5,6 +5,11 @@ from PIL import Image, ImageTk
 import os
 import sys
 
+from models.results import get_section_remaining, get_section_results, get_worst_remaining
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
 # Функция для получения правильного пути к ресурсам в упакованном приложении
 def get_resource_path(relative_path):
     """Получает правильный путь к ресурсам для упакованного приложения"""
@@ -45,44 +50,8 @@ def get_color_by_thickness(thickness):
         return "#FF6B6B"      # красный
 
 def get_corrosion_color(section):
-    """Возвращает цвет по остаточной толщине"""
-    is_complex = section.get("is_complex", False)
-    
-    if is_complex:
-        # Для сложных объектов находим наихудшую остаточную толщину
-        worst_thickness = 100.0  # очень большое число
-        found = False
-        
-        # Сначала проверяем components_data
-        components_data = section.get("components_data", [])
-        for comp in components_data:
-            remaining = comp.get("remaining")
-            if remaining is not None:
-                found = True
-                if remaining < worst_thickness:
-                    worst_thickness = remaining
-        
-        # Если не нашли в components_data, проверяем components
-        if not found:
-            components = section.get("components", [])
-            for comp in components:
-                remaining = comp.get("remaining")
-                if remaining is None:
-                    remaining = comp.get("thickness", comp.get("wall_thickness", 10.0))
-                found = True
-                if remaining < worst_thickness:
-                    worst_thickness = remaining
-        
-        if not found:
-            worst_thickness = 10.0
-            
-        return get_color_by_thickness(worst_thickness)
-    else:
-        # Для простых участков
-        remaining = section.get("remaining_thickness")
-        if remaining is None:
-            remaining = section.get("thickness", 10.0)
-        return get_color_by_thickness(remaining)
+    """Возвращает цвет по остаточной толщине (для сложных - по наихудшему компоненту)"""
+    return get_color_by_thickness(get_worst_remaining(section))
 
 # Функции для работы с иконками
 def apply_color_to_icon_pil(img, color):
@@ -100,7 +69,7 @@ def apply_color_to_icon_pil(img, color):
         result = Image.alpha_composite(color_layer, img)
         return result
     except Exception as e:
-        print(f"Ошибка применения цвета к иконке: {e}")
+        logger.warning("Ошибка применения цвета к иконке: %s", e)
         return img
 
 def create_debug_icon(color):
@@ -123,7 +92,7 @@ def create_debug_icon(color):
         
         return img
     except Exception as e:
-        print(f"Ошибка создания debug иконки: {e}")
+        logger.warning("Ошибка создания debug иконки: %s", e)
         return None
 
 def get_icon_object_type(section_name, fluid_type):
@@ -214,7 +183,7 @@ def load_png_icon(object_type, fluid_type, color):
     
         for path in icon_paths:
             if os.path.exists(path):
-                print(f"✅ Найдена иконка: {path}")
+                logger.debug("Найдена иконка: %s", path)
                 img = Image.open(path)
                 
                 # Применяем цвет коррозии
@@ -226,13 +195,11 @@ def load_png_icon(object_type, fluid_type, color):
                 
                 return img
         
-        print(f"⚠️ Иконка не найдена для: {object_type}")
+        logger.warning("Иконка не найдена для: %s", object_type)
         return create_debug_icon(color)
     
     except Exception as e:
-        print(f"❌ Ошибка загрузки PNG иконки {object_type}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Ошибка загрузки PNG иконки %s: %s", object_type, e)
         return create_debug_icon(color)
 
 # Основная функция создания вкладки
@@ -360,7 +327,7 @@ def create_scheme_tab(parent, fluid_type, sections_data):
                                   font=("Arial", 14, "bold"), fill="black")
         
         except Exception as e:
-            print(f"Ошибка отрисовки иконки: {e}")
+            logger.warning("Ошибка отрисовки иконки: %s", e)
             # Запасной вариант - цветной прямоугольник
             canvas.create_rectangle(10, 10, 70, 70, fill=color, outline="black", width=2)
             canvas.create_text(40, 40, text="?", font=("Arial", 14, "bold"))
@@ -379,18 +346,14 @@ def create_scheme_tab(parent, fluid_type, sections_data):
         
         if is_complex:
             # Находим наихудшее состояние
-            components_data = section.get("components_data", [])
-            if components_data:
-                worst_thickness = min([comp.get("remaining", 10.0) for comp in components_data])
-                worst_state = get_state_by_thickness(worst_thickness)
-                components_count = len(components_data)
-                status_text = f"{worst_state} ({components_count} комп.)"
+            results = get_section_results(section)
+            if results:
+                worst_state = get_state_by_thickness(results.worst()["remaining"])
+                status_text = f"{worst_state} ({len(results)} комп.)"
             else:
                 status_text = "нет данных"
         else:
-            remaining = section.get("remaining_thickness", section.get("thickness", 10.0))
-            state = get_state_by_thickness(remaining)
-            status_text = state
+            status_text = get_state_by_thickness(get_section_remaining(section))
         
         status_label = ttk.Label(icon_frame, text=status_text, 
                                 font=("Arial", 8), foreground="gray")
@@ -402,9 +365,7 @@ def create_scheme_tab(parent, fluid_type, sections_data):
                 from ui.viewer3d_dialog import show_3d_viewer
                 show_3d_viewer(section, fluid_type)
             except Exception as e:
-                print(f"Ошибка открытия 3D просмотра: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Ошибка открытия 3D просмотра: %s", e)
                 tk.messagebox.showerror("Ошибка", f"Не удалось открыть 3D просмотр:\n{e}")
         
         button = ttk.Button(icon_frame, text="Просмотр", 
@@ -434,7 +395,7 @@ def create_scheme_tab(parent, fluid_type, sections_data):
         for i in range(COLS):
             grid_frame.grid_columnconfigure(i, weight=1, minsize=120)
         
-        print(f"Создаём сетку: {COLS} колонок, {len(sections_data)} секций")
+        logger.debug("Создаём сетку: %d колонок, %d секций", COLS, len(sections_data))
         
         # Создаём сетку
         for i, section in enumerate(sections_data):
@@ -455,7 +416,7 @@ def create_scheme_tab(parent, fluid_type, sections_data):
     # Функция обновления схемы (вызывается извне)
     def update_scheme():
         """Обновляет схему при изменении данных"""
-        print("🔄 Обновление схемы...")
+        logger.debug("Обновление схемы")
         create_fixed_grid()
     
     # Принудительное обновление после отображения
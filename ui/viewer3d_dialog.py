@@ -3,9 +3,21 @@ from tkinter import messagebox
 import os
 import math
 import time
-from typing import List, Tuple, Optional, Dict
+from collections import deque
+from typing import Tuple, Optional, Dict
 from dataclasses import dataclass
 
+import numpy as np
+
+from models.results import get_component_id, get_component_remaining, get_section_results
+from utils.asset_manifest import get_asset_manifest
+from utils.asset_store import get_mesh_store
+from utils.log import DIAGNOSTICS, get_logger
+from utils.mesh_cache import compute_mesh_metadata
+from utils.scene_loader import SceneLoader
+
+logger = get_logger(__name__)
+
 try:
     import pygame
     from pygame.locals import *
@@ -155,79 +167,50 @@ def get_display_name(model_name: str) -> str:
 # ============================================================================
 
 class SmartOBJLoader:
-    """Умный загрузчик OBJ файлов с кэшированием"""
+    """
+    Загрузчик OBJ через общее хранилище мешей
+
+    Меши читаются через бинарный кэш utils.mesh_cache (массивы NumPy,
+    отображённые в память) и хранятся в utils.asset_store по
+    идентификатору содержимого: одинаковые файлы разных сред
+    загружаются и хранятся один раз.
+    """
     
-    _cache = {}
+    @staticmethod
+    def resolve_path(filepath: str):
+        """Существующий путь к файлу (с поиском в других местах) или None"""
+        if os.path.exists(filepath):
+            return filepath
+        
+        # Пробуем найти файл в других местах
+        alt_paths = [
+            filepath.replace("assets/3D_models/", ""),
+            filepath.split("/")[-1],
+            os.path.join("..", filepath),
+            os.path.join(".", filepath)
+        ]
+        
+        for alt_path in alt_paths:
+            if os.path.exists(alt_path):
+                return alt_path
+        return None
+    
+    @staticmethod
+    def load_asset(filepath: str):
+        """Меш файла (MeshAsset) или None"""
+        path = SmartOBJLoader.resolve_path(filepath)
+        if path is None:
+            logger.warning("Файл не найден: %s", filepath)
+            return None
+        return get_mesh_store().load(path)
     
     @staticmethod
     def load(filepath: str):
-        """Загружает OBJ файл с кэшированием"""
-        if filepath in SmartOBJLoader._cache:
-            return SmartOBJLoader._cache[filepath]
-        
-        if not os.path.exists(filepath):
-            # Пробуем найти файл в других местах
-            alt_paths = [
-                filepath.replace("assets/3D_models/", ""),
-                filepath.split("/")[-1],
-                os.path.join("..", filepath),
-                os.path.join(".", filepath)
-            ]
-            
-            for alt_path in alt_paths:
-                if os.path.exists(alt_path):
-                    filepath = alt_path
-                    break
-        
-        if not os.path.exists(filepath):
-            print(f"Файл не найден: {filepath}")
-            SmartOBJLoader._cache[filepath] = (None, None)
+        """Загружает OBJ файл: (vertices (N, 3), faces (M, 3)) или (None, None)"""
+        asset = SmartOBJLoader.load_asset(filepath)
+        if asset is None:
             return None, None
-        
-        vertices = []
-        faces = []
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('v '):
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            try:
-                                vertices.append((
-                                    float(parts[1]),
-                                    float(parts[2]), 
-                                    float(parts[3])
-                                ))
-                            except ValueError:
-                                continue
-                    elif line.startswith('f '):
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            face_vertices = []
-                            for part in parts[1:]:
-                                indices = part.split('/')
-                                if indices[0].isdigit():
-                                    vertex_idx = int(indices[0]) - 1
-                                    if 0 <= vertex_idx < len(vertices):
-                                        face_vertices.append(vertex_idx)
-                            
-                            # Триангуляция
-                            if len(face_vertices) >= 3:
-                                for i in range(1, len(face_vertices) - 1):
-                                    faces.append([
-                                        face_vertices[0],
-                                        face_vertices[i],
-                                        face_vertices[i + 1]
-                                    ])
-        except Exception as e:
-            print(f"Ошибка загрузки {filepath}: {e}")
-            vertices, faces = [], []
-        
-        result = (vertices, faces) if vertices and faces else (None, None)
-        SmartOBJLoader._cache[filepath] = result
-        return result
+        return asset.vertices, asset.faces
 
 # ============================================================================
 # 3D ВЬЮЕР С ИСПРАВЛЕНИЯМИ
@@ -243,9 +226,150 @@ class Component3D:
     remaining_thickness: Optional[float] = None
     corrosion_level: str = "отличное"
     material: str = ""
-    vertices: List[Tuple[float, float, float]] = None
-    faces: List[List[int]] = None
+    vertices: Optional[np.ndarray] = None  # (N, 3)
+    faces: Optional[np.ndarray] = None     # (M, 3), треугольники
+    face_normals: Optional[np.ndarray] = None  # (M, 3), считаются при загрузке
+    # Ограничивающая сфера меша (в координатах модели) и метаданные (MeshMetadata)
+    bounding_center: Tuple[float, float, float] = (0.0, 0.0, 0.0)
     bounding_radius: float = 1.0
+    metadata: Optional[object] = None
+    # Уровни детализации: (разрешение сетки или None, vertices, faces, face_normals)
+    lods: Optional[list] = None
+    lod_level: int = 0
+    # Заглушка: меш ещё загружается в фоне
+    loading: bool = False
+
+class FrameStats:
+    """Статистика времени кадров 3D-просмотра (скользящее окно)"""
+    
+    def __init__(self, window=240):
+        self.frame_times = deque(maxlen=window)
+        self.frames = 0           # выведено кадров
+        self.scene_renders = 0    # из них с перерисовкой сцены
+        self.idle_waits = 0       # ожиданий событий в простое
+    
+    def add(self, seconds, scene_rendered):
+        self.frame_times.append(seconds)
+        self.frames += 1
+        if scene_rendered:
+            self.scene_renders += 1
+    
+    def summary(self):
+        """dict: число кадров и время кадра (среднее, 95-й процентиль, максимум), мс"""
+        times = sorted(self.frame_times)
+        summary = {
+            "frames": self.frames,
+            "scene_renders": self.scene_renders,
+            "overlay_only": self.frames - self.scene_renders,
+            "idle_waits": self.idle_waits,
+        }
+        if times:
+            summary.update({
+                "avg_ms": round(1000 * sum(times) / len(times), 2),
+                "p95_ms": round(1000 * times[min(len(times) - 1, int(len(times) * 0.95))], 2),
+                "max_ms": round(1000 * times[-1], 2),
+            })
+        return summary
+
+class RenderTimings:
+    """
+    Время этапов отрисовки кадра, мс
+    
+    transform - перенос и проекция вершин, cull - отсечение граней,
+    sort - сортировка по глубине, raster - рисование треугольников,
+    save - запись PNG.
+    """
+    
+    STAGES = ("transform", "cull", "sort", "raster", "save")
+    
+    def __init__(self):
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+    
+    def add(self, stage, seconds):
+        self.seconds[stage] += seconds
+    
+    def summary(self):
+        """dict: этап -> мс и total"""
+        summary = {stage: round(1000 * seconds, 3) for stage, seconds in self.seconds.items()}
+        summary["total"] = round(1000 * sum(self.seconds.values()), 3)
+        return summary
+
+class ScreenPickIndex:
+    """
+    Индекс выбора по спроецированным граням: равномерная сетка на экране
+    
+    Каждая грань регистрируется во всех ячейках, которые пересекает её
+    ограничивающий прямоугольник. Запрос проверяет только грани ячейки
+    под курсором (точное попадание в треугольник) и возвращает владельца
+    ближайшей грани.
+    """
+    
+    def __init__(self, triangles, depth, owner, width, height, cell_size=32, key=None):
+        self.key = key
+        self.cell_size = cell_size
+        self.columns = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self.triangles = triangles
+        self.depth = depth
+        self.owner = owner
+        
+        cells = self.columns * self.rows
+        if not len(triangles):
+            self.cell_start = np.zeros(cells + 1, dtype=np.intp)
+            self.face_ids = np.empty(0, dtype=np.intp)
+            return
+        
+        # Диапазоны ячеек ограничивающих прямоугольников (с обрезкой по экрану)
+        x = triangles[:, :, 0]
+        y = triangles[:, :, 1]
+        cx0 = np.clip(x.min(axis=1) // cell_size, 0, self.columns - 1)
+        cx1 = np.clip(x.max(axis=1) // cell_size, 0, self.columns - 1)
+        cy0 = np.clip(y.min(axis=1) // cell_size, 0, self.rows - 1)
+        cy1 = np.clip(y.max(axis=1) // cell_size, 0, self.rows - 1)
+        
+        on_screen = ((x.max(axis=1) >= 0) & (x.min(axis=1) < width) &
+                     (y.max(axis=1) >= 0) & (y.min(axis=1) < height))
+        span_x = cx1 - cx0 + 1
+        counts = np.where(on_screen, span_x * (cy1 - cy0 + 1), 0)
+        
+        # Пары (ячейка, грань) без цикла по граням
+        face_ids = np.repeat(np.arange(len(triangles)), counts)
+        local = np.arange(len(face_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_ids = ((cy0[face_ids] + local // span_x[face_ids]) * self.columns +
+                    cx0[face_ids] + local % span_x[face_ids])
+        
+        order = np.argsort(cell_ids, kind='stable')
+        self.face_ids = face_ids[order]
+        self.cell_start = np.searchsorted(cell_ids[order], np.arange(cells + 1))
+    
+    def pick(self, x, y):
+        """Номер компонента ближайшей грани под точкой (x, y) или None"""
+        column = x // self.cell_size
+        row = y // self.cell_size
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return None
+        
+        cell = row * self.columns + column
+        candidates = self.face_ids[self.cell_start[cell]:self.cell_start[cell + 1]]
+        if not len(candidates):
+            return None
+        
+        # Точка внутри треугольника (включая рёбра): знаки рёберных функций совпадают;
+        # вырожденные (нулевой площади) грани не выбираются
+        tri = self.triangles[candidates]
+        ax, ay = tri[:, 0, 0], tri[:, 0, 1]
+        bx, by = tri[:, 1, 0], tri[:, 1, 1]
+        cx, cy = tri[:, 2, 0], tri[:, 2, 1]
+        d1 = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+        d2 = (cx - bx) * (y - by) - (cy - by) * (x - bx)
+        d3 = (ax - cx) * (y - cy) - (ay - cy) * (x - cx)
+        inside = (((d1 >= 0) & (d2 >= 0) & (d3 >= 0)) |
+                  ((d1 <= 0) & (d2 <= 0) & (d3 <= 0))) & (d1 + d2 + d3 != 0)
+        
+        hits = candidates[inside]
+        if not len(hits):
+            return None
+        return int(self.owner[hits[np.argmin(self.depth[hits])]])
 
 class Fixed3DViewer:
     def __init__(self, width=1024, height=768, title="3D Просмотр"):
@@ -269,11 +393,38 @@ class Fixed3DViewer:
         self.tooltip_component = None
         self.tooltip_pos = (0, 0)
         
+        # Индекс выбора компонента под курсором (строится по проекции сцены)
+        self.pick_index = None
+        
         # Добавляем переменные для группировки
         self.object_groups = {}  # Словарь для группировки компонентов по объектам
         self.hovered_object = None  # Весь объект, над которым курсор
         self.current_section_data = None  # Данные секции для отображения в тултипе
         
+        # Уровни детализации: не больше стольких треугольников за кадр
+        self.triangle_budget = 60000
+        
+        # Автоподбор камеры под сцену (до первого движения камеры пользователем)
+        self.auto_frame = True
+        self.frame_fill = 0.9  # доля меньшей стороны окна под сцену
+        
+        # Фоновая загрузка мешей: до их прихода компоненты рисуются заглушками
+        self.scene_loader = None
+        self.pending_components = {}  # идентификатор содержимого -> компоненты-заглушки
+        self.loading_paths = {}       # загружаемый файл -> идентификатор содержимого
+        self.loading_poll_ms = 30     # ожидание событий во время загрузки
+        
+        # Перерисовка по изменениям: сцена (геометрия + панели) кэшируется
+        # во внеэкранной поверхности, поверх неё рисуется только тултип
+        self.scene_surface = None
+        self.scene_version = 0        # увеличивается при изменении сцены
+        self.idle_wait_ms = 500       # ожидание событий в простое
+        self.frame_stats = FrameStats()
+        self.show_frame_stats = False
+        
+        # Время этапов отрисовки (RenderTimings) - только при замерах
+        self.render_timings = None
+        
         # Цвета (совпадают с таблицей в параметрах)
         self.bg_color = (40, 45, 60)
         
@@ -299,126 +450,180 @@ class Fixed3DViewer:
             self.running = True
             return True
         except Exception as e:
-            print(f"Ошибка инициализации Pygame: {e}")
+            logger.exception("Ошибка инициализации Pygame: %s", e)
+            return False
+    
+    def initialize_headless(self):
+        """
+        Инициализация без окна: сцена рисуется во внеэкранную поверхность
+        
+        Нужен только модуль шрифтов pygame, поэтому рендер работает
+        без дисплея (на сервере сборки, в фоне).
+        """
+        if not PYGAME_AVAILABLE:
+            return False
+        
+        # Если какой-то код всё же обратится к видео - без реального окна
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        try:
+            pygame.font.init()
+            self.font = pygame.font.SysFont('Arial', 12)
+            self.title_font = pygame.font.SysFont('Arial', 16, bold=True)
+            self.screen = pygame.Surface((self.width, self.height))
+            return True
+        except Exception as e:
+            logger.exception("Ошибка инициализации внеэкранного рендера: %s", e)
             return False
     
+    def add_stage_time(self, stage, start):
+        """Добавляет время этапа с момента start (perf_counter), если идёт замер"""
+        if self.render_timings is not None:
+            self.render_timings.add(stage, time.perf_counter() - start)
+    
+    def find_model_path(self, model_name: str, fluid_type: str):
+        """Путь к файлу модели или None (по манифесту моделей)"""
+        return get_asset_manifest().get_model_path(model_name, fluid_type)
+    
     def load_model(self, model_name: str, fluid_type: str):
         """Загружает модель из файла"""
-        # Пробуем разные пути
-        base_paths = [
-            f"assets/3D_models/{fluid_type}/{model_name}.obj",
-            f"../assets/3D_models/{fluid_type}/{model_name}.obj",
-            f"./assets/3D_models/{fluid_type}/{model_name}.obj",
-            f"../../assets/3D_models/{fluid_type}/{model_name}.obj",
-            f"3D_models/{fluid_type}/{model_name}.obj",
-            f"{fluid_type}/{model_name}.obj",
-            f"{model_name}.obj"  # прямой путь
-        ]
+        path = self.find_model_path(model_name, fluid_type)
+        if path is not None:
+            logger.debug("Загружаем: %s", path)
+            return SmartOBJLoader.load(path)
         
-        for path in base_paths:
-            if os.path.exists(path):
-                print(f"Загружаем: {path}")
-                return SmartOBJLoader.load(path)
-        
-        print(f"Файл не найден: {model_name}.obj")
+        logger.warning("Файл не найден: %s.obj", model_name)
         return None, None
     
+    def set_simple_geometry(self, component: Component3D):
+        """
+        Упрощённая геометрия (модель не найдена или ещё загружается)
+
+        Треугольники create_* обходятся в разных направлениях, поэтому
+        нормалей у заглушки нет и нелицевые грани у неё не отсекаются.
+        """
+        vertices, faces = self.create_simple_geometry(component.model_name)
+        component.vertices = np.array(vertices, dtype=np.float32).reshape(-1, 3)
+        component.faces = np.array(faces, dtype=np.int32).reshape(-1, 3)
+        component.face_normals = None
+        self.set_metadata(component, compute_mesh_metadata(component.vertices, component.faces))
+        component.lods = [(None, component.vertices, component.faces, None)]
+        component.lod_level = 0
+    
+    def set_model_asset(self, component: Component3D, asset):
+        """Геометрия компонента из общего меша хранилища (массивы не копируются)"""
+        component.vertices = asset.vertices
+        component.faces = asset.faces
+        component.face_normals = asset.levels[0][3]
+        self.set_metadata(component, asset.metadata)
+        component.lods = asset.levels
+        component.lod_level = 0
+    
+    def set_metadata(self, component: Component3D, metadata):
+        component.metadata = metadata
+        component.bounding_center = tuple(metadata.sphere_center.tolist())
+        component.bounding_radius = metadata.sphere_radius
+    
     def add_component(self, component: Component3D, fluid_type: str, section_data=None):
         """Добавляет компонент с загрузкой модели"""
         # Загружаем модель
-        vertices, faces = self.load_model(component.model_name, fluid_type)
+        path = self.find_model_path(component.model_name, fluid_type)
+        asset = SmartOBJLoader.load_asset(path) if path is not None else None
         
-        if vertices and faces:
-            component.vertices = vertices
-            component.faces = faces
-            
-            # Вычисляем ограничивающий радиус
-            max_dist = 0
-            for v in vertices:
-                dist = math.sqrt(v[0]**2 + v[1]**2 + v[2]**2)
-                if dist > max_dist:
-                    max_dist = dist
-            component.bounding_radius = max(0.5, max_dist)
+        if asset is not None:
+            self.set_model_asset(component, asset)
         else:
             # Создаём простую геометрию для отладки
-            print(f"Создаю упрощённую модель для {component.model_name}")
-            component.vertices, component.faces = self.create_simple_geometry(component.model_name)
-            component.bounding_radius = 1.0
+            logger.info("Создаю упрощённую модель для %s", component.model_name)
+            self.set_simple_geometry(component)
         
+        self.append_component(component, section_data)
+    
+    def add_placeholder(self, component: Component3D, section_data=None):
+        """Добавляет компонент-заглушку; меш загружается в start_loading()"""
+        self.set_simple_geometry(component)
+        component.loading = True
+        self.append_component(component, section_data)
+    
+    def append_component(self, component: Component3D, section_data=None):
         self.components.append(component)
+        self.invalidate_scene()
         
         # Сохраняем данные секции для тултипов (только если переданы и еще не сохранены)
         if section_data is not None and self.current_section_data is None:
             self.current_section_data = section_data
-            print(f"  Сохранены данные секции: {section_data.get('name', 'Без имени')}")
+            logger.debug("Сохранены данные секции: %s", section_data.get('name', 'Без имени'))
         
-        print(f"  Добавлен: {component.model_name}")
-
-    def check_tooltip(self, mouse_pos):
-        """Проверяет, находится ли мышь над объектом"""
-        self.hovered_object = None
+        logger.debug("Добавлен: %s", component.model_name)
+    
+    # ========================================================================
+    # ФОНОВАЯ ЗАГРУЗКА МЕШЕЙ
+    # ========================================================================
+    
+    def start_loading(self, fluid_type: str):
+        """
+        Запускает фоновую загрузку мешей для всех заглушек
+        
+        Меши, уже имеющиеся в хранилище (в том числе одинаковые файлы
+        другой среды), подставляются сразу; каждый отсутствующий меш
+        загружается один раз, сколько бы компонентов его ни использовали.
+        """
+        manifest = get_asset_manifest()
+        store = get_mesh_store()
+        self.pending_components = {}
+        self.loading_paths = {}
         
-        # Для сложных объектов (НПС, КС и т.д.) группируем все компоненты
-        if self.current_section_data and self.current_section_data.get("is_complex", False):
-            # Проверяем, находится ли курсор над любым компонентом сложного объекта
-            for component in self.components:
-                # Пропускаем неокрашиваемые объекты
-                model_lower = component.model_name.lower()
-                if "unpaint" in model_lower or "dom_rodnoy" in model_lower:
-                    continue
-                
-                # Проецируем центр
-                center_2d, depth = self.project_3d_to_2d(component.position)
-                
-                if not center_2d:
-                    continue
-                
-                # Проверяем расстояние
-                distance = math.sqrt(
-                    (mouse_pos[0] - center_2d[0])**2 +
-                    (mouse_pos[1] - center_2d[1])**2
-                )
-                
-                # Учитываем размер компонента
-                radius_2d = component.bounding_radius * 500 / depth if depth > 0 else 30
-                
-                if distance < max(30, radius_2d):
-                    # Курсор над сложным объектом
-                    self.hovered_object = self.current_section_data
-                    self.tooltip_pos = mouse_pos
-                    return
+        for component in self.components:
+            if not component.loading:
+                continue
+            
+            content_id = manifest.get_content_id(component.model_name, fluid_type)
+            if content_id is None:
+                logger.info("Файл не найден: %s.obj, остаётся упрощённая модель",
+                            component.model_name)
+                component.loading = False
+            elif content_id in store:
+                self.apply_loaded(component, store.get(content_id))
+            else:
+                if content_id not in self.pending_components:
+                    path = manifest.get_model_path(component.model_name, fluid_type)
+                    self.loading_paths[path] = content_id
+                self.pending_components.setdefault(content_id, []).append(component)
+        
+        if self.loading_paths:
+            self.scene_loader = SceneLoader(self.loading_paths)
+        self.invalidate_scene()
+    
+    def apply_loaded(self, component: Component3D, asset):
+        """Подменяет заглушку загруженным мешем (при ошибке - остаётся заглушка)"""
+        component.loading = False
+        if asset is not None:
+            self.set_model_asset(component, asset)
         else:
-            # Для простых объектов (труб) показываем тултип для конкретного компонента
-            for component in self.components:
-                # Пропускаем неокрашиваемые объекты
-                model_lower = component.model_name.lower()
-                if "unpaint" in model_lower or "dom_rodnoy" in model_lower:
-                    continue
-                
-                # Пропускаем объекты без данных
-                if component.remaining_thickness is None:
-                    continue
-                
-                # Проецируем центр
-                center_2d, depth = self.project_3d_to_2d(component.position)
-                
-                if not center_2d:
-                    continue
-                
-                # Проверяем расстояние
-                distance = math.sqrt(
-                    (mouse_pos[0] - center_2d[0])**2 +
-                    (mouse_pos[1] - center_2d[1])**2
-                )
-                
-                # Учитываем размер компонента
-                radius_2d = component.bounding_radius * 500 / depth if depth > 0 else 30
-                
-                if distance < max(30, radius_2d):
-                    self.tooltip_component = component
-                    self.tooltip_pos = mouse_pos
-                    break
+            logger.info("Создаю упрощённую модель для %s", component.model_name)
+    
+    def poll_loading(self):
+        """Применяет меши, загруженные с прошлого опроса"""
+        store = get_mesh_store()
+        for path, asset in self.scene_loader.poll():
+            content_id = self.loading_paths.pop(path)
+            store.put(content_id, asset)
+            
+            for component in self.pending_components.pop(content_id, []):
+                self.apply_loaded(component, asset)
+            self.invalidate_scene()
+        
+        if self.scene_loader.finished:
+            logger.info("Меши сцены загружены: %d файлов; в хранилище %d мешей, %.1f МБ",
+                        self.scene_loader.total, len(store), store.nbytes / 2**20)
+            self.scene_loader = None
+            if self.auto_frame:
+                self.frame_camera()
     
+    def stop_loading(self):
+        if self.scene_loader is not None:
+            self.scene_loader.shutdown()
+            self.scene_loader = None
+
     def create_simple_geometry(self, model_name: str):
         """Создаёт простую геометрию для отладки"""
         if "pipe" in model_name.lower():
@@ -657,6 +862,10 @@ class Fixed3DViewer:
         """Возвращает цвет компонента по остаточной толщине"""
         model_lower = component.model_name.lower()
         
+        # 0. Заглушка на время загрузки - приглушённый цвет
+        if component.loading:
+            return (110, 115, 130)
+        
         # 1. НЕ ОКРАШИВАЕМЫЕ объекты - серый
         if "unpaint" in model_lower or "dom_rodnoy" in model_lower:
             return (180, 180, 180)  # Серый
@@ -687,22 +896,55 @@ class Fixed3DViewer:
         }
         return colors.get(level, (200, 200, 200))
     
+    def get_camera_rotation(self):
+        """(cos_y, sin_y, cos_x, sin_x) текущего поворота камеры"""
+        angle_y = math.radians(self.camera_rot[1])
+        angle_x = math.radians(self.camera_rot[0])
+        return math.cos(angle_y), math.sin(angle_y), math.cos(angle_x), math.sin(angle_x)
+    
+    def rotate_points(self, points):
+        """Поворот камеры для массива (N, 3): (x1, y1, z2) по столбцам"""
+        cos_y, sin_y, cos_x, sin_x = self.get_camera_rotation()
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        
+        x1 = x * cos_y - z * sin_y
+        z1 = x * sin_y + z * cos_y
+        y1 = y * cos_x - z1 * sin_x
+        z2 = y * sin_x + z1 * cos_x
+        return x1, y1, z2
+    
+    def project_points(self, points):
+        """
+        Проецирует массив 3D точек (N, 3) на экран за один проход
+        
+        Те же формулы, что project_3d_to_2d, но поворот считается один раз
+        на вызов, а точки обрабатываются операциями NumPy.
+        
+        Returns:
+        --------
+        screen : np.ndarray int (N, 2), depth : np.ndarray (N,)
+        """
+        x1, y1, z2 = self.rotate_points(points)
+        
+        # Перспектива
+        z_depth = np.maximum(z2 + self.camera_dist, 0.1)
+        factor = 500 / z_depth
+        
+        screen = np.empty((len(points), 2), dtype=np.int64)
+        screen[:, 0] = self.width // 2 + (x1 + self.camera_target[0]) * factor
+        screen[:, 1] = self.height // 2 - (y1 + self.camera_target[1]) * factor
+        return screen, z_depth
+    
     def project_3d_to_2d(self, point):
         """Проецирует 3D точку на 2D экран"""
         x, y, z = point
         
         # Вращение по осям
-        angle_y = math.radians(self.camera_rot[1])
-        cos_y = math.cos(angle_y)
-        sin_y = math.sin(angle_y)
+        cos_y, sin_y, cos_x, sin_x = self.get_camera_rotation()
         
         x1 = x * cos_y - z * sin_y
         z1 = x * sin_y + z * cos_y
         
-        angle_x = math.radians(self.camera_rot[0])
-        cos_x = math.cos(angle_x)
-        sin_x = math.sin(angle_x)
-        
         y1 = y * cos_x - z1 * sin_x
         z2 = y * sin_x + z1 * cos_x
         
@@ -717,89 +959,267 @@ class Fixed3DViewer:
         
         return (int(screen_x), int(screen_y)), z_depth
     
-    def draw_component(self, component: Component3D):
-        """Рисует компонент"""
-        if not component.vertices or not component.faces:
+    def get_world_sphere(self, component: Component3D):
+        """Ограничивающая сфера компонента в сцене: (центр np.ndarray (3,), радиус)"""
+        center = np.asarray(component.bounding_center) * component.scale + np.asarray(component.position)
+        return center, component.bounding_radius * component.scale
+    
+    def is_in_view(self, component: Component3D):
+        """
+        Попадает ли ограничивающая сфера компонента в окно
+        
+        Проверка консервативная: сфера заменяется кубом, а экранные границы
+        берутся по ближней и дальней его глубине.
+        """
+        center, radius = self.get_world_sphere(component)
+        x1, y1, z2 = self.rotate_points(center[None, :])
+        x = float(x1[0]) + self.camera_target[0]
+        y = float(y1[0]) + self.camera_target[1]
+        z = float(z2[0]) + self.camera_dist
+        if z - radius <= 0.1:
+            return True  # сфера у плоскости камеры
+        
+        factors = (500 / (z - radius), 500 / (z + radius))
+        xs = [(x + side) * factor for side in (-radius, radius) for factor in factors]
+        ys = [(y + side) * factor for side in (-radius, radius) for factor in factors]
+        return (self.width // 2 + min(xs) <= self.width and self.width // 2 + max(xs) >= 0 and
+                self.height // 2 - max(ys) <= self.height and self.height // 2 - min(ys) >= 0)
+    
+    def frame_camera(self):
+        """
+        Подбирает смещение и расстояние камеры так, чтобы вся сцена
+        (объединение ограничивающих сфер компонентов) помещалась в окно
+        при текущем повороте
+        """
+        if not self.components:
             return
+        spheres = [self.get_world_sphere(component) for component in self.components]
+        centers = np.array([center for center, _ in spheres])
+        radii = np.array([radius for _, radius in spheres])
         
-        color = self.get_component_color(component)
+        center = ((centers - radii[:, None]).min(axis=0) + (centers + radii[:, None]).max(axis=0)) / 2
+        radius = float((np.linalg.norm(centers - center, axis=1) + radii).max())
+        
+        x1, y1, z2 = self.rotate_points(center[None, :])
+        self.camera_target = [-float(x1[0]), -float(y1[0]), 0]
         
-        # Рисуем все полигоны
-        for face in component.faces:
-            if len(face) < 3:
+        # Сфера радиуса r с глубиной центра z занимает на экране ~r * 500 / z пикселей
+        half_size = self.frame_fill * min(self.width, self.height) / 2
+        distance = radius * 500 / half_size + radius - float(z2[0])
+        self.camera_dist = max(10, min(50, distance))
+    
+    def select_lods(self, components=None):
+        """
+        Выбирает уровень детализации каждого компонента (по умолчанию - всех)
+        
+        Уровень с сеткой resolution ячеек на диагональ даёт ошибку порядка
+        2 * R / resolution пикселей при экранном радиусе R ограничивающей
+        сферы, поэтому берётся самый грубый уровень с resolution >= R
+        (ошибка не больше ~2 пикселей). Если сумма треугольников превышает
+        triangle_budget, самые тяжёлые компоненты огрубляются дальше.
+        """
+        triangles = []
+        for component in self.components if components is None else components:
+            if not component.lods:
                 continue
+            center, radius = self.get_world_sphere(component)
+            _, depth = self.project_3d_to_2d(center)
+            screen_radius = radius * 500 / depth
             
-            points = []
-            for vertex_idx in face:
-                if vertex_idx < len(component.vertices):
-                    v = component.vertices[vertex_idx]
-                    # Применяем позицию и масштаб
-                    x = v[0] * component.scale + component.position[0]
-                    y = v[1] * component.scale + component.position[1]
-                    z = v[2] * component.scale + component.position[2]
-                    
-                    point_2d, _ = self.project_3d_to_2d((x, y, z))
-                    points.append(point_2d)
-            
-            if len(points) >= 3:
-                # Заливка
-                pygame.draw.polygon(self.screen, color, points)
-                # Контур
-                darker = (max(0, color[0] - 40), max(0, color[1] - 40), max(0, color[2] - 40))
-                pygame.draw.polygon(self.screen, darker, points, 1)
-    
-    def draw_components(self):
-        """Рисует все компоненты с сортировкой по глубине"""
-        # Сортируем по расстоянию до камеры
+            level = 0
+            for index, lod in enumerate(component.lods[1:], 1):
+                if lod[0] >= screen_radius:
+                    level = index
+            component.lod_level = level
+            triangles.append(component)
+        
+        total = sum(len(c.lods[c.lod_level][2]) for c in triangles)
+        while total > self.triangle_budget:
+            coarsenable = [c for c in triangles if c.lod_level + 1 < len(c.lods)]
+            if not coarsenable:
+                break
+            heaviest = max(coarsenable, key=lambda c: len(c.lods[c.lod_level][2]))
+            total -= len(heaviest.lods[heaviest.lod_level][2])
+            heaviest.lod_level += 1
+            total += len(heaviest.lods[heaviest.lod_level][2])
+    
+    def get_visible_faces(self, component: Component3D):
+        """
+        Этап конвейера для компонента: проекция, отсечение, глубина
+        
+        Используется уровень детализации component.lod_level.
+        Отбрасываются грани, повёрнутые от камеры (нормаль в системе камеры
+        смотрит от наблюдателя), и грани, схлопнувшиеся в один пиксель.
+        
+        Returns:
+        --------
+        triangles : np.ndarray int (K, 3, 2) - экранные координаты граней
+        depth : np.ndarray (K,) - средняя глубина граней
+        """
+        empty = np.empty((0, 3, 2), dtype=np.int64), np.empty(0)
+        if component.lods:
+            _, vertices, faces, normals = component.lods[min(component.lod_level, len(component.lods) - 1)]
+        else:
+            vertices, faces, normals = component.vertices, component.faces, component.face_normals
+        if vertices is None or faces is None or not len(faces):
+            return empty
+        
+        # Позиция и масштаб, затем проекция: каждая общая вершина - один раз
+        start = time.perf_counter()
+        world = vertices.astype(np.float64) * component.scale + np.asarray(component.position)
+        screen, depth = self.project_points(world)
+        self.add_stage_time("transform", start)
+        
+        start = time.perf_counter()
+        # Отсечение нелицевых граней: точка грани в системе камеры
+        # (камера в начале координат) и повёрнутая нормаль
+        if normals is not None:
+            x1, y1, z2 = self.rotate_points(world[faces[:, 0]])
+            nx, ny, nz = self.rotate_points(normals)
+            facing = ((x1 + self.camera_target[0]) * nx +
+                      (y1 + self.camera_target[1]) * ny +
+                      (z2 + self.camera_dist) * nz)
+            faces = faces[facing < 0]
+        
+        # Экранные координаты треугольников по массиву индексов (K, 3, 2)
+        triangles = screen[faces]
+        
+        # Треугольники, схлопнувшиеся в один пиксель, не видны за соседями
+        visible = ~((triangles[:, 0] == triangles[:, 1]).all(axis=1) &
+                    (triangles[:, 0] == triangles[:, 2]).all(axis=1))
+        triangles, depth = triangles[visible], depth[faces[visible]].mean(axis=1)
+        self.add_stage_time("cull", start)
+        return triangles, depth
+    
+    def draw_faces(self, triangles, depth, colors, color_index, surface=None):
+        """
+        Рисует грани от дальних к ближним (алгоритм художника)
+        
+        colors - список (заливка, контур), color_index - номер цвета грани
+        """
+        draw_polygon = pygame.draw.polygon
+        if surface is None:
+            surface = self.screen
+        start = time.perf_counter()
+        order = np.argsort(-depth, kind='stable')
+        self.add_stage_time("sort", start)
+        
+        start = time.perf_counter()
+        for points, index in zip(triangles[order].tolist(), color_index[order].tolist()):
+            fill, outline = colors[index]
+            # Заливка
+            draw_polygon(surface, fill, points)
+            # Контур
+            draw_polygon(surface, outline, points, 1)
+        self.add_stage_time("raster", start)
+    
+    def get_component_colors(self, component: Component3D):
+        """Цвет заливки и более тёмный цвет контура"""
+        color = self.get_component_color(component)
+        darker = (max(0, color[0] - 40), max(0, color[1] - 40), max(0, color[2] - 40))
+        return color, darker
+    
+    def draw_component(self, component: Component3D, surface=None):
+        """Рисует компонент"""
+        triangles, depth = self.get_visible_faces(component)
+        self.draw_faces(triangles, depth, [self.get_component_colors(component)],
+                        np.zeros(len(depth), dtype=np.intp), surface)
+    
+    def collect_scene_faces(self):
+        """
+        Видимые грани всех компонентов текущей проекции
+        
+        Компоненты, чья ограничивающая сфера не попадает в окно, не
+        проецируются и не участвуют в бюджете треугольников. Заодно
+        перестраивает индекс выбора (pick_index) по тем же граням.
+        
+        Returns:
+        --------
+        triangles (K, 3, 2), depth (K,), owner (K,) - номер компонента грани
+        """
+        start = time.perf_counter()
+        in_view = [self.is_in_view(component) for component in self.components]
+        self.add_stage_time("cull", start)
+        self.select_lods([component for component, shown in zip(self.components, in_view) if shown])
+        
+        all_triangles = [np.empty((0, 3, 2), dtype=np.int64)]
+        all_depth = [np.empty(0)]
+        owners = [np.empty(0, dtype=np.intp)]
+        
+        for index, component in enumerate(self.components):
+            if not in_view[index]:
+                continue
+            triangles, depth = self.get_visible_faces(component)
+            if not len(depth):
+                continue
+            all_triangles.append(triangles)
+            all_depth.append(depth)
+            owners.append(np.full(len(depth), index, dtype=np.intp))
+        
+        triangles = np.concatenate(all_triangles)
+        depth = np.concatenate(all_depth)
+        owner = np.concatenate(owners)
+        self.pick_index = ScreenPickIndex(triangles, depth, owner, self.width, self.height,
+                                          key=self.get_scene_key())
+        return triangles, depth, owner
+    
+    def draw_components(self, surface=None):
+        """Рисует все компоненты: видимые грани сортируются по глубине вместе"""
         if not self.components:
             return
         
-        sorted_components = sorted(
-            self.components,
-            key=lambda c: math.sqrt(
-                (c.position[0] - self.camera_target[0])**2 +
-                (c.position[1] - self.camera_target[1])**2 +
-                (c.position[2] - self.camera_target[2])**2
-            ),
-            reverse=True
-        )
+        triangles, depth, owner = self.collect_scene_faces()
+        if not len(depth):
+            return
         
-        for component in sorted_components:
-            self.draw_component(component)
+        colors = [self.get_component_colors(component) for component in self.components]
+        self.draw_faces(triangles, depth, colors, owner, surface)
+    
+    def is_unpainted(self, component: Component3D):
+        """Неокрашиваемый объект (окружение сцены) - без тултипа"""
+        model_lower = component.model_name.lower()
+        return "unpaint" in model_lower or "dom_rodnoy" in model_lower
+    
+    def is_pickable(self, component: Component3D):
+        """Показывается ли для компонента тултип"""
+        if self.is_unpainted(component):
+            return False
+        
+        # Объекты без данных (кроме труб, у которых есть значения по умолчанию)
+        return component.original_thickness is not None or "pipe" in component.model_name.lower()
+    
+    def update_pick_index(self):
+        """Строит индекс выбора по текущей проекции без отрисовки"""
+        self.collect_scene_faces()
     
     def check_tooltip(self, mouse_pos):
-        """Проверяет, находится ли мышь над окрашиваемым компонентом"""
+        """
+        Определяет компонент под курсором по индексу выбора
+        
+        Берётся ближайшая к камере грань под курсором (как при отрисовке);
+        если она принадлежит компоненту без тултипа, тултипа нет. Компоненты
+        сложного объекта (НПС, КС и т.д.) группируются: под курсором весь
+        объект (hovered_object) и тултип по всем его компонентам.
+        """
         self.tooltip_component = None
+        self.hovered_object = None
         
-        for component in self.components:
-            # Пропускаем неокрашиваемые объекты
-            model_lower = component.model_name.lower()
-            if "unpaint" in model_lower or "dom_rodnoy" in model_lower:
-                continue
-            
-            # Пропускаем объекты без данных (кроме труб, у которых есть значения по умолчанию)
-            if component.original_thickness is None and "pipe" not in model_lower:
-                continue
-            
-            # Проецируем центр
-            center_2d, depth = self.project_3d_to_2d(component.position)
-            
-            if not center_2d:
-                continue
-            
-            # Проверяем расстояние
-            distance = math.sqrt(
-                (mouse_pos[0] - center_2d[0])**2 +
-                (mouse_pos[1] - center_2d[1])**2
-            )
-            
-            # Учитываем размер компонента
-            radius_2d = component.bounding_radius * 500 / depth if depth > 0 else 30
-            
-            if distance < max(30, radius_2d):
-                self.tooltip_component = component
+        if self.pick_index is None or self.pick_index.key != self.get_scene_key():
+            self.update_pick_index()
+        
+        owner = self.pick_index.pick(mouse_pos[0], mouse_pos[1])
+        if owner is None:
+            return
+        
+        component = self.components[owner]
+        section = self.current_section_data
+        if section is not None and section.get("is_complex", False):
+            if not self.is_unpainted(component):
+                self.hovered_object = section
                 self.tooltip_pos = mouse_pos
-                break
+        elif self.is_pickable(component):
+            self.tooltip_component = component
+            self.tooltip_pos = mouse_pos
     
     def draw_tooltip(self):
         """Рисует тултип с информацией - ДЛЯ СЛОЖНЫХ ОБЪЕКТОВ"""
@@ -879,7 +1299,6 @@ class Fixed3DViewer:
         
         # Определяем общее состояние (наихудшее среди компонентов)
         components = section.get("components", [])
-        components_data = section.get("components_data", [])
         
         if components:
             lines.append(f"Компонентов: {len(components)}")
@@ -889,18 +1308,8 @@ class Fixed3DViewer:
             worst_thickness = 10.0
             
             for i, comp in enumerate(components):
-                # Получаем остаточную толщину
-                remaining = None
-                
-                # Сначала ищем в components_data
-                if i < len(components_data):
-                    remaining = components_data[i].get("remaining")
-                
-                # Если не нашли, используем значение из компонента
-                if remaining is None:
-                    remaining = comp.get("remaining", 
-                                        comp.get("thickness", 
-                                                comp.get("wall_thickness", 10.0)))
+                # Остаточная толщина из хранилища результатов участка
+                remaining = get_component_remaining(section, comp, i)
                 
                 # Определяем состояние для этого компонента
                 comp_state, _ = get_corrosion_level(remaining)
@@ -921,14 +1330,7 @@ class Fixed3DViewer:
             max_components = 6
             for i, comp in enumerate(components[:max_components]):
                 comp_name = comp.get("name", f"Компонент {i+1}")
-                # Получаем остаточную толщину
-                remaining = None
-                if i < len(components_data):
-                    remaining = components_data[i].get("remaining")
-                if remaining is None:
-                    remaining = comp.get("remaining", 
-                                        comp.get("thickness", 
-                                                comp.get("wall_thickness", 10.0)))
+                remaining = get_component_remaining(section, comp, i)
                 
                 comp_state, _ = get_corrosion_level(remaining)
                 lines.append(f"  • {comp_name}: {remaining:.1f} мм ({comp_state})")
@@ -979,11 +1381,14 @@ class Fixed3DViewer:
             self.screen.blit(text, 
                            (tooltip_x + padding, tooltip_y + padding + i * line_height))
     
-    def draw_ui(self):
+    def draw_ui(self, surface=None):
         """Рисует элементы интерфейса"""
+        if surface is None:
+            surface = self.screen
+        
         # Заголовок
         title = self.title_font.render(self.title, True, (240, 240, 240))
-        self.screen.blit(title, (10, 10))
+        surface.blit(title, (10, 10))
         
         # Информация
         colored_count = sum(1 for c in self.components 
@@ -992,7 +1397,7 @@ class Fixed3DViewer:
         
         info_text = f"Компонентов: {len(self.components)} (окрашено: {colored_count})"
         info_surf = self.font.render(info_text, True, (200, 200, 200))
-        self.screen.blit(info_surf, (self.width - info_surf.get_width() - 10, 10))
+        surface.blit(info_surf, (self.width - info_surf.get_width() - 10, 10))
         
         # Инструкция
         controls = [
@@ -1000,12 +1405,20 @@ class Fixed3DViewer:
             "ЛКМ + движение - вращение",
             "Колесо мыши - масштабирование",
             "R - сброс камеры",
+            "F - статистика кадров",
             "ESC - выход"
         ]
         
         for i, text in enumerate(controls):
             surf = self.font.render(text, True, (200, 200, 200))
-            self.screen.blit(surf, (10, 40 + i * 18))
+            surface.blit(surf, (10, 40 + i * 18))
+        
+        # Ход фоновой загрузки мешей
+        if self.scene_loader is not None:
+            loader = self.scene_loader
+            loading_surf = self.font.render(f"Загрузка моделей: {loader.done}/{loader.total}",
+                                            True, (230, 200, 120))
+            surface.blit(loading_surf, (self.width - loading_surf.get_width() - 10, 28))
         
         # Легенда цветов
         legend_y = self.height - 160
@@ -1018,39 +1431,124 @@ class Fixed3DViewer:
         ]
         
         # Фон легенды
-        pygame.draw.rect(self.screen, (30, 35, 45), 
+        pygame.draw.rect(surface, (30, 35, 45), 
                         (10, legend_y - 10, 280, 185))
-        pygame.draw.rect(self.screen, (60, 70, 85), 
+        pygame.draw.rect(surface, (60, 70, 85), 
                         (10, legend_y - 10, 280, 185), 1)
         
         legend_title = self.font.render("Индикация состояния:", True, (220, 220, 220))
-        self.screen.blit(legend_title, (15, legend_y - 5))
+        surface.blit(legend_title, (15, legend_y - 5))
         
         for i, (color, text) in enumerate(legend_items):
-            pygame.draw.rect(self.screen, color, (20, legend_y + 20 + i * 25, 12, 12))
+            pygame.draw.rect(surface, color, (20, legend_y + 20 + i * 25, 12, 12))
             text_surf = self.font.render(text, True, (200, 200, 200))
-            self.screen.blit(text_surf, (40, legend_y + 20 + i * 25))
+            surface.blit(text_surf, (40, legend_y + 20 + i * 25))
+    
+    def invalidate_scene(self):
+        """Помечает сцену для перерисовки (изменились компоненты или их цвета)"""
+        self.scene_version += 1
+    
+    def get_scene_key(self):
+        """Состояние, от которого зависит изображение сцены"""
+        return (self.camera_dist, tuple(self.camera_rot), tuple(self.camera_target),
+                len(self.components), self.scene_version)
+    
+    def render_scene(self, with_ui=True):
+        """Проецирует и рисует сцену (фон, геометрия, панели) во внеэкранную поверхность"""
+        if self.scene_surface is None or self.scene_surface.get_size() != (self.width, self.height):
+            self.scene_surface = pygame.Surface((self.width, self.height))
+        
+        self.scene_surface.fill(self.bg_color)
+        self.draw_components(self.scene_surface)
+        if with_ui:
+            self.draw_ui(self.scene_surface)
+    
+    def render_image(self, path, camera_rot=None, camera_dist=None, with_ui=False):
+        """
+        Рисует сцену с заданной камеры и сохраняет в файл (PNG по расширению)
+        
+        Returns:
+        --------
+        RenderTimings этого кадра
+        """
+        if camera_rot is not None:
+            self.camera_rot = list(camera_rot)
+        if camera_dist is not None:
+            self.camera_dist = camera_dist
+        
+        timings = self.render_timings = RenderTimings()
+        try:
+            self.render_scene(with_ui)
+            start = time.perf_counter()
+            pygame.image.save(self.scene_surface, path)
+            self.add_stage_time("save", start)
+        finally:
+            self.render_timings = None
+        return timings
+    
+    def get_overlay_key(self):
+        """Состояние слоя тултипа: кадр выводится заново только при его изменении"""
+        shown = self.tooltip_component is not None or self.hovered_object is not None
+        return (id(self.tooltip_component), id(self.hovered_object),
+                self.tooltip_pos if shown else None, self.show_frame_stats)
+    
+    def draw_frame_stats(self):
+        """Строка со статистикой кадров в правом нижнем углу"""
+        stats = self.frame_stats.summary()
+        text = (f"кадр: {stats.get('avg_ms', 0):.1f} мс (p95 {stats.get('p95_ms', 0):.1f}), "
+                f"сцена: {stats['scene_renders']}/{stats['frames']}")
+        surf = self.font.render(text, True, (200, 200, 200))
+        self.screen.blit(surf, (self.width - surf.get_width() - 10, self.height - 24))
+    
+    def wait_events(self):
+        """
+        События без ожидания, а если их нет - ожидание до idle_wait_ms
+        (во время фоновой загрузки - до loading_poll_ms)
+        """
+        events = pygame.event.get()
+        if events:
+            return events
+        
+        self.frame_stats.idle_waits += 1
+        timeout = self.loading_poll_ms if self.scene_loader is not None else self.idle_wait_ms
+        try:
+            event = pygame.event.wait(timeout)
+        except TypeError:
+            # pygame 1.x: wait() без таймаута
+            event = pygame.event.wait()
+        return [event] + pygame.event.get()
     
     def run(self):
-        """Главный цикл"""
+        """Главный цикл: перерисовка только при изменении камеры или тултипа"""
         if not self.running:
             return
         
+        scene_key = None
+        overlay_key = None
+        last_mouse_pos = None
+        
         while self.running:
-            # Обработка событий
-            for event in pygame.event.get():
+            # Обработка событий (в простое - ожидание без нагрузки на процессор)
+            force_present = False
+            for event in self.wait_events():
                 if event.type == QUIT:
                     self.running = False
                     break
                 
+                elif event.type == VIDEOEXPOSE:
+                    force_present = True
+                
                 elif event.type == MOUSEBUTTONDOWN:
                     if event.button == 1:  # ЛКМ
                         self.dragging = True
                         self.last_mouse = pygame.mouse.get_pos()
+                        self.auto_frame = False
                     elif event.button == 4:  # Колесо вверх
                         self.camera_dist = max(10, self.camera_dist / self.zoom_speed)
+                        self.auto_frame = False
                     elif event.button == 5:  # Колесо вниз
                         self.camera_dist = min(50, self.camera_dist * self.zoom_speed)
+                        self.auto_frame = False
                 
                 elif event.type == MOUSEBUTTONUP:
                     if event.button == 1:
@@ -1072,175 +1570,134 @@ class Fixed3DViewer:
                     if event.key == K_ESCAPE:
                         self.running = False
                         break
-                    elif event.key == K_r:  # Сброс камеры
-                        self.camera_dist = 20.0
+                    elif event.key == K_r:  # Сброс камеры: вид на всю сцену
                         self.camera_rot = [-30, 45]
-                        self.camera_target = [0, 0, 0]
+                        self.frame_camera()
+                    elif event.key == K_f:  # Статистика кадров
+                        self.show_frame_stats = not self.show_frame_stats
             
-            # Проверка тултипов
-            mouse_pos = pygame.mouse.get_pos()
-            self.check_tooltip(mouse_pos)
+            if not self.running:
+                break
             
-            # Очистка экрана
-            self.screen.fill(self.bg_color)
+            frame_start = time.perf_counter()
             
-            # Отрисовка компонентов
-            self.draw_components()
+            # Подмена заглушек загруженными мешами
+            if self.scene_loader is not None:
+                self.poll_loading()
             
-            # Отрисовка тултипа
-            self.draw_tooltip()
+            # Сцена проецируется заново только при изменении камеры/компонентов
+            key = self.get_scene_key()
+            scene_changed = key != scene_key
+            if scene_changed:
+                self.render_scene()
+                scene_key = key
+            
+            # Проверка тултипов - при движении мыши или новой проекции
+            mouse_pos = pygame.mouse.get_pos()
+            if scene_changed or mouse_pos != last_mouse_pos:
+                self.check_tooltip(mouse_pos)
+                last_mouse_pos = mouse_pos
             
-            # Отрисовка UI
-            self.draw_ui()
+            # Вывод кадра: готовая сцена + тултип поверх
+            overlay = self.get_overlay_key()
+            if scene_changed or force_present or overlay != overlay_key:
+                self.screen.blit(self.scene_surface, (0, 0))
+                self.draw_tooltip()
+                if self.show_frame_stats:
+                    self.draw_frame_stats()
+                pygame.display.flip()
+                overlay_key = overlay
+                self.frame_stats.add(time.perf_counter() - frame_start, scene_changed)
             
-            # Обновление экрана
-            pygame.display.flip()
+            # Не чаще 60 кадров в секунду при непрерывном вращении
             self.clock.tick(60)
         
+        self.stop_loading()
+        logger.info("Статистика кадров 3D: %s", self.frame_stats.summary())
         pygame.quit()
 
 # ============================================================================
 # ГЛАВНАЯ ФУНКЦИЯ С ИСПРАВЛЕНИЯМИ
 # ============================================================================
 
-def show_3d_viewer(section_data, fluid_type="oil"):
+def match_model_component(model_name, keys, key_index, position):
     """
-    Показывает 3D просмотрщик для секции трубопровода
-    
-    Args:
-        section_data: dict с данными секции (из parameters_tab.py)
-        fluid_type: "oil" или "gas"
+    Сопоставляет 3D-модель компоненту участка
+
+    Порядок: точное совпадение ключа, вхождение ключа в имя модели
+    (или наоборот), совпадение части имени модели, порядковый номер.
+
+    Returns:
+    --------
+    (номер компонента или None, способ сопоставления)
     """
-    if not PYGAME_AVAILABLE:
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("Ошибка", 
-            "Библиотека Pygame не установлена.\n"
-            "Установите: pip install pygame")
-        root.destroy()
-        return
+    model_lower = model_name.lower()
     
-    # Получаем данные секции
-    section_name = section_data.get("name", "3D Модель")
-    object_type = section_data.get("object_type", "pipe")
-    is_complex = section_data.get("is_complex", False)
+    index = key_index.get(model_lower)
+    if index is not None:
+        return index, "точное совпадение"
     
-    print(f"\n{'='*60}")
-    print(f"Запуск 3D просмотрщика для: {section_name}")
-    print(f"Тип объекта: {object_type}")
-    print(f"Тип жидкости: {fluid_type}")
-    print(f"Сложный объект: {is_complex}")
-    print(f"{'='*60}")
+    for index, key in enumerate(keys):
+        if key and (key in model_lower or model_lower in key):
+            return index, f"ключ '{key}'"
     
-    # Создаём просмотрщик
-    viewer = Fixed3DViewer(1024, 768, f"3D: {section_name}")
+    model_parts = [part for part in model_name.split('_') if part]
+    for index, key in enumerate(keys):
+        for part in model_parts:
+            if key and part in key:
+                return index, f"часть '{part}'"
     
-    if not viewer.initialize():
-        messagebox.showerror("Ошибка", 
-            "Не удалось инициализировать 3D просмотрщик.\n"
-            "Убедитесь, что установлен pygame: pip install pygame")
-        return
+    if position < len(keys):
+        return position, "по порядку"
+    return None, None
+
+
+def build_section_components(section_data, fluid_type):
+    """
+    Компоненты 3D-сцены участка (без геометрии)
+    
+    Модели берутся по типу объекта, толщины и состояние - из данных
+    участка и его результатов расчёта.
+    
+    Returns:
+    --------
+    list of Component3D
+    """
+    object_type = section_data.get("object_type", "pipe")
+    is_complex = section_data.get("is_complex", False)
     
     # Получаем список моделей для объекта
     model_configs = get_3d_models(object_type, fluid_type)
-    print(f"Найдено моделей для '{object_type}': {len(model_configs)}")
-    for model, pos in model_configs:
-        print(f"  - {model}")
-    
-    # Получаем данные компонентов
-    components_data = []
-    original_components = []
+    logger.debug("Найдено моделей для '%s': %d", object_type, len(model_configs))
     
+    # Компоненты участка и их результаты из хранилища участка
+    results = get_section_results(section_data)
     if is_complex:
-        # Для сложных объектов
-        components_data = section_data.get("components_data", [])
-        original_components = section_data.get("components", [])
-        
-        print(f"Данных коррозии: {len(components_data)}")
-        print(f"Исходных компонентов: {len(original_components)}")
+        components = section_data.get("components", [])
+        records = [results.get(get_component_id(comp, i)) for i, comp in enumerate(components)]
+        keys = [get_component_id(comp, i).replace(".", "_") for i, comp in enumerate(components)]
     else:
-        # Для простых труб
-        components_data = [{
-            "component_id": "pipe",
-            "remaining": section_data.get("remaining_thickness", section_data.get("thickness", 10.0)),
-            "level": section_data.get("corrosion_level", "отличное")
-        }]
-        original_components = [{
-            "component_id": "pipe",
+        # Простая труба - один компонент
+        components = [{
             "thickness": section_data.get("thickness", 10.0),
-            "material": section_data.get("material", ""),
-            "wall_thickness": section_data.get("thickness", 10.0)
+            "material": section_data.get("material", "")
         }]
+        records = [results.get(section_data.get("component_id", ""))]
+        keys = ["pipe"]
     
-    # Создаём маппинг для быстрого поиска
-    corrosion_map = {}
-    for comp in components_data:
-        comp_id = comp.get("component_id", "").replace(".", "_")
-        if comp_id:
-            corrosion_map[comp_id] = comp
+    logger.debug("Компонентов: %d, с результатами расчёта: %d",
+                 len(components), sum(record is not None for record in records))
     
-    thickness_map = {}
-    for comp in original_components:
-        comp_id = comp.get("component_id", "").replace(".", "_")
-        if comp_id:
-            thickness_map[comp_id] = comp
+    # Индекс ключ -> номер компонента для точного совпадения за O(1)
+    key_index = {}
+    for index, key in enumerate(keys):
+        if key:
+            key_index.setdefault(key, index)
     
-    # Добавляем все компоненты
+    # Создаём все компоненты
+    components3d = []
     for i, (model_name, position) in enumerate(model_configs):
-        print(f"\nОбработка модели {i+1}/{len(model_configs)}: {model_name}")
-        
-        # Ищем данные для этой модели
-        component_info = None
-        thickness_info = None
-        
-        # Пробуем разные стратегии сопоставления
-        model_lower = model_name.lower()
-        
-        # 1. Прямое совпадение
-        for key in corrosion_map:
-            if key in model_lower or model_lower in key:
-                component_info = corrosion_map[key]
-                print(f"  Найдены данные коррозии по ключу '{key}'")
-                break
-        
-        # 2. Поиск по частям имени
-        if not component_info:
-            model_parts = model_name.split('_')
-            for key in corrosion_map:
-                for part in model_parts:
-                    if part and part in key:
-                        component_info = corrosion_map[key]
-                        print(f"  Найдены данные коррозии по части '{part}'")
-                        break
-                if component_info:
-                    break
-        
-        # 3. По порядку (если количество совпадает)
-        if not component_info and i < len(components_data):
-            component_info = components_data[i]
-            print(f"  Назначены данные коррозии по порядку")
-        
-        # То же самое для толщины
-        for key in thickness_map:
-            if key in model_lower or model_lower in key:
-                thickness_info = thickness_map[key]
-                print(f"  Найдены данные толщины по ключу '{key}'")
-                break
-        
-        if not thickness_info:
-            model_parts = model_name.split('_')
-            for key in thickness_map:
-                for part in model_parts:
-                    if part and part in key:
-                        thickness_info = thickness_map[key]
-                        print(f"  Найдены данные толщины по части '{part}'")
-                        break
-                if thickness_info:
-                    break
-        
-        if not thickness_info and i < len(original_components):
-            thickness_info = original_components[i]
-            print(f"  Назначены данные толщины по порядку")
+        index, match = match_model_component(model_name, keys, key_index, i)
         
         # Извлекаем данные
         original_thickness = None
@@ -1248,27 +1705,37 @@ def show_3d_viewer(section_data, fluid_type="oil"):
         corrosion_level = "отличное"
         material = ""
         
-        if thickness_info:
-            original_thickness = thickness_info.get("thickness") or thickness_info.get("wall_thickness")
-            material = thickness_info.get("material", "")
-            print(f"  Исходная толщина: {original_thickness}")
+        if index is not None:
+            comp = components[index]
+            original_thickness = comp.get("thickness") or comp.get("wall_thickness")
+            material = comp.get("material", "")
+            
+            record = records[index]
+            if record is not None:
+                remaining_thickness = record["remaining"]
+                corrosion_level = record["level"]
         
-        if component_info:
-            remaining_thickness = component_info.get("remaining")
-            corrosion_level = component_info.get("level", "отличное")
-            print(f"  Остаточная толщина: {remaining_thickness}, Уровень: {corrosion_level}")
+        model_lower = model_name.lower()
         
         # Для труб без данных устанавливаем значения по умолчанию
         if "pipe" in model_lower:
             if original_thickness is None:
                 original_thickness = 10.0
-                print(f"  Установлена толщина по умолчанию для трубы: {original_thickness}")
             if remaining_thickness is None:
                 remaining_thickness = original_thickness
-                print(f"  Установлена остаточная толщина по умолчанию: {remaining_thickness}")
+        
+        if logger.isEnabledFor(DIAGNOSTICS):
+            logger.log(DIAGNOSTICS, "Сопоставление 3D-модели", extra={"diagnostics": {
+                "index": i,
+                "model": model_name,
+                "match": match,
+                "original_thickness": original_thickness,
+                "remaining_thickness": remaining_thickness,
+                "level": corrosion_level,
+            }})
         
         # Создаём компонент
-        component = Component3D(
+        components3d.append(Component3D(
             model_name=model_name,
             display_name=get_display_name(model_name),
             position=position,
@@ -1277,21 +1744,117 @@ def show_3d_viewer(section_data, fluid_type="oil"):
             remaining_thickness=remaining_thickness,
             corrosion_level=corrosion_level,
             material=material
-        )
-        
-        # Передаём данные секции только при добавлении первого компонента
+        ))
+    
+    return components3d
+
+
+def show_3d_viewer(section_data, fluid_type="oil"):
+    """
+    Показывает 3D просмотрщик для секции трубопровода
+    
+    Args:
+        section_data: dict с данными секции (из parameters_tab.py)
+        fluid_type: "oil" или "gas"
+    """
+    if not PYGAME_AVAILABLE:
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("Ошибка", 
+            "Библиотека Pygame не установлена.\n"
+            "Установите: pip install pygame")
+        root.destroy()
+        return
+    
+    # Получаем данные секции
+    section_name = section_data.get("name", "3D Модель")
+    object_type = section_data.get("object_type", "pipe")
+    is_complex = section_data.get("is_complex", False)
+    
+    logger.info("Запуск 3D просмотрщика для: %s (объект: %s, среда: %s, сложный: %s)",
+                section_name, object_type, fluid_type, is_complex)
+    
+    # Создаём просмотрщик
+    viewer = Fixed3DViewer(1024, 768, f"3D: {section_name}")
+    
+    if not viewer.initialize():
+        messagebox.showerror("Ошибка", 
+            "Не удалось инициализировать 3D просмотрщик.\n"
+            "Убедитесь, что установлен pygame: pip install pygame")
+        return
+    
+    # Компоненты-заглушки; данные секции передаются с первым компонентом
+    for i, component in enumerate(build_section_components(section_data, fluid_type)):
         if i == 0:
-            viewer.add_component(component, fluid_type, section_data)
+            viewer.add_placeholder(component, section_data)
         else:
-            viewer.add_component(component, fluid_type)
+            viewer.add_placeholder(component)
     
-    print(f"\n{'='*60}")
-    print(f"Загрузка завершена! Всего компонентов: {len(viewer.components)}")
-    print(f"{'='*60}")
+    # Окно открывается сразу, меши подменяют заглушки по мере загрузки;
+    # камера подбирается под сцену и ещё раз - когда загрузятся все меши
+    viewer.start_loading(fluid_type)
+    viewer.frame_camera()
+    logger.info("Компонентов: %d, загружается файлов: %d",
+                len(viewer.components), len(viewer.loading_paths))
     
     # Запускаем просмотрщик
     viewer.run()
 
+# ============================================================================
+# ВНЕЭКРАННЫЙ РЕНДЕР (ИКОНКИ, ОТЧЁТЫ, ЗАМЕРЫ)
+# ============================================================================
+
+# Ракурсы по умолчанию: (наклон, поворот) камеры, градусы
+DEFAULT_RENDER_VIEWS = [(-30, 45), (-30, 135), (-60, 45)]
+
+
+def render_section_images(section_data, fluid_type="oil", output_dir=".", views=None,
+                          width=512, height=384, with_ui=False, name=None):
+    """
+    Рисует участок с нескольких ракурсов в PNG без окна
+    
+    Args:
+        section_data: dict с данными секции (как для show_3d_viewer)
+        views: список (наклон, поворот) или (наклон, поворот, расстояние);
+            без расстояния камера подбирается под всю сцену
+        with_ui: рисовать заголовок, подсказки и легенду
+        name: начало имён файлов (по умолчанию - тип объекта)
+    
+    Returns:
+    --------
+    dict: load_ms - загрузка мешей; images - список
+    {"path", "view", "timings"} (время этапов кадра, мс)
+    """
+    if not PYGAME_AVAILABLE:
+        raise RuntimeError("Библиотека Pygame не установлена")
+    
+    viewer = Fixed3DViewer(width, height, section_data.get("name", "3D Модель"))
+    if not viewer.initialize_headless():
+        raise RuntimeError("Не удалось инициализировать внеэкранный рендер")
+    
+    start = time.perf_counter()
+    for i, component in enumerate(build_section_components(section_data, fluid_type)):
+        viewer.add_component(component, fluid_type, section_data if i == 0 else None)
+    load_ms = round(1000 * (time.perf_counter() - start), 3)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    name = name or section_data.get("object_type", "pipe")
+    
+    images = []
+    for index, view in enumerate(views or DEFAULT_RENDER_VIEWS):
+        path = os.path.join(output_dir, f"{name}_{index}.png")
+        if len(view) > 2:
+            timings = viewer.render_image(path, view[:2], view[2], with_ui)
+        else:
+            viewer.camera_rot = list(view[:2])
+            viewer.frame_camera()
+            timings = viewer.render_image(path, with_ui=with_ui)
+        images.append({"path": path, "view": tuple(view), "timings": timings.summary()})
+    
+    logger.info("Внеэкранный рендер %s: загрузка %.1f мс, кадры %s",
+                name, load_ms, [image["timings"]["total"] for image in images])
+    return {"load_ms": load_ms, "images": images}
+
 # ============================================================================
 # ТЕСТОВАЯ ФУНКЦИЯ
 # ============================================================================
@@ -1309,14 +1872,25 @@ def test_3d_viewer():
         "object_type": "pipe",
         "is_complex": False,
         "thickness": 12.0,
-        "remaining_thickness": 10.5,
-        "corrosion_level": "хорошее",
         "material": "Сталь 20"
     }
+    get_section_results(test_pipe).set("", 10.5, "хорошее")
     
     show_3d_viewer(test_pipe, "gas")
 
 if __name__ == "__main__":
+    import sys
+    
+    # Внеэкранный рендер: python -m ui.viewer3d_dialog --render <тип объекта> <среда> [папка]
+    if len(sys.argv) >= 4 and sys.argv[1] == "--render":
+        report = render_section_images({"object_type": sys.argv[2],
+                                        "is_complex": not sys.argv[2].startswith("pipe")},
+                                       sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else ".")
+        print(f"Загрузка: {report['load_ms']} мс")
+        for image in report["images"]:
+            print(image["path"], image["timings"])
+        sys.exit(0)
+    
     # Проверяем наличие папок с моделями
     print("Проверка наличия 3D моделей...")
     
@@ -0,0 +1,119 @@
+"""
+Манифест 3D-моделей
+
+Папки с моделями просматриваются один раз: манифест хранит путь к файлу
+для каждой пары (среда, имя модели), и поиск модели сводится к чтению
+словаря вместо проверки нескольких путей через os.path.exists.
+
+Порядок папок совпадает с прежним перебором путей (от рабочей папки),
+последней добавляется папка assets рядом с программой - модели находятся
+и при запуске из другой рабочей папки.
+
+Для хранилища мешей (utils.asset_store) манифест также даёт
+идентификатор содержимого модели: одинаковые файлы разных сред
+получают один идентификатор.
+"""
+import os
+import sys
+
+from utils.log import get_logger
+from utils.mesh_cache import get_content_id
+
+logger = get_logger(__name__)
+
+MODEL_EXTENSION = ".obj"
+
+# Папки с подпапками сред (oil/, gas/) в порядке приоритета
+MODEL_ROOTS = [
+    "assets/3D_models",
+    "../assets/3D_models",
+    "../../assets/3D_models",
+    "3D_models",
+    ".",
+]
+
+
+def get_bundled_models_root():
+    """Папка assets/3D_models рядом с программой (или в сборке PyInstaller)"""
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, "assets", "3D_models")
+
+
+def _scan_models(directory):
+    """Имена моделей и пути к файлам .obj в папке (без подпапок)"""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    return [(entry.name[:-len(MODEL_EXTENSION)], os.path.join(directory, entry.name))
+            for entry in entries
+            if entry.name.endswith(MODEL_EXTENSION) and entry.is_file()]
+
+
+class AssetManifest:
+    """Пути к моделям по (среда, имя модели)"""
+
+    def __init__(self, roots=None):
+        self.roots = list(roots) if roots is not None else MODEL_ROOTS + [get_bundled_models_root()]
+        self._paths = None
+
+    def _build(self):
+        paths = {}
+        for root in self.roots:
+            try:
+                subdirs = [entry for entry in os.scandir(root) if entry.is_dir()]
+            except OSError:
+                continue
+            for subdir in subdirs:
+                for name, path in _scan_models(subdir.path):
+                    paths.setdefault((subdir.name, name), path)
+
+        # Модели без папки среды - в рабочей папке
+        for name, path in _scan_models("."):
+            paths.setdefault((None, name), path)
+
+        logger.debug("Манифест моделей: %d файлов", len(paths))
+        return paths
+
+    @property
+    def paths(self):
+        if self._paths is None:
+            self._paths = self._build()
+        return self._paths
+
+    def get_model_path(self, model_name, fluid_type):
+        """Путь к файлу модели или None"""
+        paths = self.paths
+        path = paths.get((fluid_type, model_name))
+        if path is None:
+            path = paths.get((None, model_name))
+        return path
+
+    def get_content_id(self, model_name, fluid_type):
+        """Идентификатор содержимого файла модели или None, если файла нет"""
+        path = self.get_model_path(model_name, fluid_type)
+        if path is None:
+            return None
+        try:
+            return get_content_id(path)
+        except OSError as e:
+            logger.warning("Не удалось прочитать %s: %s", path, e)
+            return None
+
+    def reload(self):
+        """Просмотреть папки заново при следующем обращении"""
+        self._paths = None
+
+
+_manifest = None
+
+
+def get_asset_manifest():
+    """Общий манифест моделей процесса"""
+    global _manifest
+    if _manifest is None:
+        _manifest = AssetManifest()
+    return _manifest
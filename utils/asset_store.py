@@ -0,0 +1,119 @@
+"""
+Хранилище мешей по содержимому
+
+Меш хранится в памяти один раз на идентификатор содержимого файла
+(SHA-1, utils.mesh_cache.get_content_id), а не на путь: одинаковые файлы
+разных сред (например, oil/pipe_paint.obj и gas/pipe_paint.obj) и все
+компоненты с этой моделью используют одни и те же массивы вершин,
+граней и нормалей. При переключении между проектами нефти и газа
+общие модели не загружаются повторно.
+
+Хранилище общее для процесса и используется из потока окна; загрузка
+(load_mesh_asset) может выполняться в рабочих потоках и процессах.
+"""
+from utils.log import get_logger
+from utils.mesh_cache import get_content_id, load_mesh_data
+
+logger = get_logger(__name__)
+
+
+class MeshAsset:
+    """
+    Загруженный меш: уровни детализации с нормалями и метаданные
+
+    levels - список (разрешение сетки или None, vertices, faces, face_normals),
+    уровень 0 - исходный меш; metadata - MeshMetadata исходного меша.
+    Массивы общие для всех пользователей и не должны изменяться.
+    """
+
+    __slots__ = ("content_id", "levels", "metadata")
+
+    def __init__(self, content_id, levels, metadata):
+        self.content_id = content_id
+        self.levels = levels
+        self.metadata = metadata
+
+    @property
+    def vertices(self):
+        return self.levels[0][1]
+
+    @property
+    def faces(self):
+        return self.levels[0][2]
+
+    @property
+    def bounding_radius(self):
+        """Радиус ограничивающей сферы (с центром metadata.sphere_center)"""
+        return self.metadata.sphere_radius
+
+    @property
+    def nbytes(self):
+        return sum(vertices.nbytes + faces.nbytes + normals.nbytes
+                   for _, vertices, faces, normals in self.levels)
+
+
+def load_mesh_asset(filepath, content_id=None):
+    """
+    Загружает меш с уровнями детализации, нормалями и метаданными
+
+    Returns:
+    --------
+    MeshAsset или None, если в файле нет геометрии
+    """
+    if content_id is None:
+        content_id = get_content_id(filepath)
+
+    levels, metadata = load_mesh_data(filepath)
+    if not metadata.vertex_count or not metadata.triangle_count:
+        return None
+    return MeshAsset(content_id, levels, metadata)
+
+
+class MeshStore:
+    """Меши по идентификатору содержимого; None - файл без геометрии или с ошибкой"""
+
+    def __init__(self):
+        self._assets = {}
+
+    def __contains__(self, content_id):
+        return content_id in self._assets
+
+    def get(self, content_id):
+        return self._assets.get(content_id)
+
+    def put(self, content_id, asset):
+        self._assets[content_id] = asset
+
+    def load(self, filepath):
+        """Меш файла: из хранилища или загрузкой (с запоминанием)"""
+        content_id = get_content_id(filepath)
+        if content_id not in self._assets:
+            try:
+                asset = load_mesh_asset(filepath, content_id)
+            except Exception as e:
+                logger.warning("Ошибка загрузки %s: %s", filepath, e)
+                asset = None
+            self._assets[content_id] = asset
+        return self._assets[content_id]
+
+    def clear(self):
+        self._assets.clear()
+
+    @property
+    def nbytes(self):
+        """Объём массивов всех мешей (включая отображённые в память)"""
+        return sum(asset.nbytes for asset in self._assets.values() if asset is not None)
+
+    def __len__(self):
+        return len(self._assets)
+
+
+_store = None
+
+
+def get_mesh_store():
+    """Общее хранилище мешей процесса"""
+    global _store
+    if _store is None:
+        _store = MeshStore()
+    return _store
@@ -6,6 +6,14 @@ import os
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl import Workbook
+from models.corrosion import get_corrosion_level
+from models.fleet import get_fleet_summary
+from models.results import (
+    get_component_level,
+    get_component_remaining,
+    get_section_level,
+    get_section_remaining
+)
 
 class ReportExporter:
     def __init__(self, project_name, fluid_type):
@@ -87,13 +95,10 @@ class ReportExporter:
             }
             
             # Остаточная толщина и состояние
-            remaining = comp.get('remaining', comp_info['Толщина стенки, мм'])
+            remaining = get_component_remaining(section, comp, i, default=0)
             comp_info['Остаточная толщина, мм'] = round(remaining, 2)
             
-            # Определяем уровень коррозии
-            from models.corrosion import get_corrosion_level
-            level, _ = get_corrosion_level(remaining)
-            comp_info['Уровень коррозии'] = level
+            comp_info['Уровень коррозии'] = get_component_level(section, comp, i)
             
             components_info.append(comp_info)
         
@@ -118,12 +123,14 @@ class ReportExporter:
                 # ===============================================
                 # ЛИСТ 1: Сводная информация по участкам
                 # ===============================================
+                fleet = get_fleet_summary(sections_data)
+                total_components = fleet["row_count"]
+                total_length = fleet["total_length"]
                 sections_list = []
-                total_components = 0
-                total_length = 0
                 
-                for section in sections_data:
+                for section_index, section in enumerate(sections_data):
                     components = section.get("components", [])
+                    remaining = fleet["worst_remaining"][section_index]
                     
                     # Для простых участков (для совместимости)
                     if not components:
@@ -131,72 +138,39 @@ class ReportExporter:
                             'Название': section.get('name', 'N/A'),
                             'Тип': 'простой участок',
                             'Кол-во компонентов': 1,
-                            'Длина, м': section.get('length', 0),
+                            'Длина, м': fleet["section_lengths"][section_index],
                             'Диаметр, мм': section.get('diameter', 0),
                             'Толщина, мм': section.get('thickness', 0),
                             'Материал': section.get('material', 'N/A'),
                             'Прокладка': section.get('location', 'надземная'),
                             'Защита': section.get('protection', 'без защиты'),
                             'Среда': section.get('environment', 'Поволжье'),
-                            'Остаточная толщина, мм': round(section.get('remaining_thickness', section.get('thickness', 0)), 2)
+                            'Остаточная толщина, мм': round(remaining, 2)
                         }
                         
-                        # Определяем уровень коррозии
-                        from models.corrosion import get_corrosion_level
-                        remaining = section_info['Остаточная толщина, мм']
-                        level, _ = get_corrosion_level(remaining)
-                        section_info['Уровень коррозии'] = level
-                        
-                        sections_list.append(section_info)
-                        total_components += 1
-                        total_length += section_info['Длина, м']
-                        
                     else:
-                        # Для сложных участков
-                        total_components += len(components)
-                        
-                        # Считаем суммарную длину трубных компонентов
-                        section_length = 0
-                        for comp in components:
-                            if comp.get('component_type') == 'pipe':
-                                section_length += comp.get('length', 0)
-                        
-                        total_length += section_length
-                        
-                        # Определяем худшее состояние среди компонентов
-                        worst_remaining = 100  # большое число
-                        worst_component = None
-                        
-                        for comp in components:
-                            remaining = comp.get('remaining', 
-                                                comp.get('thickness', 
-                                                        comp.get('wall_thickness', 10)))
-                            if remaining < worst_remaining:
-                                worst_remaining = remaining
-                                worst_component = comp
-                        
-                        # Сводная информация по участку
+                        # Для сложных участков: длина трубных компонентов
+                        # и худшее состояние среди компонентов
                         section_info = {
                             'Название': section.get('name', 'N/A'),
                             'Тип': section.get('object_type', 'сложный объект'),
                             'Кол-во компонентов': len(components),
-                            'Длина, м': section_length,
-                            'Диаметр, мм': 'разные' if components else 0,
-                            'Толщина, мм': 'разные' if components else 0,
+                            'Длина, м': fleet["section_lengths"][section_index],
+                            'Диаметр, мм': 'разные',
+                            'Толщина, мм': 'разные',
                             'Материал': 'разные' if len(set(c.get('material', '') for c in components)) > 1 else 
-                                      (components[0].get('material', 'N/A') if components else 'N/A'),
+                                      components[0].get('material', 'N/A'),
                             'Прокладка': section.get('location', 'надземная'),
                             'Защита': section.get('protection', 'без защиты'),
                             'Среда': section.get('environment', 'Поволжье'),
-                            'Остаточная толщина, мм': round(worst_remaining, 2) if worst_component else 0
+                            'Остаточная толщина, мм': round(remaining, 2)
                         }
-                        
-                        # Определяем уровень коррозии по худшему компоненту
-                        from models.corrosion import get_corrosion_level
-                        level, _ = get_corrosion_level(worst_remaining)
-                        section_info['Уровень коррозии'] = level
-                        
-                        sections_list.append(section_info)
+                    
+                    # Уровень коррозии по остаточной толщине
+                    level, _ = get_corrosion_level(section_info['Остаточная толщина, мм'])
+                    section_info['Уровень коррозии'] = level
+                    
+                    sections_list.append(section_info)
                 
                 sections_df = pd.DataFrame(sections_list)
                 sections_df.to_excel(writer, sheet_name='Участки_сводка', index=False)
@@ -231,12 +205,10 @@ class ReportExporter:
                         }
                         
                         # Остаточная толщина и состояние
-                        remaining = section.get('remaining_thickness', component_info['Толщина стенки, мм'])
+                        remaining = get_section_remaining(section, default=0)
                         component_info['Остаточная толщина, мм'] = round(remaining, 2)
                         
-                        from models.corrosion import get_corrosion_level
-                        level, _ = get_corrosion_level(remaining)
-                        component_info['Уровень коррозии'] = level
+                        component_info['Уровень коррозии'] = get_section_level(section)
                         
                         all_components.append(component_info)
                 
@@ -283,34 +255,8 @@ class ReportExporter:
                 # ===============================================
                 # ЛИСТ 4: Технические параметры
                 # ===============================================
-                # Рассчитываем средние значения
-                avg_diameter = 0
-                avg_thickness = 0
-                diameter_count = 0
-                thickness_count = 0
-                
-                for section in sections_data:
-                    if section.get("components"):
-                        for comp in section["components"]:
-                            if comp.get('diameter', 0) > 0:
-                                avg_diameter += comp['diameter']
-                                diameter_count += 1
-                            if comp.get('thickness', 0) > 0:
-                                avg_thickness += comp['thickness']
-                                thickness_count += 1
-                            elif comp.get('wall_thickness', 0) > 0:
-                                avg_thickness += comp['wall_thickness']
-                                thickness_count += 1
-                    else:
-                        if section.get('diameter', 0) > 0:
-                            avg_diameter += section['diameter']
-                            diameter_count += 1
-                        if section.get('thickness', 0) > 0:
-                            avg_thickness += section['thickness']
-                            thickness_count += 1
-                
-                avg_diameter = avg_diameter / diameter_count if diameter_count > 0 else 0
-                avg_thickness = avg_thickness / thickness_count if thickness_count > 0 else 0
+                avg_diameter = fleet["avg_diameter"]
+                avg_thickness = fleet["avg_thickness"]
                 
                 params_data = {
                     'Параметр': [
@@ -352,10 +298,8 @@ class ReportExporter:
                     
                     if components:
                         # Для сложных участков
-                        for comp in components:
-                            remaining = comp.get('remaining', 
-                                                comp.get('thickness', 
-                                                        comp.get('wall_thickness', 10)))
+                        for comp_index, comp in enumerate(components):
+                            remaining = get_component_remaining(section, comp, comp_index)
                             
                             if remaining < 4:
                                 rec = f"{section['name']} - {comp.get('name', 'Компонент')}: АВАРИЙНОЕ состояние. Немедленный ремонт!"
@@ -369,7 +313,7 @@ class ReportExporter:
                             recommendations.append(rec)
                     else:
                         # Для простых участков
-                        remaining = section.get('remaining_thickness', section.get('thickness', 10))
+                        remaining = get_section_remaining(section)
                         
                         if remaining < 4:
                             rec = f"{section['name']}: АВАРИЙНОЕ состояние. Немедленный ремонт!"
@@ -430,14 +374,7 @@ def create_export_dialog(parent, fluid_type, sections_data):
     info_frame = ttk.LabelFrame(main_frame, text="ИНФОРМАЦИЯ О ПРОЕКТЕ", padding=10)
     info_frame.pack(fill="x", pady=(0, 15))
     
-    # Подсчитываем компоненты
-    total_components = 0
-    for section in sections_data:
-        components = section.get("components", [])
-        if components:
-            total_components += len(components)
-        else:
-            total_components += 1
+    total_components = get_fleet_summary(sections_data)["row_count"]
     
     info_text = (
         f"Тип среды: {'НЕФТЬ' if fluid_type == 'oil' else 'ГАЗ'}\n"
@@ -4,6 +4,10 @@ import numpy as np
 from PIL import Image, ImageTk
 import tkinter as tk
 
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
 def get_resource_path(relative_path):
     """Универсальный путь к ресурсам"""
     if getattr(sys, 'frozen', False):
@@ -45,7 +49,7 @@ def load_icon_image(fluid_type, icon_name):
                 img = img.convert('RGBA')
             return img
         except Exception as e:
-            print(f"❌ Ошибка загрузки {filename}: {e}")
+            logger.warning("Ошибка загрузки %s: %s", filename, e)
     
     return None
 
@@ -87,7 +91,7 @@ def apply_color_to_icon_pil(icon_img, color):
         
         return result
     except Exception as e:
-        print(f"❌ Ошибка окраски иконки: {e}")
+        logger.warning("Ошибка окраски иконки: %s", e)
         return icon_img
 
 def create_tk_icon(icon_img, size=(80, 80)):
@@ -100,5 +104,5 @@ def create_tk_icon(icon_img, size=(80, 80)):
         icon_img = icon_img.resize(size, Image.Resampling.LANCZOS)
         return ImageTk.PhotoImage(icon_img)
     except Exception as e:
-        print(f"❌ Ошибка создания Tk иконки: {e}")
+        logger.warning("Ошибка создания Tk иконки: %s", e)
         return None
@@ -0,0 +1,74 @@
+"""
+Журналирование приложения
+
+Каждый модуль получает свой логгер: logger = get_logger(__name__).
+Уровень DIAGNOSTICS (ниже DEBUG) предназначен для структурированных
+записей расчёта (выбранная модель, разбивка коэффициентов). Данные
+передаются словарём в extra={"diagnostics": {...}}, а не готовой строкой,
+и собираются только под проверкой logger.isEnabledFor(DIAGNOSTICS) -
+при выключенном уровне форматирование не выполняется вовсе.
+
+Уровень задаётся в setup_logging() или переменной окружения
+PIPELINE_LOG_LEVEL (DIAGNOSTICS, DEBUG, INFO, WARNING, ERROR).
+"""
+import json
+import logging
+import os
+
+DIAGNOSTICS = 5
+logging.addLevelName(DIAGNOSTICS, "DIAGNOSTICS")
+
+# Корневой логгер приложения; логгеры модулей - его потомки
+ROOT_LOGGER_NAME = "pipeline"
+
+DEFAULT_LEVEL = "WARNING"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+def get_logger(name):
+    """Логгер модуля: pipeline.<имя модуля>"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+class StructuredFormatter(logging.Formatter):
+    """Форматтер, дописывающий к сообщению структурированные данные записи"""
+
+    def format(self, record):
+        message = super().format(record)
+        data = getattr(record, "diagnostics", None)
+        if data:
+            message += " " + json.dumps(data, ensure_ascii=False, default=str)
+        return message
+
+
+def _parse_level(level):
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.WARNING
+
+
+def setup_logging(level=None, stream=None):
+    """
+    Настраивает журналирование приложения (вызывается один раз из main)
+
+    level : уровень (int или имя); по умолчанию - PIPELINE_LOG_LEVEL или WARNING
+    """
+    if level is None:
+        level = os.environ.get("PIPELINE_LOG_LEVEL", DEFAULT_LEVEL)
+
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.setLevel(_parse_level(level))
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(StructuredFormatter(LOG_FORMAT, "%H:%M:%S"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    return logger
+
+
+def set_level(level):
+    """Меняет уровень журналирования во время работы"""
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(_parse_level(level))
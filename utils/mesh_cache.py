@@ -0,0 +1,753 @@
+"""
+Бинарный кэш мешей OBJ для 3D-просмотра
+
+Текстовый OBJ разбирается один раз: вершины (float32, N x 3) и треугольники
+(int32, M x 3) сохраняются в .npy рядом с моделью (папка .mesh_cache)
+и при следующих запусках открываются через np.load(mmap_mode="r") -
+без разбора текста и без копирования в память процесса.
+
+Имя записи кэша = хэш пути + хэш (mtime, размер, версия формата):
+изменённый OBJ даёт новое имя, а устаревшие записи того же файла
+удаляются при пересборке.
+
+Там же хранятся упрощённые уровни детализации (LOD), построенные
+кластеризацией вершин по сетке при первой загрузке, и идентификатор
+содержимого файла (SHA-1) - по нему одинаковые модели разных сред
+совпадают в памяти (utils.asset_store), а файл не перечитывается
+для хэширования при каждом запуске.
+
+Нормали граней всех уровней и метаданные меша (центр, габариты,
+ограничивающая сфера, площадь поверхности, число треугольников)
+тоже считаются один раз и хранятся в записи кэша.
+"""
+import hashlib
+import os
+import re
+import warnings
+
+import numpy as np
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Версия формата записей кэша (увеличить при изменении разбора OBJ)
+MESH_CACHE_VERSION = 1
+
+# Папка кэша рядом с моделями; PIPELINE_MESH_CACHE - общая папка вместо неё
+MESH_CACHE_DIRNAME = ".mesh_cache"
+MESH_CACHE_ENV = "PIPELINE_MESH_CACHE"
+
+# Разрешение сетки кластеризации (ячеек на диагональ габаритов) для LOD 1, 2, ...
+LOD_GRID_RESOLUTIONS = (96, 40)
+
+# Уровень сохраняется, только если в нём не больше этой доли треугольников предыдущего
+LOD_MIN_REDUCTION = 0.7
+
+# Размер блока чтения при хэшировании файла
+HASH_CHUNK_SIZE = 1 << 20
+
+# Размер блока чтения при разборе OBJ (граница блока - по концу строки)
+PARSE_CHUNK_SIZE = 4 << 20
+
+
+# ============================================================================
+# РАЗБОР OBJ
+# ============================================================================
+
+# Пробельные символы (начала слов ищутся по переходу пробел -> не пробел)
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\r\n\v\f")] = True
+
+# Текстовые атрибуты вершины грани (/vt/vn) - отбрасываются
+_FACE_ATTRIBUTES = re.compile(rb"/\S*")
+
+
+def _join_records(data, line_starts, line_ends, is_record, prefix):
+    """
+    Текст строк is_record (без буквы префикса) одним блоком
+
+    Строки одного типа в OBJ идут сплошными группами, поэтому блок
+    собирается из нескольких срезов, а не построчно. Буква префикса
+    удаляется (в группе строк одного типа она встречается только
+    в начале строк), пробел после неё остаётся.
+
+    Returns:
+    --------
+    (текст, смещения начал строк в тексте)
+    """
+    change = np.flatnonzero(np.diff(np.concatenate(([0], is_record.view(np.int8), [0]))))
+    parts = []
+    for first, last in zip(change[::2], change[1::2] - 1):
+        parts.append(data[line_starts[first]:line_ends[last] + 1].replace(prefix, b''))
+    text = b''.join(parts)
+    lengths = (line_ends - line_starts)[is_record]
+    return text, np.cumsum(lengths) - lengths
+
+
+def _count_words(text, starts):
+    """Число слов в каждой строке текста (строки начинаются со смещений starts)"""
+    chars = np.frombuffer(text, dtype=np.uint8)
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64)
+
+    # Обычная запись: слова разделены одним пробелом, строка начинается
+    # с пробела (после префикса) и не кончается пробелом - слов столько же,
+    # сколько пробелов в строке
+    spaces = np.flatnonzero(chars == 32)
+    line_ends = np.append(starts[1:], len(chars)) - 1  # позиции \n
+    last = chars[line_ends - 1]
+    last = np.where(last == 13, chars[np.maximum(line_ends - 2, 0)], last)
+    if not (b'\t' in text or b'\v' in text or b'\f' in text
+            or (np.diff(spaces) == 1).any() or (last == 32).any()):
+        # Одинаковое число слов k во всех строках: каждый k-й пробел - начало строки
+        words = len(spaces) // len(starts)
+        if words * len(starts) == len(spaces) and np.array_equal(spaces[::words], starts):
+            return np.full(len(starts), words, dtype=np.int64)
+        return np.diff(np.searchsorted(spaces, np.append(starts, len(chars))))
+
+    space = _WHITESPACE[chars]
+    word_starts = ~space
+    word_starts[1:] &= space[:-1]
+    return np.add.reduceat(word_starts, starts, dtype=np.int64)
+
+
+def _parse_numbers(text, starts, dtype):
+    """
+    Числа текста через пробел и их количество в каждой строке
+
+    Returns:
+    --------
+    (values, counts) или None, если в тексте есть не числа
+    """
+    counts = _count_words(text, starts)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            values = np.fromstring(text, dtype=dtype, sep=' ')
+    except ValueError:
+        return None
+    if len(values) != counts.sum():
+        return None
+    return values, counts
+
+
+def _parse_obj_block(data, vertex_offset):
+    """
+    Разбор блока целых строк OBJ операциями NumPy
+
+    vertex_offset - число вершин в предыдущих блоках (индексы граней глобальные).
+
+    Returns:
+    --------
+    (vertices (N, 3) float64, faces (M, 3) int64) или None, если блок
+    содержит записи, которые разбирает только построчный путь
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    line_ends = np.flatnonzero(chars == 10)
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+
+    first = chars[line_starts]
+    second = chars[np.minimum(line_starts + 1, len(chars) - 1)]
+    if (first == 32).any() or (first == 9).any():
+        return None  # отступы в начале строк
+    is_vertex = (first == ord('v')) & (second == 32)
+    is_face = (first == ord('f')) & (second == 32)
+
+    # Вершины: первые три числа строк, где их не меньше трёх
+    text, starts = _join_records(data, line_starts, line_ends, is_vertex, b'v')
+    parsed = _parse_numbers(text, starts, np.float64)
+    if parsed is None:
+        return None
+    values, counts = parsed
+    valid_vertex = counts >= 3
+    if valid_vertex.all() and (counts == 3).all():
+        vertices = values.reshape(-1, 3)
+    else:
+        token_line = np.repeat(np.arange(len(counts)), counts)
+        token_index = np.arange(len(values)) - np.repeat(np.cumsum(counts) - counts, counts)
+        vertices = values[valid_vertex[token_line] & (token_index < 3)].reshape(-1, 3)
+
+    # Число объявленных вершин к каждой строке (для проверки индексов граней)
+    declared = np.zeros(len(line_starts), dtype=np.int64)
+    declared[is_vertex] = valid_vertex
+    declared = np.cumsum(declared) + vertex_offset
+
+    # Грани: индекс вершины - число до первой "/" в каждом слове
+    text, starts = _join_records(data, line_starts, line_ends, is_face, b'f')
+    if b'/' in text:
+        text = _FACE_ATTRIBUTES.sub(b'', text)
+        ends = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == 10)
+        starts = np.concatenate(([0], ends[:-1] + 1))[:len(ends)]
+    if text.translate(None, b"0123456789- \t\r\n\v\f"):
+        return None
+    parsed = _parse_numbers(text, starts, np.int64)
+    if parsed is None:
+        return None
+    indices, counts = parsed
+    if not len(indices):
+        return vertices, np.empty((0, 3), dtype=np.int64)
+
+    # Отрицательные и ещё не объявленные вершины пропускаются (обычно
+    # все вершины объявлены до первой грани - проверка по строкам не нужна)
+    face_declared = declared[is_face]
+    if indices.min() < 1 or indices.max() > face_declared[0]:
+        token_line = np.repeat(np.arange(len(counts)), counts)
+        keep = (indices >= 1) & (indices <= face_declared[token_line])
+        indices = indices[keep]
+        counts = np.bincount(token_line[keep], minlength=len(counts))
+    indices = indices - 1
+
+    # Веерная триангуляция: (v0, vk, vk+1) для k = 1..n-2
+    if (counts == 3).all():
+        return vertices, indices.reshape(-1, 3)
+    first_index = np.cumsum(counts) - counts
+    triangles = np.maximum(counts - 2, 0)
+    face_line = np.repeat(np.arange(len(counts)), triangles)
+    k = np.arange(triangles.sum()) - np.repeat(np.cumsum(triangles) - triangles, triangles)
+    base = first_index[face_line]
+    faces = np.stack([indices[base], indices[base + k + 1], indices[base + k + 2]], axis=1)
+
+    return vertices, faces
+
+
+def parse_obj(filepath):
+    """
+    Разбирает OBJ: вершины и треугольники (веерная триангуляция граней)
+
+    Файл читается блоками целых строк; записи v и f каждого блока
+    разбираются разом через NumPy. Индексы, ссылающиеся на ещё
+    не объявленные вершины, пропускаются. Если в файле встречаются
+    записи, которые векторный разбор не поддерживает (отступы, текст
+    вместо чисел), используется построчный разбор parse_obj_lines.
+
+    Returns:
+    --------
+    vertices : np.ndarray float32 (N, 3)
+    faces : np.ndarray int32 (M, 3)
+    """
+    vertex_blocks = []
+    face_blocks = []
+    vertex_count = 0
+    tail = b''
+
+    with open(filepath, 'rb') as f:
+        while True:
+            chunk = f.read(PARSE_CHUNK_SIZE)
+            data = tail + chunk
+            if chunk:
+                end = data.rfind(b'\n') + 1
+                data, tail = data[:end], data[end:]
+            elif data and not data.endswith(b'\n'):
+                data += b'\n'
+            if data:
+                block = _parse_obj_block(data, vertex_count)
+                if block is None:
+                    logger.debug("Построчный разбор %s", filepath)
+                    return parse_obj_lines(filepath)
+                vertex_blocks.append(block[0])
+                face_blocks.append(block[1])
+                vertex_count += len(block[0])
+            if not chunk:
+                break
+
+    vertices = np.concatenate(vertex_blocks) if vertex_blocks else np.empty((0, 3))
+    faces = np.concatenate(face_blocks) if face_blocks else np.empty((0, 3))
+    return vertices.astype(np.float32), faces.astype(np.int32)
+
+
+def parse_obj_lines(filepath):
+    """
+    Построчный разбор OBJ (запасной путь для parse_obj)
+
+    Индексы, ссылающиеся на ещё не объявленные вершины, пропускаются.
+
+    Returns:
+    --------
+    vertices : np.ndarray float32 (N, 3)
+    faces : np.ndarray int32 (M, 3)
+    """
+    vertices = []
+    faces = []
+
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('v '):
+                parts = line.split()
+                if len(parts) >= 4:
+                    try:
+                        vertices.append((float(parts[1]), float(parts[2]), float(parts[3])))
+                    except ValueError:
+                        continue
+            elif line.startswith('f '):
+                parts = line.split()
+                if len(parts) >= 4:
+                    face_vertices = []
+                    for part in parts[1:]:
+                        index = part.split('/')[0]
+                        if index.isdigit():
+                            vertex_idx = int(index) - 1
+                            if 0 <= vertex_idx < len(vertices):
+                                face_vertices.append(vertex_idx)
+
+                    # Триангуляция
+                    for i in range(1, len(face_vertices) - 1):
+                        faces.append((face_vertices[0], face_vertices[i], face_vertices[i + 1]))
+
+    return (np.array(vertices, dtype=np.float32).reshape(-1, 3),
+            np.array(faces, dtype=np.int32).reshape(-1, 3))
+
+
+def get_cache_dir(filepath):
+    """Папка кэша для модели"""
+    shared = os.environ.get(MESH_CACHE_ENV)
+    if shared:
+        return shared
+    return os.path.join(os.path.dirname(os.path.abspath(filepath)), MESH_CACHE_DIRNAME)
+
+
+def get_cache_key(filepath):
+    """
+    Ключ записи кэша: (префикс по пути, полное имя записи)
+
+    Полное имя зависит от mtime и размера исходного файла.
+    """
+    path = os.path.abspath(filepath)
+    stat = os.stat(path)
+    path_hash = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+    stamp = f"{stat.st_mtime_ns}:{stat.st_size}:{MESH_CACHE_VERSION}"
+    stamp_hash = hashlib.sha1(stamp.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    prefix = f"{name}.{path_hash}"
+    return prefix, f"{prefix}.{stamp_hash}"
+
+
+def _entry_paths(cache_dir, key):
+    return (os.path.join(cache_dir, f"{key}.vertices.npy"),
+            os.path.join(cache_dir, f"{key}.faces.npy"))
+
+
+def _save_array(path, array):
+    """Атомарная запись .npy (через временный файл и os.replace)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(cache_dir, prefix, key):
+    """Удаляет записи того же файла с другими mtime/размером"""
+    for filename in os.listdir(cache_dir):
+        if filename.startswith(prefix + ".") and not filename.startswith(key + "."):
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+            except OSError:
+                pass
+
+
+def load_mesh(filepath, use_cache=True):
+    """
+    Загружает меш OBJ через бинарный кэш
+
+    Актуальная запись открывается отображением в память (только чтение);
+    иначе OBJ разбирается и запись пересобирается. Если папку кэша
+    нельзя создать или записать, возвращается результат разбора.
+
+    Returns:
+    --------
+    vertices (N, 3) float32, faces (M, 3) int32
+    """
+    if not use_cache:
+        return parse_obj(filepath)
+
+    cache_dir = get_cache_dir(filepath)
+    prefix, key = get_cache_key(filepath)
+    vertices_path, faces_path = _entry_paths(cache_dir, key)
+
+    if os.path.exists(vertices_path) and os.path.exists(faces_path):
+        try:
+            vertices = np.load(vertices_path, mmap_mode='r')
+            faces = np.load(faces_path, mmap_mode='r')
+            logger.debug("Меш из кэша: %s", filepath)
+            return vertices, faces
+        except (OSError, ValueError) as e:
+            logger.warning("Повреждённая запись кэша %s: %s", key, e)
+
+    vertices, faces = parse_obj(filepath)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _save_array(vertices_path, vertices)
+        _save_array(faces_path, faces)
+        _remove_stale(cache_dir, prefix, key)
+        logger.debug("Меш записан в кэш: %s (%d вершин, %d треугольников)",
+                     filepath, len(vertices), len(faces))
+    except OSError as e:
+        logger.warning("Не удалось записать кэш меша %s: %s", filepath, e)
+
+    return vertices, faces
+
+
+# ============================================================================
+# УРОВНИ ДЕТАЛИЗАЦИИ (LOD)
+# ============================================================================
+
+def simplify_mesh(vertices, faces, resolution):
+    """
+    Упрощение кластеризацией вершин
+
+    Вершины в одной ячейке сетки (resolution ячеек на диагональ габаритов)
+    сливаются в среднюю точку; вырожденные и повторяющиеся треугольники
+    удаляются, порядок обхода оставшихся сохраняется.
+
+    Returns:
+    --------
+    vertices (K, 3) float32, faces (L, 3) int32
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+    if not len(vertices) or not len(faces):
+        return vertices.astype(np.float32), faces.astype(np.int32)
+
+    lower = vertices.min(axis=0)
+    diagonal = float(np.linalg.norm(vertices.max(axis=0) - lower))
+    cell = diagonal / resolution if diagonal > 0 else 1.0
+
+    cells = np.floor((vertices - lower) / cell).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.reshape(-1)
+
+    count = np.bincount(cluster)
+    merged = np.stack([np.bincount(cluster, weights=vertices[:, axis]) for axis in range(3)],
+                      axis=1) / count[:, None]
+
+    new_faces = cluster[faces]
+    keep = ((new_faces[:, 0] != new_faces[:, 1]) &
+            (new_faces[:, 1] != new_faces[:, 2]) &
+            (new_faces[:, 0] != new_faces[:, 2]))
+    new_faces = new_faces[keep]
+    _, first = np.unique(np.sort(new_faces, axis=1), axis=0, return_index=True)
+    new_faces = new_faces[np.sort(first)]
+
+    # Оставляем только используемые вершины
+    used, remap = np.unique(new_faces, return_inverse=True)
+    return (merged[used].astype(np.float32),
+            remap.reshape(-1, 3).astype(np.int32))
+
+
+def build_lods(vertices, faces, resolutions=LOD_GRID_RESOLUTIONS):
+    """
+    Упрощённые уровни (без исходного), каждый заметно меньше предыдущего
+
+    Returns:
+    --------
+    list of (resolution, vertices, faces)
+    """
+    lods = []
+    current = len(faces)
+    for resolution in resolutions:
+        lod_vertices, lod_faces = simplify_mesh(vertices, faces, resolution)
+        if not len(lod_faces) or len(lod_faces) > current * LOD_MIN_REDUCTION:
+            continue
+        lods.append((resolution, lod_vertices, lod_faces))
+        current = len(lod_faces)
+    return lods
+
+
+def load_mesh_lods(filepath, use_cache=True):
+    """
+    Меш и его уровни детализации
+
+    Уровни строятся при первой загрузке и хранятся в кэше рядом
+    с основной записью (разрешения уровней - в файле .lods.npy).
+
+    Returns:
+    --------
+    list of (resolution, vertices, faces): уровень 0 - исходный меш
+    (resolution = None), далее - всё более грубые
+    """
+    vertices, faces = load_mesh(filepath, use_cache)
+    if not use_cache:
+        return [(None, vertices, faces)] + build_lods(vertices, faces)
+
+    cache_dir = get_cache_dir(filepath)
+    _, key = get_cache_key(filepath)
+    manifest_path = os.path.join(cache_dir, f"{key}.lods.npy")
+
+    if os.path.exists(manifest_path):
+        try:
+            levels = [(None, vertices, faces)]
+            for level, resolution in enumerate(np.load(manifest_path).tolist(), 1):
+                lod_vertices_path, lod_faces_path = _entry_paths(cache_dir, f"{key}.lod{level}")
+                levels.append((resolution,
+                               np.load(lod_vertices_path, mmap_mode='r'),
+                               np.load(lod_faces_path, mmap_mode='r')))
+            return levels
+        except (OSError, ValueError) as e:
+            logger.warning("Повреждённые уровни детализации %s: %s", key, e)
+
+    lods = build_lods(vertices, faces)
+    try:
+        for level, (_, lod_vertices, lod_faces) in enumerate(lods, 1):
+            lod_vertices_path, lod_faces_path = _entry_paths(cache_dir, f"{key}.lod{level}")
+            _save_array(lod_vertices_path, lod_vertices)
+            _save_array(lod_faces_path, lod_faces)
+        _save_array(manifest_path, np.array([resolution for resolution, _, _ in lods], dtype=np.int32))
+        logger.debug("Уровни детализации %s: %s", filepath,
+                     [len(lod_faces) for _, _, lod_faces in lods])
+    except OSError as e:
+        logger.warning("Не удалось записать уровни детализации %s: %s", filepath, e)
+
+    return [(None, vertices, faces)] + lods
+
+
+def is_mesh_cached(filepath):
+    """Есть ли в кэше актуальная запись меша вместе с уровнями детализации и метаданными"""
+    try:
+        cache_dir = get_cache_dir(filepath)
+        _, key = get_cache_key(filepath)
+    except OSError:
+        return False
+    return all(os.path.exists(path) for path in
+               _entry_paths(cache_dir, key) + (os.path.join(cache_dir, f"{key}.lods.npy"),
+                                               os.path.join(cache_dir, f"{key}.meta.npy")))
+
+
+# ============================================================================
+# ИДЕНТИФИКАТОР СОДЕРЖИМОГО
+# ============================================================================
+
+# Путь -> (mtime_ns, размер, идентификатор) в пределах процесса
+_content_ids = {}
+
+
+def hash_file(filepath):
+    """SHA-1 содержимого файла (hex)"""
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_content_id(filepath, use_cache=True):
+    """
+    Идентификатор содержимого файла: SHA-1 его байтов
+
+    Значение запоминается по (mtime, размер) в процессе и сохраняется
+    в записи кэша (<ключ>.sha1), поэтому файл хэшируется один раз.
+    """
+    path = os.path.abspath(filepath)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    known = _content_ids.get(path)
+    if known is not None and known[:2] == stamp:
+        return known[2]
+
+    content_id = None
+    if use_cache:
+        cache_dir = get_cache_dir(filepath)
+        _, key = get_cache_key(filepath)
+        id_path = os.path.join(cache_dir, f"{key}.sha1")
+        try:
+            with open(id_path, 'r', encoding='ascii') as f:
+                content_id = f.read().strip() or None
+        except OSError:
+            pass
+
+    if content_id is None:
+        content_id = hash_file(path)
+        if use_cache:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f"{id_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='ascii') as f:
+                    f.write(content_id)
+                os.replace(tmp_path, id_path)
+            except OSError as e:
+                logger.debug("Не удалось записать идентификатор %s: %s", filepath, e)
+
+    _content_ids[path] = stamp + (content_id,)
+    return content_id
+
+
+# ============================================================================
+# НОРМАЛИ
+# ============================================================================
+
+def compute_face_normals(vertices, faces):
+    """
+    Нормали треугольников (M, 3), направленные наружу
+
+    Направление задаётся порядком обхода вершин; если ориентированный
+    объём меша отрицателен (обход по часовой стрелке), нормали
+    разворачиваются.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    a = vertices[faces[:, 0]]
+    b = vertices[faces[:, 1]]
+    c = vertices[faces[:, 2]]
+    normals = np.cross(b - a, c - a)
+
+    signed_volume = np.einsum('ij,ij->', a, np.cross(b, c))
+    if signed_volume < 0:
+        normals = -normals
+    return normals
+
+
+# ============================================================================
+# МЕТАДАННЫЕ МЕША
+# ============================================================================
+
+class MeshMetadata:
+    """
+    Характеристики меша в его системе координат
+
+    centroid - центр поверхности (средняя точка треугольников с весом
+    по площади), aabb_min / aabb_max - габариты, sphere_center /
+    sphere_radius - ограничивающая сфера (содержит все вершины).
+    """
+
+    __slots__ = ("centroid", "aabb_min", "aabb_max", "sphere_center", "sphere_radius",
+                 "surface_area", "triangle_count", "vertex_count")
+
+    # Длина записи в кэше (as_array)
+    ARRAY_SIZE = 16
+
+    def __init__(self, centroid, aabb_min, aabb_max, sphere_center, sphere_radius,
+                 surface_area, triangle_count, vertex_count):
+        self.centroid = centroid
+        self.aabb_min = aabb_min
+        self.aabb_max = aabb_max
+        self.sphere_center = sphere_center
+        self.sphere_radius = sphere_radius
+        self.surface_area = surface_area
+        self.triangle_count = triangle_count
+        self.vertex_count = vertex_count
+
+    def as_array(self):
+        """Запись для кэша: float64 (ARRAY_SIZE,)"""
+        return np.concatenate([self.centroid, self.aabb_min, self.aabb_max, self.sphere_center,
+                               [self.sphere_radius, self.surface_area,
+                                self.triangle_count, self.vertex_count]])
+
+    @classmethod
+    def from_array(cls, array):
+        array = np.asarray(array, dtype=np.float64)
+        if array.shape != (cls.ARRAY_SIZE,):
+            raise ValueError(f"ожидается {cls.ARRAY_SIZE} значений, получено {array.shape}")
+        return cls(array[0:3].copy(), array[3:6].copy(), array[6:9].copy(), array[9:12].copy(),
+                   float(array[12]), float(array[13]), int(array[14]), int(array[15]))
+
+
+def compute_mesh_metadata(vertices, faces, normals=None):
+    """
+    Метаданные меша операциями NumPy
+
+    normals - нормали граней из compute_face_normals (их длина - удвоенная
+    площадь треугольника); если не заданы, считаются здесь.
+
+    Центр ограничивающей сферы - центр габаритов или центр поверхности,
+    смотря у какого меньше радиус. Для меша без вершин всё нулевое.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+    if not len(vertices):
+        zero = np.zeros(3)
+        return MeshMetadata(zero, zero.copy(), zero.copy(), zero.copy(), 0.0, 0.0, 0, 0)
+
+    aabb_min = vertices.min(axis=0)
+    aabb_max = vertices.max(axis=0)
+
+    surface_area = 0.0
+    centroid = vertices.mean(axis=0)
+    if len(faces):
+        if normals is None:
+            normals = compute_face_normals(vertices, faces)
+        areas = 0.5 * np.sqrt(np.einsum('ij,ij->i', normals, normals))
+        surface_area = float(areas.sum())
+        if surface_area > 0:
+            centers = (vertices[faces[:, 0]] + vertices[faces[:, 1]] + vertices[faces[:, 2]]) / 3
+            centroid = areas @ centers / surface_area
+
+    sphere_center, sphere_radius = None, np.inf
+    for center in ((aabb_min + aabb_max) / 2, centroid):
+        offsets = vertices - center
+        radius = float(np.sqrt(np.einsum('ij,ij->i', offsets, offsets).max()))
+        if radius < sphere_radius:
+            sphere_center, sphere_radius = center, radius
+
+    return MeshMetadata(centroid, aabb_min, aabb_max, sphere_center, sphere_radius,
+                        surface_area, len(faces), len(vertices))
+
+
+def load_mesh_data(filepath, use_cache=True):
+    """
+    Уровни детализации с нормалями граней и метаданные исходного меша
+
+    Нормали (<запись>.normals.npy для каждого уровня) и метаданные
+    (<ключ>.meta.npy) считаются при первой загрузке и дальше читаются
+    из кэша вместе с мешем.
+
+    Returns:
+    --------
+    levels : list of (resolution, vertices, faces, face_normals) - как load_mesh_lods
+    metadata : MeshMetadata
+    """
+    levels = load_mesh_lods(filepath, use_cache)
+    if not use_cache:
+        levels = [(resolution, vertices, faces, compute_face_normals(vertices, faces))
+                  for resolution, vertices, faces in levels]
+        return levels, compute_mesh_metadata(levels[0][1], levels[0][2], levels[0][3])
+
+    cache_dir = get_cache_dir(filepath)
+    _, key = get_cache_key(filepath)
+
+    result = []
+    for level, (resolution, vertices, faces) in enumerate(levels):
+        entry = f"{key}.lod{level}" if level else key
+        normals_path = os.path.join(cache_dir, f"{entry}.normals.npy")
+        normals = None
+        if os.path.exists(normals_path):
+            try:
+                normals = np.load(normals_path, mmap_mode='r')
+                if normals.shape != (len(faces), 3):
+                    normals = None
+            except (OSError, ValueError) as e:
+                logger.warning("Повреждённые нормали %s: %s", entry, e)
+        if normals is None:
+            normals = compute_face_normals(vertices, faces)
+            try:
+                _save_array(normals_path, normals)
+            except OSError as e:
+                logger.debug("Не удалось записать нормали %s: %s", filepath, e)
+        result.append((resolution, vertices, faces, normals))
+
+    meta_path = os.path.join(cache_dir, f"{key}.meta.npy")
+    if os.path.exists(meta_path):
+        try:
+            return result, MeshMetadata.from_array(np.load(meta_path))
+        except (OSError, ValueError) as e:
+            logger.warning("Повреждённые метаданные %s: %s", key, e)
+
+    _, vertices, faces, normals = result[0]
+    metadata = compute_mesh_metadata(vertices, faces, normals)
+    try:
+        _save_array(meta_path, metadata.as_array())
+    except OSError as e:
+        logger.debug("Не удалось записать метаданные %s: %s", filepath, e)
+    return result, metadata
+
+
+def clear_mesh_cache(directory):
+    """Удаляет записи во всех папках .mesh_cache внутри directory; число файлов"""
+    removed = 0
+    for root, dirs, files in os.walk(directory):
+        if os.path.basename(root) == MESH_CACHE_DIRNAME:
+            for filename in files:
+                os.remove(os.path.join(root, filename))
+                removed += 1
+    return removed
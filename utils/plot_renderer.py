@@ -0,0 +1,148 @@
+"""
+Фоновая отрисовка графиков matplotlib в растр
+
+Фигура строится и растеризуется бэкендом Agg в рабочем потоке, без Tk
+и без pyplot; окну передаётся готовый буфер RGBA, который показывается
+как картинка. Готовые растры запоминаются по ключу (отпечаток данных
+графика), поэтому повторный показ того же графика не рисует его заново.
+
+Модуль не зависит от Tk: окно опрашивает Future из render() (например,
+через after) и показывает результат в своём потоке.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Рабочих потоков отрисовки: кэши шрифтов matplotlib общие для процесса,
+# и одновременная отрисовка в нескольких потоках не гарантирована
+MAX_RENDER_THREADS = 1
+
+# Не больше стольких растров в кэше (самые давние вытесняются)
+RASTER_CACHE_SIZE = 64
+
+
+class RasterImage:
+    """Растр фигуры: width x height пикселей, rgba - байты RGBA по строкам"""
+
+    __slots__ = ("width", "height", "rgba")
+
+    def __init__(self, width, height, rgba):
+        self.width = width
+        self.height = height
+        self.rgba = rgba
+
+    @property
+    def nbytes(self):
+        return len(self.rgba)
+
+
+def render_figure(draw, *args, dpi=100):
+    """
+    Рисует фигуру в растр бэкендом Agg
+
+    draw(fig, *args) заполняет фигуру (и при необходимости задаёт её размер).
+    """
+    fig = Figure(dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    draw(fig, *args)
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    return RasterImage(width, height, bytes(canvas.buffer_rgba()))
+
+
+class PlotRenderer:
+    """
+    Пул отрисовки с кэшем растров по ключу
+
+    Одинаковые запросы, пришедшие до окончания отрисовки, получают
+    один и тот же Future.
+    """
+
+    def __init__(self, max_workers=MAX_RENDER_THREADS, cache_size=RASTER_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()   # ключ -> RasterImage
+        self._pending = {}            # ключ -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="plot-render")
+
+    def get(self, key):
+        """Готовый растр или None"""
+        with self._lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            return image
+
+    def render(self, key, draw, *args):
+        """
+        Растр графика по ключу: из кэша или отрисовкой в пуле
+
+        Returns:
+        --------
+        Future с RasterImage (уже завершённый, если растр есть в кэше)
+        """
+        with self._lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+                future = Future()
+                future.set_result(image)
+                return future
+
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(render_figure, draw, *args)
+            self._pending[key] = future
+
+        # Вне блокировки: у уже завершённого Future обработчик вызывается
+        # сразу в этом потоке, а _store берёт ту же блокировку
+        future.add_done_callback(lambda done: self._store(key, done))
+        return future
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                if not future.cancelled():
+                    logger.warning("Ошибка отрисовки графика: %s", future.exception())
+                return
+            self._cache[key] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def nbytes(self):
+        """Объём растров в кэше"""
+        with self._lock:
+            return sum(image.nbytes for image in self._cache.values())
+
+    def __len__(self):
+        return len(self._cache)
+
+    def shutdown(self):
+        """Останавливает пул (незапущенные отрисовки отменяются)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_renderer = None
+
+
+def get_plot_renderer():
+    """Общий пул отрисовки графиков процесса"""
+    global _renderer
+    if _renderer is None:
+        _renderer = PlotRenderer()
+    return _renderer
@@ -0,0 +1,116 @@
+"""
+Фоновая загрузка мешей сцены
+
+Все модели сцены загружаются одновременно: файлы с актуальной записью
+бинарного кэша открываются в потоках (чтение .npy почти не держит GIL),
+а OBJ без кэша разбираются в пуле процессов - разбор текста на Python
+не тормозит окно просмотра. Если пул процессов недоступен (например,
+в замороженной сборке без поддержки multiprocessing), разбор выполняется
+в потоках.
+
+Процессы запускаются методом spawn на всех платформах: дочерний процесс
+импортирует только utils.asset_store (и utils.mesh_cache) и не наследует состояние окна
+(pygame, Tk), как было бы при fork.
+
+Загрузчик не зависит от pygame: окно опрашивает poll() в своём цикле
+и подменяет заглушки готовыми мешами.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils.log import get_logger
+from utils.asset_store import load_mesh_asset
+from utils.mesh_cache import is_mesh_cached
+
+logger = get_logger(__name__)
+
+# Не больше стольких потоков чтения кэша
+MAX_LOAD_THREADS = 4
+
+
+class SceneLoader:
+    """
+    Загрузка мешей (load_mesh_asset) для набора файлов
+
+    poll() возвращает уже загруженные файлы: список (путь, MeshAsset или
+    None при ошибке); каждый файл загружается один раз, даже если он нужен
+    нескольким компонентам.
+    """
+
+    def __init__(self, paths, use_processes=True):
+        self.paths = list(dict.fromkeys(paths))
+        self.done = 0
+        self._futures = {}
+        self._in_process = set()   # файлы, разбираемые в пуле процессов
+        self._threads = None
+        self._processes = None
+
+        uncached = {path for path in self.paths if not is_mesh_cached(path)}
+        workers = os.cpu_count() or 1
+        if uncached and use_processes:
+            try:
+                self._processes = ProcessPoolExecutor(
+                    max_workers=min(len(uncached), workers),
+                    mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning("Пул процессов недоступен, разбор в потоках: %s", e)
+
+        for path in self.paths:
+            if self._processes is not None and path in uncached:
+                self._futures[path] = self._processes.submit(load_mesh_asset, path)
+                self._in_process.add(path)
+            else:
+                self._futures[path] = self._get_threads().submit(load_mesh_asset, path)
+
+        logger.debug("Загрузка сцены: %d файлов, без кэша: %d", len(self.paths), len(uncached))
+
+    def _get_threads(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=min(MAX_LOAD_THREADS, max(1, len(self.paths))),
+                thread_name_prefix="mesh-load")
+        return self._threads
+
+    @property
+    def total(self):
+        return len(self.paths)
+
+    @property
+    def finished(self):
+        return not self._futures
+
+    def poll(self):
+        """Загруженные с прошлого вызова файлы: [(путь, MeshAsset или None)]"""
+        ready = []
+        for path, future in list(self._futures.items()):
+            if not future.done():
+                continue
+            del self._futures[path]
+
+            try:
+                asset = future.result()
+            except Exception as e:
+                if path in self._in_process:
+                    # Сбой в пуле процессов - повторяем в потоке
+                    logger.warning("Ошибка загрузки %s в процессе: %s", path, e)
+                    self._in_process.discard(path)
+                    self._futures[path] = self._get_threads().submit(load_mesh_asset, path)
+                    continue
+                logger.warning("Ошибка загрузки %s: %s", path, e)
+                asset = None
+
+            self.done += 1
+            ready.append((path, asset))
+
+        if self.finished:
+            self.shutdown()
+        return ready
+
+    def shutdown(self):
+        """Останавливает пулы (незапущенные задания отменяются)"""
+        for executor in (self._processes, self._threads):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._processes = None
+        self._threads = None